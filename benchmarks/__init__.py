@@ -0,0 +1 @@
+"""오프라인 벤치마크 및 부하 테스트 도구 (python -m benchmarks.<모듈> 로 실행)."""
@@ -0,0 +1,114 @@
+"""GPT 모델 단계 전환(cascade) 벤치마크.
+
+문서 한 건(개인정보 추출 + 본문 생성)을 여러 번 처리하면서 두 구성을 비교합니다.
+    - baseline : 두 단계 모두 상위 모델(GPT_FALLBACK_MODEL)만 사용
+    - cascade  : GPT_EXTRACT_MODEL / GPT_GENERATE_MODEL을 먼저 쓰고 검증 실패 시 상위 모델로 전환
+문서당 지연 시간, 추정 비용(PRICES 기준), 상위 모델 전환 수, 프롬프트 캐시 적중률을 보고합니다.
+
+기본은 로컬 대역 서버(모델별 지연은 --latency, 저렴한 모델의 검증 실패 빈도는 --fail-every)로 측정합니다.
+이때 지연 시간은 --latency로 정한 값을 그대로 반영할 뿐이고 응답 토큰 수도 실제와 다르므로,
+절감률은 실제 절감 효과가 아니라 전환 경로가 동작하는지 확인하는 용도입니다.
+--live 를 주면 OPENAI_API_KEY로 실제 API를 호출하며 (비용이 발생합니다),
+--target 을 주면 실제 응답 기준 절감률이 그보다 작을 때 종료 코드 1로 실패합니다.
+
+사용 예:
+    python -m benchmarks.gpt_cascade
+    python -m benchmarks.gpt_cascade --docs 20 --fail-every 5
+    python -m benchmarks.gpt_cascade --live --docs 5
+"""
+import argparse
+import sys
+import time
+
+from voicedoc import gpt, metrics
+
+from . import stubs
+
+# 100만 토큰당 USD (입력, 캐시된 입력, 출력)
+PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+
+def _cost(row):
+    price_in, price_cached, price_out = PRICES.get(row["model"], PRICES["gpt-4o"])
+    uncached = row["prompt_tokens"] - row["cached_tokens"]
+    return (uncached * price_in + row["cached_tokens"] * price_cached
+            + row["completion_tokens"] * price_out) / 1_000_000
+
+
+def run(label, extract_model, generate_model, docs):
+    """docs건을 처리하고 문서당 평균 지연 시간, 비용, 사용량 요약을 반환합니다."""
+    gpt.EXTRACT_MODEL, gpt.GENERATE_MODEL = extract_model, generate_model
+    with metrics._lock:
+        metrics._counters.clear()
+
+    started = time.perf_counter()
+    for _ in range(docs):
+        info = gpt.extract_personal_info(stubs.SAMPLE_TRANSCRIPT)
+        gpt.generate_document_content(info, "근로계약서")
+    seconds = time.perf_counter() - started
+
+    rows = metrics.openai_summary()
+    prompt = sum(r["prompt_tokens"] for r in rows)
+    cached = sum(r["cached_tokens"] for r in rows)
+    return {
+        "label": label,
+        "latency": seconds / docs,
+        "cost": sum(_cost(r) for r in rows) / docs,
+        "requests": sum(r["requests"] for r in rows),
+        "escalations": sum({r["stage"]: r["escalations"] for r in rows}.values()),
+        "cache_hit_rate": cached / prompt if prompt else 0.0,
+    }
+
+
+def _parse_pairs(text, cast):
+    return {k: cast(v) for k, v in (item.split("=") for item in text.split(",") if item)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--latency", default="gpt-4o=1.0,gpt-4o-mini=0.4",
+                        help="대역 서버의 모델별 응답 지연(초)")
+    parser.add_argument("--fail-every", default="gpt-4o-mini=10",
+                        help="대역 서버에서 모델별 n번째 응답마다 검증 실패 응답을 보냄")
+    parser.add_argument("--target", type=float, help="cascade의 목표 절감률 (--live 에서만 확인)")
+    parser.add_argument("--live", action="store_true", help="실제 OpenAI API로 측정")
+    args = parser.parse_args()
+
+    metrics.ENABLED = True
+    configs = [
+        ("baseline", gpt.FALLBACK_MODEL, gpt.FALLBACK_MODEL),
+        ("cascade", gpt.EXTRACT_MODEL, gpt.GENERATE_MODEL),
+    ]
+
+    if args.live:
+        results = [run(label, e, g, args.docs) for label, e, g in configs]
+    else:
+        server = stubs.StubOpenAIServer(model_latency=_parse_pairs(args.latency, float),
+                                        fail_every=_parse_pairs(args.fail_every, int))
+        with server:
+            results = [run(label, e, g, args.docs) for label, e, g in configs]
+
+    print(f"{'config':10} {'latency/doc':>12} {'cost/doc':>12} {'requests':>9} {'escalated':>10} {'cache hit':>10}")
+    for r in results:
+        print(f"{r['label']:10} {r['latency'] * 1000:10.0f}ms ${r['cost']:10.5f} {r['requests']:>9} "
+              f"{r['escalations']:>10} {r['cache_hit_rate']:>9.0%}")
+
+    base, cascade = results
+    latency_saving = 1 - cascade["latency"] / base["latency"]
+    cost_saving = 1 - cascade["cost"] / base["cost"] if base["cost"] else 0.0
+    print(f"\n지연 시간 {latency_saving:.0%} 감소, 비용 {cost_saving:.0%} 감소")
+    if not args.live:
+        print("(대역 서버의 지정 지연으로 계산한 값이므로 실제 절감률이 아닙니다. 실제 값은 --live 로 측정하세요.)")
+        return 0
+    if args.target is not None and (latency_saving < args.target or cost_saving < args.target):
+        print(f"!!! 목표({args.target:.0%}) 미달 !!!")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
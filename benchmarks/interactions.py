@@ -0,0 +1,227 @@
+"""화면 조작 한 번당 응답 시간 벤치마크 (단계별 부분 재실행 USE_FRAGMENTS=1 vs 0).
+
+result.py를 실제 Streamlit 서버로 USE_FRAGMENTS=1, 0 두 번 띄우고, 브라우저처럼 웹소켓으로 접속합니다.
+2단계에서 텍스트를 입력해 개인정보를 추출하고 본문(SAMPLE_BODY를 --paragraphs 번 반복)을 만든 뒤,
+4단계 "음성 서명 사용하기" 체크박스를 --interactions 번 켜고 끕니다.
+    - USE_FRAGMENTS=1: 브라우저와 같이 그 단계(fragment)만 다시 실행해 달라고 요청 (부분 재실행)
+    - USE_FRAGMENTS=0: 조작마다 페이지 전체 실행
+조작을 보낸 뒤 실행 완료 메시지를 받을 때까지의 시간과 그동안 받은 메시지 바이트 수를 비교합니다.
+AppTest는 fragment 안의 조작도 스크립트 전체를 실행하므로 이 측정에 쓰지 않습니다.
+서버 프로세스에는 gTTS·streamlit-webrtc 대역을 설치하고, OpenAI는 로컬 가짜 서버(StubOpenAIServer)를 씁니다.
+
+사용 예:
+    python -m benchmarks.interactions
+    python -m benchmarks.interactions --paragraphs 1,20,100 --interactions 20
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from . import stubs
+from .loadtest import APP_PATH
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 서버 프로세스: 대역을 설치한 뒤 같은 프로세스에서 streamlit run 을 실행합니다.
+_LAUNCHER = """
+import sys
+from benchmarks import stubs
+stubs.install_fake_gtts()
+stubs.install_fake_webrtc()
+from streamlit.web import cli
+app, port = sys.argv[1:3]
+sys.argv = ["streamlit", "run", app, "--server.headless=true", "--server.address=127.0.0.1",
+            "--server.port=" + port, "--server.fileWatcherType=none",
+            "--server.enableXsrfProtection=false", "--browser.gatherUsageStats=false"]
+cli.main()
+"""
+
+TEXT_LABEL = "📝 음성 입력 결과 붙여넣기 또는 직접 입력:"
+EXTRACT_LABEL = "🔍 개인정보 추출하기"
+CHECKBOX_LABEL = "🎤 음성 서명 사용하기"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port, proc, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Streamlit 서버가 종료되었습니다 (코드 {proc.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Streamlit 서버가 시작되지 않았습니다")
+
+
+class _Client:
+    """브라우저 대신 웹소켓으로 BackMsg(rerun_script)를 보내고 ForwardMsg를 받는 최소 클라이언트."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        # 라벨 -> (위젯 id, fragment id)
+        self.widgets = {}
+        # 위젯 id -> WidgetState (브라우저처럼 매번 전체 위젯 값을 보냅니다)
+        self.states = {}
+        self.errors = []
+
+    def set_value(self, label, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id, _ = self.widgets[label]
+        self.states[widget_id] = WidgetState(id=widget_id, **value)
+
+    def rerun(self, fragment_label=None, trigger=None):
+        """한 번 실행을 요청하고 (걸린 초, 받은 바이트 수)를 반환합니다.
+
+        fragment_label을 주면 그 위젯이 속한 fragment만 다시 실행해 달라고 요청합니다 (fragment가 없으면 전체 실행).
+        trigger는 이번 실행에서만 눌린 버튼의 라벨입니다.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        msg = BackMsg()
+        widgets = list(self.states.values())
+        if trigger:
+            widgets.append(WidgetState(id=self.widgets[trigger][0], trigger_value=True))
+        msg.rerun_script.widget_states.widgets.extend(widgets)
+        if fragment_label:
+            msg.rerun_script.fragment_id = self.widgets[fragment_label][1]
+
+        received = 0
+        start = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        while True:
+            data = self.ws.recv(timeout=600)
+            received += len(data)
+            fwd = ForwardMsg.FromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta":
+                self._collect(fwd.delta)
+            elif kind == "script_finished":
+                # EARLY_FOR_RERUN 이면 (st.rerun 등) 이어지는 실행을 기다립니다.
+                if fwd.script_finished in (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                    return time.perf_counter() - start, received
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("result.py 컴파일 오류")
+
+    def _collect(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(element.exception.message)
+            return
+        widget = getattr(element, kind)
+        label = getattr(widget, "label", None)
+        widget_id = getattr(widget, "id", None)
+        if label and widget_id:
+            self.widgets[label] = (widget_id, delta.fragment_id)
+
+
+def _check(client, step):
+    if client.errors:
+        raise RuntimeError(f"{step}: " + " / ".join(client.errors))
+
+
+def measure(port, paragraphs, interactions):
+    """새 세션 하나로 문서를 만든 뒤 체크박스 조작별 (응답 초, 받은 바이트) 목록을 반환합니다."""
+    from websockets.sync.client import connect
+
+    with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                 max_size=None, open_timeout=30) as ws:
+        client = _Client(ws)
+        client.rerun()
+        _check(client, "first run")
+        client.set_value(TEXT_LABEL, string_value=stubs.SAMPLE_TRANSCRIPT)
+        client.rerun(fragment_label=EXTRACT_LABEL, trigger=EXTRACT_LABEL)
+        _check(client, "extract")
+        if CHECKBOX_LABEL not in client.widgets:
+            raise RuntimeError("extract: 개인정보 추출 후 4단계가 표시되지 않았습니다")
+
+        samples = []
+        checked = False
+        for _ in range(interactions):
+            checked = not checked
+            client.set_value(CHECKBOX_LABEL, bool_value=checked)
+            samples.append(client.rerun(fragment_label=CHECKBOX_LABEL))
+            _check(client, "toggle")
+        return samples
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_mode(use_fragments, paragraphs_list, interactions, workdir, openai):
+    """USE_FRAGMENTS 값 하나로 서버를 띄워 본문 길이별 결과를 반환합니다."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        USE_FRAGMENTS="1" if use_fragments else "0",
+        SOUND_DIR=str(Path(workdir) / "sound"),
+        DOCUMENTS_DIR=str(Path(workdir) / "documents"),
+        OPENAI_BASE_URL=openai.base_url,
+        OPENAI_API_KEY="sk-stub",
+        PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""),
+    )
+    proc = subprocess.Popen([sys.executable, "-c", _LAUNCHER, str(APP_PATH), str(port)], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = {}
+    try:
+        _wait_ready(port, proc)
+        for paragraphs in paragraphs_list:
+            openai.httpd.body = "\n\n".join([stubs.SAMPLE_BODY] * paragraphs)
+            samples = measure(port, paragraphs, interactions)
+            seconds = [s for s, _ in samples]
+            results[paragraphs] = {
+                "p50_ms": statistics.median(seconds) * 1000,
+                "p95_ms": _percentile(seconds, 0.95) * 1000,
+                "kb": statistics.mean(b for _, b in samples) / 1024,
+            }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", default="1,10,50", help="본문 반복 횟수 목록 (쉼표 구분)")
+    parser.add_argument("--interactions", type=int, default=10)
+    args = parser.parse_args()
+    paragraphs_list = [int(n) for n in args.paragraphs.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="voicedoc_interactions_")
+    with stubs.StubOpenAIServer(latency=0) as openai:
+        full = run_mode(False, paragraphs_list, args.interactions, workdir, openai)
+        fragment = run_mode(True, paragraphs_list, args.interactions, workdir, openai)
+
+    body_kb = len(stubs.SAMPLE_BODY.encode("utf-8")) / 1024
+    print(f"{'본문':>4} {'본문 KB':>8} {'전체 p50 ms':>11} {'전체 p95 ms':>11} {'부분 p50 ms':>11} {'부분 p95 ms':>11} "
+          f"{'전체 KB/회':>10} {'부분 KB/회':>10}")
+    for paragraphs in paragraphs_list:
+        f, p = full[paragraphs], fragment[paragraphs]
+        print(f"{paragraphs:4d} {body_kb * paragraphs:8.1f} {f['p50_ms']:11.1f} {f['p95_ms']:11.1f} "
+              f"{p['p50_ms']:11.1f} {p['p95_ms']:11.1f} {f['kb']:10.1f} {p['kb']:10.1f}")
+    print("전체 = USE_FRAGMENTS=0 (조작마다 페이지 전체 실행), 부분 = USE_FRAGMENTS=1 (4단계 fragment만 실행)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""동시 세션 부하 테스트.
+
+Streamlit AppTest로 N개의 세션을 동시에 띄워 result.py의 전체 흐름
+(서류 선택 → 녹음 → 변환 → 추출 → PDF → 서명)을 스크립트대로 진행합니다.
+녹음은 합성 WAV를 녹음 위젯 대역(stubs.install_fake_webrtc)으로 흘려 실제 녹음 저장 경로(암호화 포함)를 거치고,
+OpenAI는 로컬 가짜 서버, S3는 moto(없으면 S3 업로드 생략), gTTS는 가짜 모듈을 사용합니다.
+Whisper는 기본적으로 오디오 길이 × --whisper-rtf 초만큼 CPU를 점유하는 가짜 모델로 대체하며,
+--real-whisper 를 주면 실제 모델을 씁니다.
+
+ffmpeg가 없으면 암호화된 녹음을 Whisper 입력으로 바꿀 수 없으므로 녹음 암호화(SEAL_RECORDINGS)를 끄고 진행합니다.
+
+N을 늘려가며 처리량(흐름/초), 단계별·전체 꼬리 지연(p50/p95/p99), 메모리(RSS)를 보고합니다.
+Streamlit 서버는 한 프로세스에서 세션마다 스레드로 스크립트를 실행하므로 기본적으로 세션을 스레드로 띄워
+한 인스턴스가 감당하는 동시 사용자 수를 잽니다. --processes 를 주면 세션마다 별도 프로세스에서 실행해
+(가짜 S3도 프로세스마다 따로 만듭니다) 프로세스 안에서 공유하는 자원의 영향을 뺀 값과 비교할 수 있습니다.
+
+사용 예:
+    python -m benchmarks.loadtest --levels 1,2,4,8,16 --openai-latency 1.5
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from . import stubs
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "result.py"
+
+FLOW_STEPS = ["load", "record", "select", "transcribe", "extract", "pdf", "sign"]
+
+
+class _FakeWhisperModel:
+    """오디오 길이에 비례해 CPU를 점유하고 고정 문장을 돌려주는 Whisper 대역."""
+
+    def __init__(self, rtf):
+        self.rtf = rtf
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio, **kwargs):
+        if isinstance(audio, (str, os.PathLike)):
+            with wave.open(str(audio), "rb") as wav:
+                seconds = wav.getnframes() / wav.getframerate()
+        else:
+            # 암호화된 녹음은 16kHz float32 배열로 들어옵니다.
+            seconds = len(audio) / 16000
+        deadline = time.perf_counter() + seconds * self.rtf
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        return {"text": stubs.SAMPLE_TRANSCRIPT, "segments": []}
+
+
+def _rss_mb():
+    """현재 RSS(MB). /proc 이 없으면 최대 RSS로 대신합니다."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"위젯을 찾을 수 없습니다: {label}")
+
+
+def _check(at, step):
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].message}")
+    for error in at.error:
+        raise RuntimeError(f"{step}: {error.value}")
+
+
+def run_session(index, workdir, doc_type, audio_seconds):
+    """한 세션의 전체 흐름을 실행하고 단계별 소요 시간(초)을 반환합니다."""
+    from streamlit.testing.v1 import AppTest
+
+    session_dir = Path(workdir) / f"session_{index}"
+    session_dir.mkdir()
+    recording = stubs.write_sine_wav(session_dir / "input.wav", audio_seconds, sample_rate=16000)
+    signature_recording = stubs.write_sine_wav(session_dir / "signature.wav", 3, sample_rate=16000)
+
+    timings = {}
+
+    def step(name, action):
+        t = time.perf_counter()
+        at = action()
+        timings[name] = time.perf_counter() - t
+        _check(at, name)
+        return at
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=600)
+    at.session_state[stubs.FAKE_RECORDINGS_KEY] = {
+        "sendonly-audio": recording,
+        "signature-audio": signature_recording,
+    }
+
+    # 첫 실행에서 녹음 프레임이 들어오고, 다음 실행에서 녹음이 끝나 파일로 저장됩니다.
+    at = step("load", at.run)
+    at = step("record", at.run)
+    at = step("select", lambda: at.selectbox[0].select(doc_type).run())
+    at = step("transcribe", lambda: _widget(at.button, "🎤 Whisper로 텍스트 변환").click().run())
+    _widget(at.text_area, "📝 음성 입력 결과 붙여넣기 또는 직접 입력:").input(at.session_state["voice_text"])
+    at = step("extract", lambda: _widget(at.button, "🔍 개인정보 추출하기").click().run())
+    at = step("pdf", lambda: _widget(at.button, "📄 PDF 서류 생성하기").click().run())
+    _widget(at.checkbox, "🎤 음성 서명 사용하기").check().run().run()
+    at = step("sign", lambda: _widget(at.button, "✅ 음성 서명 생성").click().run())
+    timings["total"] = sum(timings[s] for s in FLOW_STEPS)
+    return timings
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+def _prepare(whisper_rtf, real_whisper, s3):
+    """세션을 실행할 프로세스에 대역을 설치합니다 (스레드 모드는 한 번, 프로세스 모드는 프로세스마다)."""
+    stubs.install_fake_gtts()
+    stubs.install_fake_webrtc()
+    if not real_whisper:
+        from voicedoc import transcribe
+        transcribe.BACKENDS["fake"] = lambda **options: _FakeWhisperModel(whisper_rtf)
+        transcribe.TRANSCRIBER_BACKEND = "fake"
+    if s3:
+        # 자식 프로세스는 끝날 때까지 가짜 S3를 유지합니다.
+        stubs.mock_s3().__enter__()
+
+
+def _session_worker(concurrency, worker_index, flows_per_session, workdir, doc_type, audio_seconds):
+    results, failures = [], []
+    for flow in range(flows_per_session):
+        try:
+            results.append(run_session(f"{concurrency}_{worker_index}_{flow}", workdir, doc_type, audio_seconds))
+        except Exception as e:
+            failures.append(str(e))
+    return results, failures, _rss_mb()
+
+
+def run_level(concurrency, flows_per_session, workdir, doc_type, audio_seconds, processes=None):
+    """동시 세션 수 하나에 대한 측정 결과를 반환합니다.
+
+    processes가 (whisper_rtf, real_whisper, s3) 이면 세션마다 별도 프로세스에서 실행하고,
+    메모리는 프로세스별 RSS의 합으로 보고합니다.
+    """
+    peak_rss = [_rss_mb()]
+    stop = threading.Event()
+
+    def sample_memory():
+        while not stop.wait(0.2):
+            peak_rss[0] = max(peak_rss[0], _rss_mb())
+
+    if processes:
+        pool = ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_prepare, initargs=processes)
+    else:
+        pool = ThreadPoolExecutor(max_workers=concurrency)
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    with pool:
+        futures = [pool.submit(_session_worker, concurrency, i, flows_per_session, workdir, doc_type, audio_seconds)
+                   for i in range(concurrency)]
+        outcomes = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    if processes:
+        # 프로세스 시작 시간이 처리량에 섞이지만, 각 흐름의 단계별 지연에는 포함되지 않습니다.
+        peak_rss[0] = sum(rss for _, _, rss in outcomes)
+
+    flows = [r for results, _, _ in outcomes for r in results]
+    failures = [f for _, fails, _ in outcomes for f in fails]
+    return {
+        "concurrency": concurrency,
+        "flows": len(flows),
+        "failures": failures,
+        "throughput": len(flows) / wall if wall else 0.0,
+        "latency": {
+            name: {p: _percentile([f[name] for f in flows], p) for p in (50, 95, 99)}
+            for name in FLOW_STEPS + ["total"]
+        } if flows else {},
+        "peak_rss_mb": peak_rss[0],
+    }
+
+
+def _print_level(result):
+    print(f"\n=== N={result['concurrency']}  flows={result['flows']}  "
+          f"failures={len(result['failures'])}  throughput={result['throughput']:.2f} flows/s  "
+          f"peak RSS={result['peak_rss_mb']:.0f} MB")
+    for name, pcts in result["latency"].items():
+        print(f"  {name:11} p50={pcts[50]:7.2f}s  p95={pcts[95]:7.2f}s  p99={pcts[99]:7.2f}s")
+    for failure in result["failures"][:5]:
+        print(f"  ! {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,2,4,8", help="동시 세션 수 목록 (쉼표 구분)")
+    parser.add_argument("--flows", type=int, default=2, help="세션당 반복할 흐름 수")
+    parser.add_argument("--doc-type", default="근로계약서")
+    parser.add_argument("--audio-seconds", type=float, default=15)
+    parser.add_argument("--openai-latency", type=float, default=1.0, help="가짜 OpenAI 서버 응답 지연(초)")
+    parser.add_argument("--whisper-rtf", type=float, default=0.3, help="가짜 Whisper의 실시간 배율(처리 시간/오디오 길이)")
+    parser.add_argument("--real-whisper", action="store_true")
+    parser.add_argument("--processes", action="store_true", help="세션마다 별도 프로세스에서 실행")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="voicedoc_load_")
+    os.environ["SOUND_DIR"] = str(Path(workdir) / "sound")
+    os.environ["DOCUMENTS_DIR"] = str(Path(workdir) / "documents")
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg가 없어 녹음 암호화를 끄고 진행합니다 (SEAL_RECORDINGS=0).")
+        os.environ["SEAL_RECORDINGS"] = "0"
+    os.chdir(workdir)
+
+    s3 = stubs.s3_available()
+    if not s3:
+        print("moto/boto3가 없어 S3 업로드를 생략합니다.")
+    processes = (args.whisper_rtf, args.real_whisper, s3) if args.processes else None
+    levels = [int(n) for n in args.levels.split(",")]
+    with stubs.StubOpenAIServer(latency=args.openai_latency), \
+            (stubs.mock_s3() if s3 and not processes else contextlib.nullcontext()):
+        if not processes:
+            _prepare(args.whisper_rtf, args.real_whisper, s3=False)
+        for concurrency in levels:
+            _print_level(run_level(concurrency, args.flows, workdir, args.doc_type, args.audio_seconds, processes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""긴 본문 PDF 레이아웃 벤치마크.
+
+본문 길이를 늘려가며(약 1~20쪽) 문서 유형별 PDF를 만들고, 쪽수·렌더링 시간·파일 크기를 보고합니다.
+본문 상자가 페이지를 넘어 이어지는지(LayoutError 없음)와
+렌더링 시간이 쪽수에 선형인지(5쪽 이상에서 쪽당 시간이 --tolerance 이상 늘지 않는지)를 확인하며,
+어긋나면 종료 코드 1로 실패합니다.
+
+사용 예:
+    python -m benchmarks.pdf_layout
+    python -m benchmarks.pdf_layout --pages 1,5,10,20,40 --doc-type 근로계약서
+"""
+import argparse
+import re
+import sys
+import time
+from io import BytesIO
+
+from voicedoc import pdf
+
+from . import stubs
+
+DOC_TYPES = ["근로계약서", "개인정보 제공 동의서", "위임장"]
+
+# 근로계약서 기준 SAMPLE_BODY 조항 약 21개가 한 쪽 분량
+CLAUSES_PER_PAGE = 21
+
+_PAGE_PATTERN = re.compile(rb"/Type\s*/Page[^s]")
+
+
+def long_body(pages):
+    """약 pages쪽 분량의 본문을 만듭니다. 절반은 줄바꿈 없는 긴 문단으로 만들어 문단 안 분할도 확인합니다."""
+    clauses = stubs.SAMPLE_BODY.split("\n\n")
+    count = max(1, pages * CLAUSES_PER_PAGE)
+    body = [clauses[i % len(clauses)] for i in range(count)]
+    half = count // 2
+    return "\n\n".join(body[:half]) + "\n\n" + " ".join(body[half:])
+
+
+def render(body, doc_type, repeat, compact):
+    """(쪽수, 최소 렌더링 시간(초), 파일 크기(바이트))를 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        buffer = BytesIO()
+        started = time.perf_counter()
+        size = pdf.create_document_pdf(body, doc_type, stubs.SAMPLE_PERSONAL_INFO, buffer, compact=compact)
+        best = min(best, time.perf_counter() - started)
+    return len(_PAGE_PATTERN.findall(buffer.getvalue())), best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="1,2,5,10,20", help="본문 분량(쪽) 목록 (쉼표 구분)")
+    parser.add_argument("--doc-type", action="append", help="문서 유형 (여러 번 지정 가능)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="쪽당 시간 허용 증가율")
+    parser.add_argument("--no-compact", action="store_true", help="간결 출력 모드를 끄고 측정")
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.pages.split(",")]
+    failures = []
+
+    # 폰트 등록, 스타일 생성을 측정에서 제외합니다.
+    pdf.create_document_pdf("", DOC_TYPES[0], stubs.SAMPLE_PERSONAL_INFO, BytesIO())
+
+    print(f"{'doc_type':24} {'size':>5} {'pages':>6} {'render':>10} {'per page':>10} {'bytes':>10}")
+    for doc_type in args.doc_type or DOC_TYPES:
+        per_page = []
+        for size in sizes:
+            try:
+                pages, seconds, nbytes = render(long_body(size), doc_type, args.repeat, not args.no_compact)
+            except Exception as e:
+                failures.append(f"{doc_type} {size}쪽: {type(e).__name__}: {e}")
+                continue
+            per_page.append((pages, seconds / pages))
+            print(f"{doc_type:24} {size:>5} {pages:>6} {seconds * 1000:8.1f}ms {seconds / pages * 1000:8.1f}ms "
+                  f"{nbytes:>10,}")
+
+        # 짧은 문서는 고정 비용(폰트, 정보 표, 문서 시작) 비중이 커서 5쪽 이상부터 비교합니다.
+        multi_page = [p for p in per_page if p[0] >= 5]
+        if len(multi_page) >= 2:
+            base, last = multi_page[0][1], multi_page[-1][1]
+            if last > base * (1 + args.tolerance):
+                failures.append(f"{doc_type}: 쪽당 시간 {base * 1000:.1f}ms -> {last * 1000:.1f}ms (선형 아님)")
+
+    if failures:
+        print("\n!!! 실패 !!!")
+        for line in failures:
+            print(f"  - {line}")
+        return 1
+    print("\n모든 분량에서 레이아웃 성공, 렌더링 시간 선형.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
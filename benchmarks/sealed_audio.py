@@ -0,0 +1,90 @@
+"""녹음 암호화 저장(voicedoc.sealed) 오버헤드 벤치마크.
+
+--seconds 길이의 녹음(기본 60초, 48kHz 16비트 모노)을 평문 WAV와 암호화 WAV로 각각
+저장·전체 읽기·임의 위치 읽기(재생 위치 이동)하고 처리량과 녹음 1분당 추가 시간을 보고합니다.
+암호화 저장 시간이 녹음 길이의 --target(기본 1%)을 넘으면 종료 코드 1로 실패합니다.
+
+사용 예:
+    python -m benchmarks.sealed_audio
+    python -m benchmarks.sealed_audio --seconds 600 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from voicedoc import sealed
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _read_all(path):
+    with sealed.open_audio(path) as f:
+        while f.read(sealed.SEGMENT_SIZE):
+            pass
+
+
+def _random_reads(path, size, reads=200, length=64 * 1024):
+    positions = random.Random(0).sample(range(max(1, size - length)), min(reads, max(1, size - length)))
+    with sealed.open_audio(path) as f:
+        for position in positions:
+            f.seek(position)
+            f.read(length)
+
+
+def run(seconds, repeat, frame_rate=48000):
+    pcm = os.urandom(int(seconds * frame_rate) * 2)
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, seal in (("plain", False), ("sealed", True)):
+            path = os.path.join(workdir, f"{label}.wav")
+            write = _best(lambda: sealed.write_wav(path, pcm, 1, 2, frame_rate, seal=seal), repeat)
+            read = _best(lambda: _read_all(path), repeat)
+            seek = _best(lambda: _random_reads(path, len(pcm)), repeat)
+            rows.append({
+                "label": label,
+                "write": write,
+                "read": read,
+                "seek": seek,
+                "disk_bytes": os.path.getsize(path),
+            })
+    return len(pcm), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target", type=float, default=0.01, help="녹음 길이 대비 허용 암호화 저장 시간")
+    args = parser.parse_args()
+
+    size, rows = run(args.seconds, args.repeat)
+    megabytes = size / 1_000_000
+    print(f"녹음 {args.seconds:.0f}초, {megabytes:.1f}MB")
+    print(f"{'':8} {'저장 MB/s':>10} {'읽기 MB/s':>10} {'임의 읽기 ms':>12} {'디스크 증가':>10}")
+    for row in rows:
+        print(f"{row['label']:8} {megabytes / row['write']:10.0f} {megabytes / row['read']:10.0f} "
+              f"{row['seek'] * 1000:12.1f} {row['disk_bytes'] / (size + 44) - 1:10.2%}")
+
+    plain, sealed_row = rows
+    minutes = args.seconds / 60
+    extra_write = (sealed_row["write"] - plain["write"]) / minutes
+    extra_read = (sealed_row["read"] - plain["read"]) / minutes
+    print(f"녹음 1분당 추가 시간: 저장 {extra_write * 1000:.1f}ms, 읽기 {extra_read * 1000:.1f}ms")
+    ratio = sealed_row["write"] / args.seconds
+    print(f"암호화 저장 시간 / 녹음 길이: {ratio:.3%} (목표 {args.target:.1%} 이하)")
+    if ratio > args.target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""유휴 세션 정리(voicedoc.sessions) 메모리 벤치마크.
+
+하루(--hours) 동안 시간마다 --sessions-per-hour 개의 세션이 작업하다 탭을 방치하는 상황을 흉내 냅니다.
+방치된 세션은 녹음 버퍼(--audio-seconds, 48kHz 16비트 모노)와 인식 텍스트·개인정보·본문을 들고 있고,
+Streamlit이 세션을 닫지 않으므로 정리하지 않으면 계속 쌓입니다.
+정리를 켠 경우와 끈 경우를 각각 새 프로세스에서 돌려 시간별 RSS를 비교하고,
+정리된 세션 중 --return-rate 비율은 돌아와서 작업 내용이 되살아나는지 확인합니다.
+정리를 켰는데 마지막 RSS가 첫 시간 RSS의 --target 배(기본 2)를 넘으면 종료 코드 1로 실패합니다.
+
+사용 예:
+    python -m benchmarks.session_reaper
+    python -m benchmarks.session_reaper --hours 24 --sessions-per-hour 40 --audio-seconds 120
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+
+from .loadtest import _rss_mb
+
+
+class _State(dict):
+    """세션 상태 대역 (약한 참조가 가능한 dict)."""
+
+
+def _new_session(index, audio_seconds):
+    import pydub
+
+    from voicedoc import archive
+
+    state = _State(session_id=archive.new_session_id())
+    state["audio_buffer"] = pydub.AudioSegment(
+        data=os.urandom(int(audio_seconds * 48000) * 2), sample_width=2, frame_rate=48000, channels=1)
+    state["voice_text"] = f"제 이름은 홍길동{index}입니다. 주소는 서울시 강남구 테헤란로 {index}번지입니다. " * 20
+    state["personal_info"] = {"name": f"홍길동{index}", "phone": "010-1234-5678", "address": "서울시 강남구"}
+    state["document_content"] = "본 계약은 근로기준법에 따라 체결한다. " * 200
+    state["system_key"] = os.urandom(44)
+    return state
+
+
+def simulate(reap, hours, per_hour, audio_seconds, return_rate):
+    """시간별 RSS(MB) 목록과 되살린 세션 수, 되살리기 실패 수를 반환합니다."""
+    os.environ["SOUND_DIR"] = tempfile.mkdtemp(prefix="voicedoc_reaper_")
+    from voicedoc import sessions
+
+    rng = random.Random(0)
+    alive = []
+    rss = []
+    restored = failed = 0
+    for hour in range(hours):
+        if reap:
+            # 지난 시간의 세션은 모두 유휴 시간을 넘겼습니다.
+            sessions.reap_idle(idle_seconds=0)
+            for state in rng.sample(alive, int(len(alive) * return_rate)):
+                if sessions.SPILL_KEY not in state:
+                    continue
+                if sessions.begin_run(state):
+                    restored += 1
+                    failed += not state.get("document_content") or not state.get("personal_info")
+                sessions.end_run(state)
+        for index in range(per_hour):
+            state = _new_session(hour * per_hour + index, audio_seconds)
+            sessions.begin_run(state)
+            sessions.end_run(state)
+            alive.append(state)
+        rss.append(_rss_mb())
+    return rss, restored, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--sessions-per-hour", type=int, default=20)
+    parser.add_argument("--audio-seconds", type=float, default=60)
+    parser.add_argument("--return-rate", type=float, default=0.1)
+    parser.add_argument("--target", type=float, default=2.0, help="정리를 켰을 때 허용하는 RSS 증가 배율")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for reap in (False, True):
+        with context.Pool(1) as pool:
+            results[reap] = pool.apply(
+                simulate, (reap, args.hours, args.sessions_per_hour, args.audio_seconds, args.return_rate))
+
+    print(f"{'시간':>4} {'정리 끔 RSS MB':>14} {'정리 켬 RSS MB':>14}")
+    for hour, (off, on) in enumerate(zip(results[False][0], results[True][0]), 1):
+        print(f"{hour:4d} {off:14.0f} {on:14.0f}")
+    _, restored, failed = results[True]
+    print(f"돌아온 세션 {restored}개 되살림, 실패 {failed}개")
+
+    rss = results[True][0]
+    growth = rss[-1] / rss[0]
+    print(f"정리 켬: 마지막/첫 시간 RSS = {growth:.2f}배 (목표 {args.target:.1f}배 이하)")
+    if growth > args.target or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""파이프라인 단계별 오프라인 벤치마크.
+
+외부 서비스 없이 결정적 대역(benchmarks/stubs.py)으로 각 단계를 반복 실행하고,
+지연 시간 백분위수(p50/p95/p99), 초당 처리량, 단계별 최대 RSS를 보고합니다.
+최대 RSS를 단계별로 분리하기 위해 단계마다 새 프로세스에서 실행합니다.
+
+사용 예:
+    python -m benchmarks.stages                       # 측정 후 기준선과 비교
+    python -m benchmarks.stages --update-baseline     # 현재 결과를 기준선으로 저장
+    python -m benchmarks.stages --only pdf            # 이름에 pdf가 들어간 단계만
+
+기준선(benchmarks/baselines.json)보다 p50 지연 시간이나 최대 RSS가
+허용 오차(--tolerance, 기본 25%) 이상 나빠지면 종료 코드 1로 실패합니다.
+기준선 파일이 없거나 기준선에 없는 단계가 있어도 비교할 수 없으므로 실패합니다.
+기준선은 측정한 장비에 따라 달라지므로 저장소에 넣지 않고, 같은 장비(또는 CI 러너)에서
+--update-baseline 으로 먼저 기록합니다.
+Whisper가 없으면 음성 인식 단계를, moto/boto3가 없으면 S3 단계를,
+ffmpeg가 없으면 증거 파일 인코딩(opus/flac) 단계를 건너뜁니다.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from voicedoc import gpt, pdf, signature, storage, tts
+
+from . import stubs
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+DOC_TYPES = ["근로계약서", "주민등록등본 신청서", "개인정보 제공 동의서", "위임장"]
+
+WHISPER_CLIPS = {"3s": 3, "10s": 10}
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(sorted_values, pct):
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _signature_fixture(workdir):
+    audio = stubs.write_sine_wav(Path(workdir) / "signature.wav", 3)
+    return {
+        "timestamp": "2025-01-01 12:00:00",
+        "document_hash": "a" * 64,
+        "audio_file_path": audio,
+        "audio_file_size": os.path.getsize(audio),
+        # 서명할 때 한 번 정해 두는 QR 주소 (렌더링은 업로드하지 않음)
+        "audio_file_url": "https://voicedoc-bench.s3.ap-northeast-2.amazonaws.com/audio/2025/01/01/signature.opus",
+        "consent_phrase": "본인은 상기 내용을 확인하고 이에 동의합니다.",
+    }
+
+
+def _build_stage(name, workdir):
+    """단계 이름에 해당하는 (실행 함수, 컨텍스트 매니저 목록)을 반환합니다."""
+    kind, _, arg = name.partition(":")
+
+    if kind == "extract_personal_info":
+        return lambda: gpt.extract_personal_info(stubs.SAMPLE_TRANSCRIPT), []
+
+    if kind == "generate_document_content":
+        return lambda: gpt.generate_document_content(stubs.SAMPLE_PERSONAL_INFO, "근로계약서"), []
+
+    if kind == "create_document_pdf":
+        def run():
+            pdf.create_document_pdf(stubs.SAMPLE_BODY, arg, stubs.SAMPLE_PERSONAL_INFO, BytesIO())
+        return run, []
+
+    if kind == "create_document_pdf_signed":
+        voice_signature = _signature_fixture(workdir)
+
+        def run():
+            pdf.create_document_pdf(stubs.SAMPLE_BODY, arg, stubs.SAMPLE_PERSONAL_INFO, BytesIO(),
+                                    voice_signature=voice_signature)
+        return run, []
+
+    if kind == "prerender_get_pdf":
+        from voicedoc import prerender
+        # 사용자가 검토하는 동안 미리 렌더링이 끝난 상태에서 다운로드 버튼을 누르는 경우
+        prerender.get_pdf(stubs.SAMPLE_BODY, arg, stubs.SAMPLE_PERSONAL_INFO)
+        return lambda: prerender.get_pdf(stubs.SAMPLE_BODY, arg, stubs.SAMPLE_PERSONAL_INFO), []
+
+    if kind == "generate_qr_code":
+        target = str(Path(workdir) / "qr.png")
+        url = "https://voicedoc-bench.s3.ap-northeast-2.amazonaws.com/audio/2025/01/01/signature.wav"
+        return lambda: signature.generate_qr_code(url, output_file=target, size=150), []
+
+    if kind == "calculate_document_hash":
+        target = Path(workdir) / "doc.pdf"
+        pdf.create_document_pdf(stubs.SAMPLE_BODY, "근로계약서", stubs.SAMPLE_PERSONAL_INFO, str(target))
+        return lambda: signature.calculate_document_hash(str(target)), []
+
+    if kind == "create_voice_signature":
+        target = Path(workdir) / "doc.pdf"
+        pdf.create_document_pdf(stubs.SAMPLE_BODY, "근로계약서", stubs.SAMPLE_PERSONAL_INFO, str(target))
+        audio = stubs.write_sine_wav(Path(workdir) / "signature.wav", 3)
+        return lambda: signature.create_voice_signature(stubs.SAMPLE_BODY, str(target), audio), []
+
+    if kind == "upload_audio_to_s3":
+        audio = stubs.write_sine_wav(Path(workdir) / "signature.wav", 3)
+        return lambda: storage.upload_audio_to_s3(audio), [stubs.mock_s3()]
+
+    if kind == "encode_evidence":
+        from voicedoc import evidence
+        audio = stubs.write_sine_wav(Path(workdir) / "signature.wav", 5)
+
+        def run():
+            # 인코딩에 실패하면 WAV로 대신하므로, 그 시간을 인코딩 비용으로 보고하지 않게 확인합니다.
+            result = evidence.encode_evidence(audio, arg)
+            if result["format"] != arg:
+                raise RuntimeError(f"{arg} 인코딩 실패: {result['format']}로 대체됨")
+        return run, []
+
+    if kind == "load_templates":
+        from voicedoc import templates
+
+        def run():
+            # 프로세스당 한 번 드는 비용(서식 파일 읽기·검증)을 측정합니다.
+            for cached in (templates.load_templates, templates.selectable_templates, templates.info_keys,
+                           templates._default_spec, templates._default_template):
+                cached.cache_clear()
+            templates.info_keys()
+        return run, []
+
+    if kind == "tts":
+        def run():
+            tts.synthesize_speech.cache_clear()
+            tts.synthesize_speech("3단계입니다. 생성된 문서를 확인하고, PDF 생성 버튼을 눌러 서류를 다운로드하세요.")
+        return run, []
+
+    if kind == "transcribe":
+        from voicedoc import transcribe
+        clip = stubs.write_sine_wav(Path(workdir) / f"clip_{arg}.wav", WHISPER_CLIPS[arg], sample_rate=16000)
+        transcribe.get_transcriber()
+        return lambda: transcribe.transcribe(clip), []
+
+    if kind == "verify_consent":
+        from voicedoc import consent
+        clip = stubs.write_sine_wav(Path(workdir) / "consent.wav", 3)
+        consent._get_consent_transcriber()
+        return lambda: consent.verify_consent(clip), []
+
+    raise ValueError(f"알 수 없는 단계: {name}")
+
+
+def _run_stage(name, iterations, warmup, openai_base_url):
+    """새 프로세스에서 단계 하나를 실행하고 측정값을 반환합니다."""
+    os.environ["OPENAI_BASE_URL"] = openai_base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+    stubs.install_fake_gtts()
+
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="voicedoc_bench_") as workdir:
+        os.chdir(workdir)
+        run, contexts = _build_stage(name, workdir)
+        for ctx in contexts:
+            ctx.__enter__()
+        try:
+            for _ in range(warmup):
+                run()
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(iterations):
+                t = time.perf_counter()
+                run()
+                latencies.append(time.perf_counter() - t)
+            wall = time.perf_counter() - started
+        finally:
+            for ctx in reversed(contexts):
+                ctx.__exit__(None, None, None)
+            os.chdir(original_cwd)
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "ops_per_sec": iterations / wall if wall else float("inf"),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _whisper_installed():
+    from voicedoc import transcribe
+    return transcribe.backend_available(transcribe.TRANSCRIBER_BACKEND)
+
+
+def stage_plan(iterations):
+    """(단계 이름, 반복 횟수) 목록을 반환합니다."""
+    plan = [
+        ("extract_personal_info", iterations),
+        ("generate_document_content", iterations),
+    ]
+    plan += [(f"create_document_pdf:{doc_type}", iterations) for doc_type in DOC_TYPES]
+    plan += [("create_document_pdf_signed:근로계약서", iterations)]
+    plan += [("prerender_get_pdf:근로계약서", iterations)]
+    plan += [
+        ("generate_qr_code", iterations),
+        ("calculate_document_hash", iterations),
+        ("create_voice_signature", iterations),
+    ]
+    if stubs.s3_available():
+        plan += [("upload_audio_to_s3", iterations)]
+    if shutil.which("ffmpeg"):
+        plan += [(f"encode_evidence:{fmt}", iterations) for fmt in ("opus", "flac")]
+    plan += [
+        ("load_templates", iterations),
+        ("tts", iterations),
+    ]
+    if _whisper_installed():
+        # Whisper는 느리므로 반복 횟수를 줄입니다.
+        plan += [(f"transcribe:{clip}", max(3, iterations // 10)) for clip in WHISPER_CLIPS]
+        plan += [("verify_consent", max(3, iterations // 3))]
+    return plan
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """기준선 대비 악화된 단계(와 기준선에 없는 단계) 목록을 반환합니다."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            regressions.append(f"{name}: 기준선 없음 (--update-baseline 으로 기록)")
+            continue
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {base['p50_ms']:.2f}ms -> {result['p50_ms']:.2f}ms")
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {base['peak_rss_mb']:.1f}MB -> {result['peak_rss_mb']:.1f}MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", help="이름에 이 문자열이 포함된 단계만 실행")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--openai-latency", type=float, default=0.0, help="가짜 OpenAI 서버 응답 지연(초)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    plan = [(n, i) for n, i in stage_plan(args.iterations) if not args.only or args.only in n]
+    if not stubs.s3_available():
+        print("moto/boto3가 없어 S3 단계를 건너뜁니다.")
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg가 없어 증거 파일 인코딩 단계를 건너뜁니다.")
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+
+    print(f"{'stage':45} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>9} {'RSS MB':>8}")
+    with stubs.StubOpenAIServer(latency=args.openai_latency) as server:
+        for name, iterations in plan:
+            with ctx.Pool(1) as pool:
+                result = pool.apply(_run_stage, (name, iterations, args.warmup, server.base_url))
+            results[name] = result
+            rss = f"{result['peak_rss_mb']:8.1f}" if result["peak_rss_mb"] else "     n/a"
+            print(f"{name:45} {result['p50_ms']:8.2f}ms {result['p95_ms']:8.2f}ms "
+                  f"{result['p99_ms']:8.2f}ms {result['ops_per_sec']:9.1f} {rss}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.update_baseline:
+        baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"기준선 저장: {BASELINE_PATH}")
+        return 0
+
+    if not BASELINE_PATH.exists():
+        print(f"\n!!! 기준선이 없습니다: {BASELINE_PATH} !!!")
+        print("  같은 장비에서 --update-baseline 으로 먼저 기록하세요.")
+        return 1
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\n!!! 성능 회귀 감지 (허용 오차 {:.0%}) !!!".format(args.tolerance))
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\n기준선 대비 회귀 없음.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Streamlit 앱의 콜드 스타트 시간과 재실행(rerun) 오버헤드를 측정합니다.
+
+AppTest로 result.py를 헤드리스로 실행하여, 새 프로세스에서의 첫 실행 시간(콜드 스타트)과
+같은 프로세스에서 반복 실행할 때의 스크립트 실행 시간(위젯 상호작용마다 발생하는 재실행)을 잽니다.
+AppTest에는 브라우저 연결이 없으므로 녹음 위젯은 벤치마크용 대역(benchmarks.stubs.install_fake_webrtc)으로 바꿉니다.
+at.run()은 스크립트 오류를 예외로 올리지 않으므로, 실행마다 at.exception을 확인해 오류가 있으면
+시간을 보고하지 않고 종료 코드 1로 실패합니다.
+
+사용 예:
+    python benchmarks/startup.py                  # 현재 트리
+    python benchmarks/startup.py --rev baseline   # 특정 커밋의 result.py와 비교
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _measure_in_subprocess(script_path, reruns):
+    """새 파이썬 프로세스에서 콜드 스타트와 재실행 시간을 측정합니다."""
+    code = f"""
+import json, sys, time
+from benchmarks import stubs
+stubs.install_fake_webrtc()
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({str(script_path)!r}, default_timeout=600)
+
+def check(label):
+    if at.exception:
+        sys.exit(f"{{label}} 실행 중 스크립트 오류: {{at.exception[0].message}}")
+
+t1 = time.perf_counter()
+at.run()
+cold = time.perf_counter() - t1
+check("콜드 스타트")
+reruns = []
+for i in range({reruns}):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+    check(f"재실행 {{i + 1}}")
+print(json.dumps({{"framework_import": t1 - t0, "cold_start": cold, "reruns": reruns}}))
+"""
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env.setdefault("SOUND_DIR", tempfile.mkdtemp(prefix="voicedoc_sound_"))
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        lines = out.stderr.strip().splitlines()
+        sys.exit(f"{script_path.name}: {lines[-1] if lines else f'종료 코드 {out.returncode}'}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _script_for_rev(rev):
+    """지정한 커밋의 result.py를 임시 파일로 꺼냅니다."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:result.py"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    path = ROOT / f".startup_{rev.replace('/', '_')}.py"
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+def _report(label, result):
+    reruns_ms = [r * 1000 for r in result["reruns"]]
+    print(f"[{label}]")
+    print(f"  cold start      : {result['cold_start'] * 1000:8.1f} ms")
+    print(f"  rerun median    : {statistics.median(reruns_ms):8.1f} ms")
+    print(f"  rerun p95       : {sorted(reruns_ms)[int(len(reruns_ms) * 0.95) - 1]:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20, help="측정할 재실행 횟수")
+    parser.add_argument("--rev", help="비교할 git 리비전 (예: baseline 커밋 해시)")
+    args = parser.parse_args()
+
+    if args.rev:
+        before_path = _script_for_rev(args.rev)
+        try:
+            _report(f"before ({args.rev})", _measure_in_subprocess(before_path, args.reruns))
+        finally:
+            before_path.unlink()
+
+    _report("after (working tree)", _measure_in_subprocess(ROOT / "result.py", args.reruns))
+
+
+if __name__ == "__main__":
+    main()
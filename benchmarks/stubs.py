@@ -0,0 +1,246 @@
+"""벤치마크용 결정적(deterministic) 로컬 대역(stand-in).
+
+- StubOpenAIServer : /v1/chat/completions 를 흉내 내는 로컬 HTTP 서버
+- install_fake_gtts : 네트워크 없이 고정 mp3 바이트를 만드는 gTTS 대역
+- install_fake_webrtc : 세션 상태에 넣어 둔 WAV를 녹음 프레임으로 내보내는 streamlit-webrtc 대역
+- mock_s3          : moto 기반 가짜 S3 버킷
+- write_sine_wav   : 합성 WAV 녹음 파일
+"""
+import array
+import importlib.util
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import types
+import wave
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_PERSONAL_INFO = {
+    "name": "홍길동",
+    "rrn": "900101-1234567",
+    "address": "서울특별시 강남구 테헤란로 123",
+    "phone": "010-1234-5678",
+    "birthdate": "1990-01-01",
+    "employer": "XX수학 학원",
+}
+
+SAMPLE_TRANSCRIPT = "홍길동, XX수학 학원, 시급 만원, 아침 9시부터 6시까지, 서울특별시 강남구 테헤란로 123, 010-1234-5678"
+
+SAMPLE_BODY = "\n\n".join(
+    f"제{i}조 (근로 조건) 근로자 홍길동은 사용자 XX수학 학원과 다음과 같이 근로계약을 체결한다. "
+    "근무 시간은 오전 9시부터 오후 6시까지로 하며, 시급은 10,000원으로 한다."
+    for i in range(1, 13)
+)
+
+
+# OpenAI 프롬프트 캐시 규칙: 앞부분이 1024토큰 이상 같으면 128토큰 단위로 캐시됩니다.
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+
+class _StubOpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "stub")
+        server = self.server
+        time.sleep(server.model_latency.get(model, server.latency))
+
+        with server.lock:
+            server.calls[model] = server.calls.get(model, 0) + 1
+            every = server.fail_every.get(model)
+            fail = bool(every) and server.calls[model] % every == 0
+
+        if request.get("response_format", {}).get("type") == "json_object":
+            # 실패 응답은 원문에 없는 이름을 돌려줘 검증에 걸리게 합니다.
+            content = json.dumps(dict(SAMPLE_PERSONAL_INFO, name="김철수") if fail else SAMPLE_PERSONAL_INFO,
+                                 ensure_ascii=False)
+        else:
+            content = "" if fail else server.body
+        messages = request.get("messages", [])
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+
+        # 같은 시스템 메시지를 본 적이 있으면 그 길이만큼 캐시 적중으로 계산합니다.
+        prefix = messages[0].get("content", "") if messages else ""
+        with server.lock:
+            seen = prefix in server.prefixes
+            server.prefixes.add(prefix)
+        prefix_tokens = len(prefix) // 2
+        cached = 0
+        if seen and prefix_tokens >= CACHE_MIN_TOKENS:
+            cached = prefix_tokens // CACHE_BLOCK_TOKENS * CACHE_BLOCK_TOKENS
+
+        body = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars // 2,
+                "completion_tokens": len(content) // 2,
+                "total_tokens": prompt_chars // 2 + len(content) // 2,
+                "prompt_tokens_details": {"cached_tokens": cached},
+            },
+        }, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubOpenAIServer:
+    """OpenAI Chat Completions API를 흉내 내는 로컬 서버.
+
+    latency 초만큼 응답을 지연시켜 네트워크/모델 대기 시간을 재현할 수 있습니다.
+    model_latency로 모델별 지연을, fail_every로 모델별 n번째 응답마다 검증에 실패하는 응답을 지정합니다.
+    본문 생성 응답은 body (기본 SAMPLE_BODY)이며, 실행 중에도 httpd.body를 바꿀 수 있습니다.
+    """
+
+    def __init__(self, latency=0.0, model_latency=None, fail_every=None, body=SAMPLE_BODY):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenAIHandler)
+        self.httpd.body = body
+        self.httpd.latency = latency
+        self.httpd.model_latency = model_latency or {}
+        self.httpd.fail_every = fail_every or {}
+        self.httpd.calls = {}
+        self.httpd.prefixes = set()
+        self.httpd.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        os.environ["OPENAI_BASE_URL"] = self.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _FakeGTTS:
+    def __init__(self, text, lang="ko", **kwargs):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        # 실제 mp3 크기와 비슷하게 글자당 약 1KB
+        fp.write(b"ID3" + b"\x00" * (len(self.text.encode("utf-8")) * 340))
+
+
+def install_fake_gtts():
+    """gtts 모듈을 네트워크를 쓰지 않는 대역으로 교체합니다."""
+    module = types.ModuleType("gtts")
+    module.gTTS = _FakeGTTS
+    sys.modules["gtts"] = module
+
+
+# 세션 상태에서 가짜 녹음을 찾는 키: {webrtc 위젯 key: WAV 경로}
+FAKE_RECORDINGS_KEY = "_fake_webrtc_recordings"
+# 가짜 녹음 프레임 길이 (초)
+_FRAME_SECONDS = 0.02
+
+
+class _FakeAudioFrame:
+    """av.AudioFrame 중 recorder.py가 쓰는 부분 (to_ndarray, format.bytes, sample_rate, layout.channels)."""
+
+    def __init__(self, data, sample_width, sample_rate, channels):
+        self._samples = array.array("h", data)
+        self.format = types.SimpleNamespace(bytes=sample_width)
+        self.sample_rate = sample_rate
+        self.layout = types.SimpleNamespace(channels=[None] * channels)
+
+    def to_ndarray(self):
+        return self._samples
+
+
+def _wav_frames(path):
+    with wave.open(str(path), "rb") as wav:
+        params = wav.getsampwidth(), wav.getframerate(), wav.getnchannels()
+        data = wav.readframes(wav.getnframes())
+    step = int(params[1] * _FRAME_SECONDS) * params[0] * params[2]
+    return [_FakeAudioFrame(data[i:i + step], *params) for i in range(0, len(data), step)]
+
+
+def _fake_webrtc_streamer(key, **kwargs):
+    """첫 실행에서는 녹음 중 상태로 WAV 전체를 프레임으로 내보내고, 다음 실행부터는 녹음이 끝난 상태를 돌려줍니다.
+
+    AppTest는 브라우저와 WebRTC 연결이 없어 실제 위젯이 동작하지 않으므로
+    세션 상태(FAKE_RECORDINGS_KEY)에 넣어 둔 WAV를 재생한 것처럼 만듭니다.
+    """
+    import streamlit as st
+
+    recordings = st.session_state.get(FAKE_RECORDINGS_KEY) or {}
+    path = recordings.pop(key, None)
+    if path is None:
+        return types.SimpleNamespace(audio_receiver=None, state=types.SimpleNamespace(playing=False))
+    frames = _wav_frames(path)
+    receiver = types.SimpleNamespace(get_frames=lambda timeout=None: frames)
+    return types.SimpleNamespace(audio_receiver=receiver, state=types.SimpleNamespace(playing=True))
+
+
+def install_fake_webrtc():
+    """streamlit_webrtc 모듈을 세션 상태의 WAV를 녹음으로 내보내는 대역으로 교체합니다."""
+    module = types.ModuleType("streamlit_webrtc")
+    module.webrtc_streamer = _fake_webrtc_streamer
+    module.WebRtcMode = types.SimpleNamespace(SENDONLY="sendonly", SENDRECV="sendrecv", RECVONLY="recvonly")
+    sys.modules["streamlit_webrtc"] = module
+
+
+def s3_available():
+    """가짜 S3(moto, boto3)를 쓸 수 있는지 확인합니다."""
+    return all(importlib.util.find_spec(name) is not None for name in ("boto3", "moto"))
+
+
+@contextmanager
+def mock_s3(bucket_name="voicedoc-bench", region="ap-northeast-2"):
+    """moto로 가짜 S3 버킷을 만들고 S3 관련 환경 변수를 설정합니다."""
+    import boto3
+    from moto import mock_aws
+
+    os.environ.update({
+        "S3_BUCKET_NAME": bucket_name,
+        "S3_REGION": region,
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+    })
+    with mock_aws():
+        boto3.client("s3", region_name=region).create_bucket(
+            Bucket=bucket_name,
+            CreateBucketConfiguration={"LocationConstraint": region},
+        )
+        yield bucket_name
+
+
+def write_sine_wav(path, seconds, sample_rate=48000, freq=440.0, channels=1):
+    """고정된 사인파(말소리 대역의 진폭 변조 포함)로 WAV 파일을 만듭니다."""
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+        sample = int(12000 * envelope * math.sin(2 * math.pi * freq * t))
+        frames += struct.pack("<h", sample) * channels
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return str(path)
@@ -0,0 +1,244 @@
+"""음성 인식 백엔드 비교 벤치마크.
+
+고정된 한국어 녹음(benchmarks/fixtures/asr/*.wav)과 정답 문장(같은 이름의 .txt)으로
+백엔드·모델 크기·연산 정밀도 조합마다 실시간 배율(RTF = 처리 시간 / 오디오 길이),
+한국어 문자 오류율(CER), 모델 로딩 시간, 최대 RSS를 보고합니다.
+조합마다 새 프로세스에서 실행하므로 모델 메모리가 서로 섞이지 않습니다.
+
+사용 예:
+    python -m benchmarks.transcribers --make-fixtures          # gTTS로 고정 녹음 생성 (네트워크 필요)
+    python -m benchmarks.transcribers --models tiny,small --threads 4
+    python -m benchmarks.transcribers --backends faster-whisper --compute-types int8,float32
+    python -m benchmarks.transcribers --long-seconds 300 --workers 1,2,4,8   # 긴 녹음 분할 병렬 변환
+
+실제 사용자 녹음으로 비교하려면 --fixtures 폴더에 <이름>.wav 와 <이름>.txt 를 넣으면 됩니다.
+"""
+import argparse
+import json
+import multiprocessing
+import re
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "asr"
+
+FIXTURE_SENTENCES = {
+    "consent": "본인은 상기 내용을 확인하고 이에 동의합니다.",
+    "contract": "제 이름은 홍길동이고 XX수학 학원에서 일합니다. 시급은 만 원이고 아침 아홉 시부터 여섯 시까지 근무합니다.",
+    "address": "주소는 서울특별시 강남구 테헤란로 백이십삼이고 전화번호는 공일공 일이삼사 오육칠팔입니다.",
+    "resident": "주민등록등본 한 통을 발급받고 싶습니다. 생년월일은 천구백구십 년 일월 일일입니다.",
+}
+
+
+def make_fixtures(fixtures_dir):
+    """FIXTURE_SENTENCES를 gTTS로 읽어 16kHz 모노 WAV와 정답 텍스트로 저장합니다."""
+    from io import BytesIO
+
+    from gtts import gTTS
+    from pydub import AudioSegment
+
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    for name, sentence in FIXTURE_SENTENCES.items():
+        mp3 = BytesIO()
+        gTTS(text=sentence, lang="ko").write_to_fp(mp3)
+        mp3.seek(0)
+        audio = AudioSegment.from_file(mp3, format="mp3").set_frame_rate(16000).set_channels(1)
+        audio.export(fixtures_dir / f"{name}.wav", format="wav")
+        (fixtures_dir / f"{name}.txt").write_text(sentence, encoding="utf-8")
+        print(f"생성: {fixtures_dir / name}.wav")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_fixtures(fixtures_dir):
+    """(녹음 경로, 정답 문장, 길이(초)) 목록을 반환합니다."""
+    fixtures = []
+    for wavpath in sorted(fixtures_dir.glob("*.wav")):
+        reference = wavpath.with_suffix(".txt")
+        if not reference.exists():
+            continue
+        with wave.open(str(wavpath), "rb") as wav:
+            seconds = wav.getnframes() / wav.getframerate()
+        fixtures.append((str(wavpath), reference.read_text(encoding="utf-8").strip(), seconds))
+    return fixtures
+
+
+def _normalize(text):
+    """공백과 문장 부호를 지워 글자 단위로 비교할 수 있게 합니다."""
+    return re.sub(r"[\s\W_]+", "", text)
+
+
+def character_error_rate(reference, hypothesis):
+    """글자 단위 편집 거리 / 정답 글자 수."""
+    ref, hyp = _normalize(reference), _normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _run_config(backend, options, fixtures, repeat):
+    """자식 프로세스: 한 조합을 불러와 모든 녹음을 변환합니다."""
+    from voicedoc import transcribe
+
+    started = time.perf_counter()
+    transcriber = transcribe.get_transcriber(backend, **options)
+    load_seconds = time.perf_counter() - started
+
+    # 첫 변환은 워밍업 (지연 초기화 제외)
+    transcriber.transcribe(fixtures[0][0])
+
+    audio_seconds = busy_seconds = 0.0
+    errors = []
+    for wavpath, reference, seconds in fixtures:
+        for _ in range(repeat):
+            t = time.perf_counter()
+            result = transcriber.transcribe(wavpath)
+            busy_seconds += time.perf_counter() - t
+            audio_seconds += seconds
+        errors.append(character_error_rate(reference, result["text"]))
+
+    return {
+        "load_s": load_seconds,
+        "rtf": busy_seconds / audio_seconds if audio_seconds else 0.0,
+        "cer": sum(errors) / len(errors),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def make_long_recording(fixtures, seconds, path):
+    """녹음들을 무음 간격을 두고 이어 붙여 seconds 이상 길이의 녹음과 정답 문장을 만듭니다."""
+    from pydub import AudioSegment
+
+    gap = AudioSegment.silent(duration=800, frame_rate=16000)
+    audio = AudioSegment.silent(duration=0, frame_rate=16000)
+    references = []
+    while len(audio) < seconds * 1000:
+        for wavpath, reference, _ in fixtures:
+            audio += AudioSegment.from_file(wavpath).set_channels(1).set_frame_rate(16000) + gap
+            references.append(reference)
+    audio.export(path, format="wav")
+    return str(path), " ".join(references), len(audio) / 1000
+
+
+def _transcribe_whole(backend, options, wavpath):
+    """자식 프로세스: 나누지 않고 한 번에 변환한 시간(초)과 결과 문장을 반환합니다."""
+    from voicedoc import transcribe
+
+    transcriber = transcribe.get_transcriber(backend, **options)
+    started = time.perf_counter()
+    text = transcriber.transcribe(wavpath)["text"]
+    return time.perf_counter() - started, text
+
+
+def run_long(backend, options, fixtures, seconds, worker_counts):
+    """긴 녹음을 통째로, 그리고 프로세스 수별로 나눠 변환한 시간을 비교합니다."""
+    from voicedoc import chunked
+
+    workdir = Path(tempfile.mkdtemp(prefix="voicedoc_long_"))
+    wavpath, reference, length = make_long_recording(fixtures, seconds, workdir / "long.wav")
+    print(f"\n긴 녹음 {length:.0f}초, {backend}:{options['model_name']}")
+    print(f"{'mode':20} {'wall':>9} {'RTF':>7} {'CER':>7} {'speedup':>8}")
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        serial, text = pool.apply(_transcribe_whole, (backend, options, wavpath))
+    print(f"{'serial':20} {serial:8.1f}s {serial / length:7.3f} {character_error_rate(reference, text):7.1%} {1.0:7.2f}x")
+
+    for workers in worker_counts:
+        # 첫 실행은 풀 프로세스의 모델 로딩을 포함하므로 버립니다.
+        chunked.transcribe_chunked(wavpath, backend, options, workers=workers)
+        started = time.perf_counter()
+        text = chunked.transcribe_chunked(wavpath, backend, options, workers=workers)["text"]
+        wall = time.perf_counter() - started
+        chunked._get_pool(workers).shutdown()
+        print(f"{f'chunked x{workers}':20} {wall:8.1f}s {wall / length:7.3f} "
+              f"{character_error_rate(reference, text):7.1%} {serial / wall:7.2f}x")
+
+
+def config_plan(backends, models, compute_types, beam_size, threads, language):
+    """(이름, 백엔드, 설정) 목록을 반환합니다. compute_type은 faster-whisper에만 적용됩니다."""
+    plan = []
+    for backend in backends:
+        for model in models:
+            for compute_type in (compute_types if backend == "faster-whisper" else [None]):
+                options = {"model_name": model, "beam_size": beam_size, "threads": threads, "language": language}
+                name = f"{backend}:{model}"
+                if compute_type:
+                    options["compute_type"] = compute_type
+                    name += f":{compute_type}"
+                plan.append((name, backend, options))
+    return plan
+
+
+def main():
+    from voicedoc import transcribe
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--make-fixtures", action="store_true")
+    parser.add_argument("--backends", default=",".join(transcribe.BACKENDS))
+    parser.add_argument("--models", default=transcribe.WHISPER_MODEL_NAME)
+    parser.add_argument("--compute-types", default="int8", help="faster-whisper 연산 정밀도 목록 (쉼표 구분)")
+    parser.add_argument("--beam-size", type=int, default=transcribe.WHISPER_BEAM_SIZE)
+    parser.add_argument("--threads", type=int, default=transcribe.WHISPER_THREADS)
+    parser.add_argument("--language", default=transcribe.WHISPER_LANGUAGE or "")
+    parser.add_argument("--repeat", type=int, default=1, help="녹음별 반복 횟수")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--long-seconds", type=float, help="이 길이의 긴 녹음으로 분할 병렬 변환을 측정")
+    parser.add_argument("--workers", default="1,2,4", help="분할 변환 프로세스 수 목록 (쉼표 구분)")
+    args = parser.parse_args()
+
+    if args.make_fixtures:
+        make_fixtures(args.fixtures)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"녹음이 없습니다: {args.fixtures} (--make-fixtures 로 생성하세요)")
+        return 1
+    total = sum(seconds for _, _, seconds in fixtures)
+    print(f"녹음 {len(fixtures)}개, 총 {total:.1f}초\n")
+
+    plan = config_plan(args.backends.split(","), args.models.split(","), args.compute_types.split(","),
+                       args.beam_size, args.threads, args.language or None)
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+
+    print(f"{'backend':40} {'load':>8} {'RTF':>7} {'CER':>7} {'RSS MB':>8}")
+    for name, backend, options in plan:
+        if not transcribe.backend_available(backend):
+            print(f"{name:40} (설치되지 않음)")
+            continue
+        with ctx.Pool(1) as pool:
+            result = pool.apply(_run_config, (backend, options, fixtures, args.repeat))
+        results[name] = result
+        rss = f"{result['peak_rss_mb']:8.1f}" if result["peak_rss_mb"] else "     n/a"
+        print(f"{name:40} {result['load_s']:7.1f}s {result['rtf']:7.3f} {result['cer']:7.1%} {rss}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.long_seconds:
+        for name, backend, options in plan:
+            if transcribe.backend_available(backend):
+                run_long(backend, options, fixtures, args.long_seconds,
+                         [int(n) for n in args.workers.split(",")])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
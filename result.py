@@ -1,1169 +1,574 @@
-import streamlit as st
-from streamlit.components.v1 import html
-from cryptography.fernet import Fernet
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-from io import BytesIO
-import os
-import hashlib
-import base64
-import json
-import re
-from datetime import datetime
-from gtts import gTTS
-from streamlit_webrtc import webrtc_streamer, WebRtcMode, WebRtcStreamerContext
-from aiortc.contrib.media import MediaRecorder
-import soundfile as sf
-from pathlib import Path
-import time
-import pydub
-import whisper
-from openai import OpenAI
-
-# QR 코드 생성을 위한 라이브러리
-try:
-    import qrcode
-    from PIL import Image
-    from reportlab.platypus import Image as RLImage
-    QR_AVAILABLE = True
-except ImportError:
-    QR_AVAILABLE = False
-
-# AWS S3 업로드를 위한 라이브러리
-try:
-    import boto3
-    from botocore.exceptions import ClientError, NoCredentialsError
-    from boto3.exceptions import S3UploadFailedError
-    S3_AVAILABLE = True
-except ImportError:
-    S3_AVAILABLE = False
-
-# OpenAI 클라이언트 초기화
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# 한글 폰트 등록
-def register_korean_fonts():
-    """한글 폰트를 등록합니다."""
-    try:
-        font_paths = [
-            "C:/Windows/Fonts/malgun.ttf",  # 맑은 고딕
-            "C:/Windows/Fonts/gulim.ttc",   # 굴림
-            "C:/Windows/Fonts/batang.ttc",   # 바탕
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                if font_path.endswith('.ttf'):
-                    pdfmetrics.registerFont(TTFont('Korean', font_path))
-                    return 'Korean'
-                elif font_path.endswith('.ttc'):
-                    pdfmetrics.registerFont(TTFont('Korean', font_path, subfontIndex=0))
-                    return 'Korean'
-        
-        return 'Helvetica'
-    except Exception as e:
-        return 'Helvetica'
-
-KOREAN_FONT = register_korean_fonts()
-
-# 오디오 녹음 파일 저장 경로
-TMP_DIR = Path("C:/Users/shpup/OneDrive/문서/ddonggari/sound")
-if not TMP_DIR.exists():
-    TMP_DIR.mkdir(exist_ok=True, parents=True)
-
-if "wavpath" not in st.session_state:
-    cur_time = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
-    st.session_state["wavpath"] = str(TMP_DIR / f"{cur_time}.wav")
-
-wavpath = st.session_state["wavpath"]
-
-# 오디오 입력 설정
-MEDIA_STREAM_CONSTRAINTS = {
-    "video": False,
-    "audio": {
-        "echoCancellation": False,
-        "noiseSuppression": True,
-        "autoGainControl": True,
-    },
-}
-
-# 오디오 프레임 수집 -> pydub으로 저장
-def save_frames_from_audio_receiver(wavpath):
-    webrtc_ctx = webrtc_streamer(
-        key = "sendonly-audio",
-        mode = WebRtcMode.SENDONLY,
-        media_stream_constraints=MEDIA_STREAM_CONSTRAINTS,
-    )
-
-    if "audio_buffer" not in st.session_state:
-        st.session_state["audio_buffer"] = pydub.AudioSegment.empty()
-
-    # 무한 루프 제거: 한 번만 처리
-    if webrtc_ctx.audio_receiver:
-        try:
-            audio_frames = webrtc_ctx.audio_receiver.get_frames(timeout=1)
-            for audio_frame in audio_frames:
-                sound = pydub.AudioSegment(
-                    data=audio_frame.to_ndarray().tobytes(),
-                    sample_width=audio_frame.format.bytes,
-                    frame_rate=audio_frame.sample_rate,
-                    channels=len(audio_frame.layout.channels),
-                )
-                st.session_state["audio_buffer"] += sound
-        except Exception:
-            pass  # 타임아웃 등은 정상
-
-    # 녹음이 끝나면 버퍼를 WAV로 저장
-    audio_buffer = st.session_state["audio_buffer"]
-    if not webrtc_ctx.state.playing and len(audio_buffer) > 0:
-        audio_buffer.export(wavpath, format="wav")
-        st.session_state["audio_buffer"] = pydub.AudioSegment.empty()
-
-# 저장된 wav 파일 재생
-def display_wavfile(wavpath):
-    with open(wavpath, 'rb') as f:
-        audio_bytes = f.read()
-    file_type = Path(wavpath).suffix
-    st.audio(audio_bytes, format=f'audio/{file_type}', start_time=0)
-
-# ==========================================
-# [공용 함수] 텍스트 → 오디오 재생 함수
-# ==========================================
-def tts_play(text):
-    """문자를 음성(mp3)으로 생성 후 HTML로 재생"""
-    try:
-        tts = gTTS(text=text, lang='ko')
-        mp3 = BytesIO()
-        tts.write_to_fp(mp3)
-        mp3.seek(0)
-        b64 = base64.b64encode(mp3.read()).decode()
-
-        audio_html = f"""
-            <audio autoplay>
-                <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-            </audio>
-        """
-        st.markdown(audio_html, unsafe_allow_html=True)
-    except Exception as e:
-        st.error(f"오디오 재생 오류: {e}")
-
-# ==========================================
-# [gpt.py에서 가져온 함수들]
-# ==========================================
-
-def extract_personal_info(text):
-    """텍스트에서 개인정보를 추출합니다."""
-    prompt = f"""
-    다음 텍스트에서 개인정보를 추출해 JSON으로 정리해줘.
-
-    반드시 아래 key만 사용해서 JSON으로 출력해.
-    없는 값은 "" (빈 문자열) 로 넣어.
-
-    keys:
-    - name
-    - rrn
-    - address
-    - phone
-    - birthdate
-    - employer
-
-    텍스트:
-    {text}
-    """
-
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "당신은 개인정보 정보를 정리하고, 반드시 JSON 형식으로만 응답해야 합니다."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format={"type": "json_object"}
-    )
-
-    result_text = response.choices[0].message.content.strip()
-    try:
-        result_json = json.loads(result_text)
-    except json.JSONDecodeError as e:
-        st.error(f"JSON 파싱 실패: {e}")
-        raise
-
-    return result_json
-
-def generate_document_content(info_json, doc_type="근로계약서"):
-    """개인정보를 바탕으로 문서 내용을 생성합니다."""
-    info_str = json.dumps(info_json, indent=2, ensure_ascii=False)
-    
-    doc_type_prompts = {
-        "개인정보 제공 동의서": "당신은 개인정보 제공 동의서의 본문 내용을 작성하는 전문가입니다. 제공된 개인 정보를 바탕으로 동의서에 들어갈 본문 내용만 작성하세요. 동의 목적, 항목, 기간 등을 설명하는 본문 내용을 공식적인 용어로 작성하세요. 형식이나 구조는 작성하지 말고, 본문 내용에만 집중하세요.",
-        "주민등록등본 발급 신청서": "당신은 주민등록등본 발급 신청서의 신청 사유 및 내용을 작성하는 전문가입니다. 제공된 개인 정보를 바탕으로 신청서에 들어갈 신청 사유와 내용만 작성하세요. 신청 사유 및 목적을 법적 근거를 바탕으로 공식적인 문체로 작성하세요. 형식이나 구조는 작성하지 말고, 본문 내용에만 집중하세요.",
-        "주민등록등본 신청서": "당신은 주민등록등본 발급 신청서의 신청 사유 및 내용을 작성하는 전문가입니다. 제공된 개인 정보를 바탕으로 신청서에 들어갈 신청 사유와 내용만 작성하세요. 신청 사유 및 목적을 법적 근거를 바탕으로 공식적인 문체로 작성하세요. 형식이나 구조는 작성하지 말고, 본문 내용에만 집중하세요.",
-        "근로계약서": "당신은 근로계약서의 근로 조건 및 내용을 작성하는 전문가입니다. 제공된 개인 정보를 바탕으로 근로계약서에 들어갈 근로 조건, 직무 내용, 급여 등 본문 내용만 작성하세요. 표준 근로계약서의 핵심 조항(직무, 급여, 근무 시간)에 대한 내용을 법률 용어와 객관적 사실만을 사용하여 작성하세요. 형식이나 구조는 작성하지 말고, 본문 내용에만 집중하세요."
-    }
-    
-    system_prompt = doc_type_prompts.get(doc_type, f"당신은 {doc_type}의 본문 내용을 작성하는 전문가입니다. 제공된 개인 정보를 활용하여 문서에 들어갈 본문 내용만 작성하세요. 형식이나 구조는 작성하지 말고, 본문 내용에만 집중하세요.")
-
-    prompt = f"""
-다음 개인 정보를 활용하여 "{doc_type}"에 들어갈 본문 내용을 작성해주세요.
-
-**작성 지침:**
-1. 제공된 개인 정보를 정확하게 반영하세요.
-2. 문서의 형식이나 구조는 작성하지 말고, 본문 내용만 작성하세요.
-3. 자연스럽고 읽기 쉬운 문장으로 작성하세요.
-4. 개인 정보가 없는 항목은 적절히 처리하거나 생략하세요.
-5. 문서 유형에 맞는 적절한 톤과 스타일을 유지하세요.
-
-**개인 정보:**
-{info_str}
-
-위 정보를 바탕으로 {doc_type}의 본문 내용만 작성해주세요.
-"""
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5,
-            max_tokens=2000
-        )
-        
-        document_content = response.choices[0].message.content.strip()
-        return document_content
-    
-    except Exception as e:
-        st.error(f"문서 생성 중 오류 발생: {e}")
-        raise
-
-def calculate_document_hash(filepath):
-    """PDF 파일의 해시값을 계산합니다."""
-    try:
-        with open(filepath, 'rb') as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
-        return file_hash
-    except Exception as e:
-        return None
-
-def generate_qr_code(data, output_file='qrcode.png', size=200):
-    """QR 코드를 생성합니다."""
-    if not QR_AVAILABLE:
-        return None
-    
-    try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        img = img.resize((size, size), Image.Resampling.LANCZOS)
-        img.save(output_file)
-        
-        return output_file
-    except Exception as e:
-        return None
-
-def upload_audio_to_s3(audio_filepath, bucket_name=None, s3_key=None, region='ap-northeast-2'):
-    """음성 파일을 AWS S3에 업로드하고 공개 URL을 반환합니다."""
-    if not S3_AVAILABLE:
-        return None
-    
-    if not os.path.exists(audio_filepath):
-        return None
-    
-    if not bucket_name:
-        bucket_name = os.getenv("S3_BUCKET_NAME")
-    
-    if region == 'ap-northeast-2':
-        region = os.getenv("S3_REGION") or os.getenv("AWS_DEFAULT_REGION") or region
-    
-    if not bucket_name:
-        return None
-    
-    if not s3_key:
-        date_folder = datetime.now().strftime("%Y/%m/%d")
-        filename = os.path.basename(audio_filepath)
-        s3_key = f"audio/{date_folder}/{filename}"
-    
-    try:
-        aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
-        aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-        
-        if aws_access_key_id and aws_secret_access_key:
-            s3_client = boto3.client(
-                's3',
-                region_name=region,
-                aws_access_key_id=aws_access_key_id,
-                aws_secret_access_key=aws_secret_access_key
-            )
-        else:
-            s3_client = boto3.client('s3', region_name=region)
-        
-        try:
-            s3_client.upload_file(
-                audio_filepath,
-                bucket_name,
-                s3_key,
-                ExtraArgs={
-                    'ContentType': 'audio/wav',
-                    'ACL': 'public-read'
-                }
-            )
-        except (ClientError, S3UploadFailedError) as acl_error:
-            error_str = str(acl_error)
-            if 'AccessControlListNotSupported' in error_str or 'InvalidRequest' in error_str:
-                s3_client.upload_file(
-                    audio_filepath,
-                    bucket_name,
-                    s3_key,
-                    ExtraArgs={
-                        'ContentType': 'audio/wav'
-                    }
-                )
-            else:
-                raise
-        
-        public_url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{s3_key}"
-        return public_url
-        
-    except Exception as e:
-        return None
-
-def upload_audio_to_web_server(audio_filepath, base_url=None):
-    """음성 파일을 웹 서버에 업로드하고 공개 URL을 반환합니다."""
-    s3_url = upload_audio_to_s3(audio_filepath)
-    if s3_url:
-        return s3_url
-    
-    if not os.path.exists(audio_filepath):
-        return None
-    
-    if not base_url:
-        base_url = os.getenv("WEB_SERVER_URL", "https://example.com/audio")
-    
-    filename = os.path.basename(audio_filepath)
-    public_url = f"{base_url.rstrip('/')}/{filename}"
-    
-    return public_url
-
-def get_audio_file_url(audio_filepath, use_web_url=True):
-    """음성 파일의 접근 가능한 URL을 생성합니다."""
-    if use_web_url:
-        web_url = upload_audio_to_web_server(audio_filepath)
-        if web_url:
-            return web_url
-    
-    if os.path.exists(audio_filepath):
-        return os.path.abspath(audio_filepath)
-    return audio_filepath
-
-def create_voice_signature(document_content, pdf_filepath, audio_filepath='recorded_audio.wav'):
-    """음성 서명 데이터를 생성합니다."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    document_hash = calculate_document_hash(pdf_filepath) if os.path.exists(pdf_filepath) else None
-    
-    audio_file_size = os.path.getsize(audio_filepath) if os.path.exists(audio_filepath) else 0
-    audio_file_url = os.path.abspath(audio_filepath) if os.path.exists(audio_filepath) else None
-    
-    voice_signature = {
-        "timestamp": timestamp,
-        "document_hash": document_hash,
-        "audio_file_path": audio_file_url,
-        "audio_file_size": audio_file_size,
-        "consent_phrase": "본인은 상기 내용을 확인하고 이에 동의합니다."
-    }
-    
-    return voice_signature
-
-def save_voice_signature(voice_signature, output_dir="documents"):
-    """음성 서명 데이터를 JSON 파일로 저장합니다."""
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    signature_file = os.path.join(output_dir, f"voice_signature_{timestamp_str}.json")
-    
-    with open(signature_file, 'w', encoding='utf-8') as f:
-        json.dump(voice_signature, f, indent=2, ensure_ascii=False)
-    
-    return signature_file
-
-def generate_document(info_json, doc_type="근로계약서", save_file=True, output_dir="documents"):
-    """추출된 JSON 정보와 문서 유형을 바탕으로 문서를 생성하고 파일로 저장합니다."""
-    document_content = generate_document_content(info_json, doc_type)
-    
-    if save_file:
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        name = info_json.get("name", "Unknown")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{doc_type}_{timestamp}.pdf"
-        filepath = os.path.join(output_dir, filename)
-        
-        with open(filepath, 'wb') as f:
-            create_document_pdf(document_content, doc_type, info_json, f, voice_signature=None)
-        
-        return document_content, filepath
-    
-    return document_content, None
-
-def get_pdf_styles():
-    """모든 PDF 스타일을 중앙에서 정의하고 반환합니다."""
-    styles = getSampleStyleSheet()
-    
-    pdf_styles = {
-        'DocTitle': ParagraphStyle(
-            'DocTitle',
-            parent=styles['Heading1'],
-            fontName=KOREAN_FONT,
-            fontSize=16,
-            textColor='#000000',
-            spaceAfter=15,
-            alignment=TA_CENTER
-        ),
-        'TableLabelStyle': ParagraphStyle(
-            'TableLabelStyle',
-            parent=styles['Normal'],
-            fontName=KOREAN_FONT,
-            fontSize=10,
-            textColor='#000000',
-            alignment=TA_LEFT
-        ),
-        'TableValueStyle': ParagraphStyle(
-            'TableValueStyle',
-            parent=styles['Normal'],
-            fontName=KOREAN_FONT,
-            fontSize=10,
-            textColor='#000000',
-            alignment=TA_LEFT
-        ),
-        'ContentStyle': ParagraphStyle(
-            'ContentStyle',
-            parent=styles['Normal'],
-            fontName=KOREAN_FONT,
-            fontSize=10,
-            leading=14,
-            textColor='#000000',
-            alignment=TA_LEFT
-        ),
-        'GenericTitle': ParagraphStyle(
-            'GenericTitle',
-            parent=styles['Heading1'],
-            fontName=KOREAN_FONT,
-            fontSize=18,
-            textColor='#000000',
-            spaceAfter=12,
-            alignment=TA_CENTER
-        ),
-        'GenericBody': ParagraphStyle(
-            'GenericBody',
-            parent=styles['Normal'],
-            fontName=KOREAN_FONT,
-            fontSize=11,
-            leading=18,
-            textColor='#000000',
-            spaceAfter=6,
-            alignment=TA_JUSTIFY
-        )
-    }
-    
-    return pdf_styles
-
-PDF_STYLES = get_pdf_styles()
-
-def create_paragraph(text, style_name):
-    """Paragraph 객체를 생성하는 헬퍼 함수."""
-    if not text:
-        text = ""
-    
-    text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'\*([^*]+)\*', r'<b>\1</b>', text)
-    
-    tag_placeholders = {}
-    protected_text = text
-    tag_counter = 0
-    
-    def replace_tag(match):
-        nonlocal tag_counter
-        tag = match.group(0)
-        placeholder = f'__HTML_TAG_{tag_counter}__'
-        tag_placeholders[placeholder] = tag
-        tag_counter += 1
-        return placeholder
-    
-    protected_text = re.sub(r'<[^>]+>', replace_tag, protected_text)
-    escaped_text = protected_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-    
-    for placeholder, tag in tag_placeholders.items():
-        escaped_text = escaped_text.replace(placeholder, tag)
-    
-    escaped_text = escaped_text.replace('\n', '<br/>')
-    
-    style = PDF_STYLES.get(style_name, PDF_STYLES['GenericBody'])
-    return Paragraph(escaped_text, style)
-
-def create_application_form_pdf(content, doc_type, info_json, buffer, voice_signature=None):
-    """신청서 형식의 구조화된 PDF를 생성합니다."""
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=25*mm,
-        leftMargin=25*mm,
-        topMargin=20*mm,
-        bottomMargin=20*mm
-    )
-    
-    story = []
-    
-    # 제목
-    story.append(create_paragraph(f"<b>{doc_type}</b>", 'DocTitle'))
-    story.append(Spacer(1, 10*mm))
-    
-    # 개인정보 테이블
-    data = [
-        [create_paragraph("<b>항목</b>", 'TableLabelStyle'), 
-         create_paragraph("<b>내용</b>", 'TableLabelStyle')],
-        [create_paragraph("성명", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("name", ""), 'TableValueStyle')],
-        [create_paragraph("생년월일", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("birthdate", ""), 'TableValueStyle')],
-        [create_paragraph("주민등록번호", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("rrn", ""), 'TableValueStyle')],
-        [create_paragraph("주소", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("address", ""), 'TableValueStyle')],
-        [create_paragraph("연락처", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("phone", ""), 'TableValueStyle')],
-    ]
-    
-    if info_json.get("employer") and doc_type != "주민등록등본 발급 신청서" and doc_type != "주민등록등본 신청서":
-        data.append([
-            create_paragraph("회사명", 'TableLabelStyle'), 
-            create_paragraph(info_json.get("employer", ""), 'TableValueStyle')
-        ])
-    
-    table = Table(data, colWidths=[40*mm, 120*mm])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), KOREAN_FONT),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-        ('TOPPADDING', (0, 0), (-1, 0), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    
-    story.append(table)
-    story.append(Spacer(1, 10*mm))
-    
-    # 신청 사유/내용 섹션
-    story.append(create_paragraph("<b>■ 신청 사유 및 내용</b>", 'TableLabelStyle'))
-    story.append(Spacer(1, 5*mm))
-    
-    content_data = [
-        [create_paragraph(content, 'ContentStyle')]
-    ]
-    content_table = Table(content_data, colWidths=[160*mm])
-    content_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    
-    story.append(content_table)
-    story.append(Spacer(1, 15*mm))
-    
-    # 전자 서명 메타데이터 서명란
-    if voice_signature:
-        story.append(create_paragraph("<b>■ 전자 서명 및 증거 메타데이터</b>", 'TableLabelStyle'))
-        story.append(Spacer(1, 5*mm))
-        
-        metadata_rows = []
-        signer_name = info_json.get("name", "미상")
-        metadata_rows.append([
-            create_paragraph("전자 서명 주체", 'TableLabelStyle'),
-            create_paragraph(f"신청인: {signer_name} (음성 동의 완료)", 'TableValueStyle')
-        ])
-        
-        timestamp = voice_signature.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        metadata_rows.append([
-            create_paragraph("전자 서명 일시", 'TableLabelStyle'),
-            create_paragraph(timestamp, 'TableValueStyle')
-        ])
-        
-        doc_hash = voice_signature.get("document_hash", "")
-        if doc_hash:
-            hash_display = f"{doc_hash[:16]}...{doc_hash[-8:]}"
-            metadata_rows.append([
-                create_paragraph("문서 해시", 'TableLabelStyle'),
-                create_paragraph(f"SHA-256: {hash_display}", 'TableValueStyle')
-            ])
-        
-        # QR 코드 생성 및 삽입
-        audio_url = get_audio_file_url(voice_signature.get("audio_file_path", ""), use_web_url=True)
-        if audio_url and QR_AVAILABLE:
-            qr_file = os.path.join(".", f"qr_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            qr_path = generate_qr_code(audio_url, output_file=qr_file, size=150)
-            
-            if qr_path and os.path.exists(qr_path):
-                try:
-                    qr_image = RLImage(qr_path, width=40*mm, height=40*mm)
-                    metadata_rows.append([
-                        create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
-                        qr_image
-                    ])
-                except Exception:
-                    metadata_rows.append([
-                        create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
-                        create_paragraph("QR 코드 생성 실패", 'TableValueStyle')
-                    ])
-        
-        if metadata_rows:
-            metadata_table = Table(metadata_rows, colWidths=[50*mm, 110*mm])
-            metadata_table.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('LEFTPADDING', (0, 0), (-1, -1), 5),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-            ]))
-            story.append(metadata_table)
-    
-    doc.build(story)
-
-def create_employment_contract_pdf(content, doc_type, info_json, buffer, voice_signature=None):
-    """근로계약서 형식의 구조화된 PDF를 생성합니다."""
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=25*mm,
-        leftMargin=25*mm,
-        topMargin=20*mm,
-        bottomMargin=20*mm
-    )
-    
-    story = []
-    
-    # 제목
-    story.append(create_paragraph(f"<b>{doc_type}</b>", 'DocTitle'))
-    story.append(Spacer(1, 10*mm))
-    
-    # 당사자 정보 테이블
-    party_data = [
-        [create_paragraph("<b>구분</b>", 'TableLabelStyle'), 
-         create_paragraph("<b>성명(상호)</b>", 'TableLabelStyle'), 
-         create_paragraph("<b>주소</b>", 'TableLabelStyle'), 
-         create_paragraph("<b>연락처</b>", 'TableLabelStyle')],
-        [create_paragraph("근로자", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("name", ""), 'TableValueStyle'),
-         create_paragraph(info_json.get("address", ""), 'TableValueStyle'), 
-         create_paragraph(info_json.get("phone", ""), 'TableValueStyle')],
-        [create_paragraph("사용자", 'TableLabelStyle'), 
-         create_paragraph(info_json.get("employer", ""), 'TableValueStyle'),
-         create_paragraph("", 'TableValueStyle'), 
-         create_paragraph("", 'TableValueStyle')],
-    ]
-    
-    party_table = Table(party_data, colWidths=[30*mm, 50*mm, 60*mm, 40*mm])
-    party_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), KOREAN_FONT),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-        ('TOPPADDING', (0, 0), (-1, 0), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    
-    story.append(party_table)
-    story.append(Spacer(1, 10*mm))
-    
-    # 근로 조건 및 내용
-    story.append(create_paragraph("<b>■ 근로 조건 및 내용</b>", 'TableLabelStyle'))
-    story.append(Spacer(1, 5*mm))
-    
-    content_data = [
-        [create_paragraph(content, 'ContentStyle')]
-    ]
-    content_table = Table(content_data, colWidths=[160*mm])
-    content_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    
-    story.append(content_table)
-    story.append(Spacer(1, 15*mm))
-    
-    # 전자 서명 메타데이터 서명란
-    if voice_signature:
-        story.append(create_paragraph("<b>■ 전자 서명 및 증거 메타데이터</b>", 'TableLabelStyle'))
-        story.append(Spacer(1, 5*mm))
-        
-        metadata_rows = []
-        signer_name = info_json.get("name", "미상")
-        metadata_rows.append([
-            create_paragraph("전자 서명 주체", 'TableLabelStyle'),
-            create_paragraph(f"근로자: {signer_name} (음성 동의 완료)", 'TableValueStyle')
-        ])
-        
-        timestamp = voice_signature.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        metadata_rows.append([
-            create_paragraph("전자 서명 일시", 'TableLabelStyle'),
-            create_paragraph(timestamp, 'TableValueStyle')
-        ])
-        
-        doc_hash = voice_signature.get("document_hash", "")
-        if doc_hash:
-            hash_display = f"{doc_hash[:16]}...{doc_hash[-8:]}"
-            metadata_rows.append([
-                create_paragraph("문서 해시", 'TableLabelStyle'),
-                create_paragraph(f"SHA-256: {hash_display}", 'TableValueStyle')
-            ])
-        
-        # QR 코드 생성 및 삽입
-        audio_url = get_audio_file_url(voice_signature.get("audio_file_path", ""), use_web_url=True)
-        if audio_url and QR_AVAILABLE:
-            qr_file = os.path.join(".", f"qr_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            qr_path = generate_qr_code(audio_url, output_file=qr_file, size=150)
-            
-            if qr_path and os.path.exists(qr_path):
-                try:
-                    qr_image = RLImage(qr_path, width=40*mm, height=40*mm)
-                    metadata_rows.append([
-                        create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
-                        qr_image
-                    ])
-                except Exception:
-                    metadata_rows.append([
-                        create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
-                        create_paragraph("QR 코드 생성 실패", 'TableValueStyle')
-                    ])
-        
-        if metadata_rows:
-            metadata_table = Table(metadata_rows, colWidths=[50*mm, 110*mm])
-            metadata_table.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('LEFTPADDING', (0, 0), (-1, -1), 5),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-            ]))
-            story.append(metadata_table)
-    
-    doc.build(story)
-
-def create_document_pdf(content, doc_type, info_json, output, voice_signature=None):
-    """doc_type에 따라 적절한 PDF 템플릿 함수를 호출합니다.
-    
-    Args:
-        output: BytesIO 버퍼 또는 파일 경로 (문자열)
-    """
-    if doc_type in ["개인정보 제공 동의서", "주민등록등본 발급 신청서", "주민등록등본 신청서"]:
-        create_application_form_pdf(content, doc_type, info_json, output, voice_signature)
-    elif doc_type == "근로계약서":
-        create_employment_contract_pdf(content, doc_type, info_json, output, voice_signature)
-    else:
-        # 기본 템플릿
-        doc = SimpleDocTemplate(
-            output,
-            pagesize=A4,
-            rightMargin=30*mm,
-            leftMargin=30*mm,
-            topMargin=30*mm,
-            bottomMargin=30*mm
-        )
-        
-        story = []
-        story.append(create_paragraph(f"<b>{doc_type}</b>", 'GenericTitle'))
-        story.append(Spacer(1, 20*mm))
-        
-        paragraphs = content.split('\n\n')
-        for para in paragraphs:
-            if para.strip():
-                story.append(create_paragraph(para, 'GenericBody'))
-                story.append(Spacer(1, 6))
-        
-        doc.build(story)
-
-# ==========================================
-# [0] 기본 페이지 설정 및 초기화
-# ==========================================
-st.set_page_config(page_title="Accessible Voice PDF", layout="centered")
-
-st.markdown(
-    """
-    <style>
-    .big-btn { font-size:20px; padding:18px 24px; border-radius:12px; cursor:pointer; }
-    .high-contrast { background-color:#0B5FFF; color: #FFFFFF; border:none; }
-    .guide-box { background-color:#e8f0fe; padding:15px; border-radius:10px; border: 1px solid #0B5FFF; margin-bottom: 20px;}
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-st.title("말하는대로") 
-
-# 세션 상태 변수 초기화
-if 'plain_text' not in st.session_state:
-    st.session_state.plain_text = ""
-
-if 'system_key' not in st.session_state:
-    st.session_state.system_key = Fernet.generate_key()
-
-if 'encrypted_text' not in st.session_state:
-    st.session_state.encrypted_text = ""
-
-if 'personal_info' not in st.session_state:
-    st.session_state.personal_info = None
-
-if 'document_content' not in st.session_state:
-    st.session_state.document_content = None
-
-if 'voice_signature' not in st.session_state:
-    st.session_state.voice_signature = None
-
-if 'pdf_filepath' not in st.session_state:
-    st.session_state.pdf_filepath = None
-
-# ==========================================
-# [1단계] 서류 종류 선택
-# ==========================================
-st.header("[1단계] 서류 종류 선택")
-
-if st.button("🔊 1단계 안내 듣기"):
-    tts_play("1단계입니다. 작성할 서류 종류를 선택해주세요.")
-
-template_options = {
-    "근로계약서": {
-        "guide": "[📢입력 가이드]\n\n이 서류는 '이름', '근무지', '시급', '근무시간' 순서로 말씀해 주세요.\n\n예시: 홍길동, XX수학 학원, 시급 만원, 아침 9시부터 6시까지"
-    },
-    "주민등록등본 신청서": {
-        "guide": "[📢입력 가이드]\n\n이 서류는 '성명', '거주지 주소', '주민등록번호' 순서로 말씀해 주세요.\n\n예시: 오지헌, 대구 북구, 950101-1234567"
-    },
-    "개인정보 제공 동의서": {
-        "guide": "[📢입력 가이드]\n\n이 서류는 '성명', '생년월일', '주소', '연락처' 순서로 말씀해 주세요.\n\n예시: 홍길동, 1990년 1월 1일, 서울시 강남구, 010-1234-5678"
-    }
-}
-
-selected_template = st.selectbox("작성할 서류 종류를 선택하세요.", list(template_options.keys()))
-st.markdown(f"""<div class="guide-box">{template_options[selected_template]['guide']}</div>""", unsafe_allow_html=True)
-
-# [2단계] 개인정보 음성 입력
-st.markdown("---")
-st.header("[2단계] 개인정보 음성 입력")
-
-st.markdown("### 오디오 녹음")
-save_frames_from_audio_receiver(wavpath)
-
-# 녹음된 파일이 있으면 재생
-if Path(wavpath).exists():
-    st.markdown(f"**녹음 파일:** {wavpath}")
-    display_wavfile(wavpath)
-    
-    # Whisper 변환 버튼
-    col1, col2 = st.columns([1, 1])
-    with col1:
-        if st.button("🎤 Whisper로 텍스트 변환", key="whisper_convert", help="녹음된 오디오를 텍스트로 변환합니다."):
-            with st.spinner("Whisper 모델 로딩 및 변환 중..."):
-                try:
-                    if "whisper_model" not in st.session_state:
-                        st.session_state.whisper_model = whisper.load_model("small")
-                    model = st.session_state.whisper_model
-                    result = model.transcribe(str(wavpath))
-                    transcribed_text = result["text"]
-                    st.session_state["voice_text"] = transcribed_text
-                    st.success("✅ 변환 완료")
-                except Exception as e:
-                    st.error(f"❌ 변환 중 오류 발생: {str(e)}")
-    with col2:
-        if st.button("🔄 녹음 초기화", key="reset_recording", help="녹음을 초기화합니다."):
-            if "audio_buffer" in st.session_state:
-                st.session_state["audio_buffer"] = pydub.AudioSegment.empty()
-            cur_time = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
-            st.session_state["wavpath"] = str(TMP_DIR / f"{cur_time}.wav")
-            st.rerun()
-
-# 음성에서 가져온 텍스트 표시
-st.markdown("### 음성에서 가져온 텍스트")
-if st.session_state.get("voice_text"):
-    st.text_area("Recognized text (from voice)", value=st.session_state.get("voice_text", ""), key="voice_text", height=140, label_visibility="collapsed")
-else:
-    st.text_area("Recognized text (from voice)", value="", key="voice_text", height=140, label_visibility="collapsed",
-                 help="위의 녹음 후 'Whisper로 텍스트 변환' 버튼을 누르거나 직접 입력하세요.")
-
-input_text = st.text_area("📝 음성 입력 결과 붙여넣기 또는 직접 입력:", height=100, help="입력 후 '개인정보 추출' 버튼을 눌러주세요.")
-
-# 개인정보 추출 버튼
-if st.button("🔍 개인정보 추출하기", type="primary", use_container_width=True):
-    if not input_text:
-        st.warning("⚠️ 텍스트를 입력해주세요.")
-    else:
-        with st.spinner("개인정보 추출 중..."):
-            try:
-                personal_info = extract_personal_info(input_text)
-                st.session_state.personal_info = personal_info
-                st.session_state.plain_text = input_text
-                
-                # 자동 암호화
-                cipher = Fernet(st.session_state.system_key)
-                encrypted_bytes = cipher.encrypt(input_text.encode())
-                st.session_state.encrypted_text = encrypted_bytes.decode()
-                
-                st.success("✅ 개인정보 추출 완료!")
-                st.json(personal_info)
-                
-                # 문서 생성
-                with st.spinner("문서 내용 생성 중..."):
-                    document_content = generate_document_content(personal_info, selected_template)
-                    st.session_state.document_content = document_content
-                    st.success("✅ 문서 내용 생성 완료!")
-                    
-            except Exception as e:
-                st.error(f"❌ 오류 발생: {str(e)}")
-
-# ==========================================
-# [3단계] 서류 확인 및 PDF 생성
-# ==========================================
-st.markdown("---")
-st.header("[3단계] 서류 확인 및 다운로드")
-
-if st.button("🔊 3단계 안내 듣기"):
-    tts_play("3단계입니다. 생성된 문서를 확인하고, PDF 생성 버튼을 눌러 서류를 다운로드하세요.")
-
-if not st.session_state.document_content:
-    st.info("☝️ 위 2단계에서 개인정보를 추출하고 문서를 생성해주세요.")
-else:
-    st.caption("📄 생성된 문서 내용:")
-    st.text_area("문서 내용", value=st.session_state.document_content, height=200, disabled=True)
-
-    # 파일 저장 옵션
-    save_to_file = st.checkbox("💾 파일로 저장하기", value=False, help="PDF를 로컬 파일로 저장합니다.")
-    output_dir = "documents" if save_to_file else None
-    
-    # PDF 생성 버튼
-    if st.button("📄 PDF 서류 생성하기", type="primary", use_container_width=True):
-        if not st.session_state.personal_info or not st.session_state.document_content:
-            st.error("PDF로 만들 데이터가 없습니다.")
-        else:
-            try:
-                if save_to_file:
-                    # 파일로 저장
-                    document_content, filepath = generate_document(
-                        st.session_state.personal_info,
-                        selected_template,
-                        save_file=True,
-                        output_dir=output_dir
-                    )
-                    st.session_state.pdf_filepath = filepath
-                    
-                    # 파일 내용 읽기
-                    with open(filepath, 'rb') as f:
-                        pdf_bytes = f.read()
-                    
-                    st.success(f"✅ PDF 생성 및 저장 완료! 파일: {filepath}")
-                    st.download_button(
-                        "📥 PDF 다운로드", 
-                        data=pdf_bytes, 
-                        file_name=os.path.basename(filepath), 
-                        mime="application/pdf", 
-                        use_container_width=True
-                    )
-                else:
-                    # 메모리 버퍼로 생성
-                    buffer = BytesIO()
-                    create_document_pdf(
-                        st.session_state.document_content,
-                        selected_template,
-                        st.session_state.personal_info,
-                        buffer,
-                        voice_signature=st.session_state.voice_signature
-                    )
-                    buffer.seek(0)
-
-                    st.success("✅ PDF 생성 완료!")
-                    st.download_button(
-                        "📥 PDF 다운로드", 
-                        data=buffer.getvalue(), 
-                        file_name=f"{selected_template}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", 
-                        mime="application/pdf", 
-                        use_container_width=True
-                    )
-
-            except Exception as e:
-                st.error(f"PDF 생성 중 오류: {str(e)}")
-                import traceback
-                st.code(traceback.format_exc())
-
-    # ==========================================
-    # [4단계] 음성 서명 (선택)
-    # ==========================================
-    st.markdown("---")
-    st.header("[4단계] 음성 서명 (선택)")
-    
-    use_voice_signature = st.checkbox("🎤 음성 서명 사용하기", value=False, help="음성 서명을 PDF에 포함시킵니다.")
-    
-    if use_voice_signature:
-        st.markdown("### 음성 동의 녹음")
-        st.info("💡 '본인은 상기 내용을 확인하고 이에 동의합니다.' 라고 말씀해주세요.")
-        
-        # 음성 서명용 녹음 경로
-        if "signature_wavpath" not in st.session_state:
-            cur_time = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
-            st.session_state["signature_wavpath"] = str(TMP_DIR / f"signature_{cur_time}.wav")
-        
-        signature_wavpath = st.session_state["signature_wavpath"]
-        
-        # 음성 서명용 별도 녹음 (기존 녹음과 분리)
-        def save_signature_audio(wavpath):
-            webrtc_ctx = webrtc_streamer(
-                key="signature-audio",
-                mode=WebRtcMode.SENDONLY,
-                media_stream_constraints=MEDIA_STREAM_CONSTRAINTS,
-            )
-
-            if "signature_audio_buffer" not in st.session_state:
-                st.session_state["signature_audio_buffer"] = pydub.AudioSegment.empty()
-
-            if webrtc_ctx.audio_receiver:
-                try:
-                    audio_frames = webrtc_ctx.audio_receiver.get_frames(timeout=1)
-                    for audio_frame in audio_frames:
-                        sound = pydub.AudioSegment(
-                            data=audio_frame.to_ndarray().tobytes(),
-                            sample_width=audio_frame.format.bytes,
-                            frame_rate=audio_frame.sample_rate,
-                            channels=len(audio_frame.layout.channels),
-                        )
-                        st.session_state["signature_audio_buffer"] += sound
-                except Exception:
-                    pass
-
-            audio_buffer = st.session_state["signature_audio_buffer"]
-            if not webrtc_ctx.state.playing and len(audio_buffer) > 0:
-                audio_buffer.export(wavpath, format="wav")
-                st.session_state["signature_audio_buffer"] = pydub.AudioSegment.empty()
-        
-        save_signature_audio(signature_wavpath)
-        
-        if Path(signature_wavpath).exists():
-            st.markdown(f"**음성 서명 파일:** {signature_wavpath}")
-            display_wavfile(signature_wavpath)
-            
-            if st.button("✅ 음성 서명 생성", type="primary"):
-                if not st.session_state.pdf_filepath:
-                    # 임시로 PDF 파일 생성
-                    if not os.path.exists("documents"):
-                        os.makedirs("documents")
-                    temp_pdf = os.path.join("documents", f"temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-                    with open(temp_pdf, 'wb') as f:
-                        create_document_pdf(
-                            st.session_state.document_content,
-                            selected_template,
-                            st.session_state.personal_info,
-                            f,
-                            voice_signature=None
-                        )
-                    st.session_state.pdf_filepath = temp_pdf
-                
-                try:
-                    voice_signature = create_voice_signature(
-                        st.session_state.document_content,
-                        st.session_state.pdf_filepath,
-                        signature_wavpath
-                    )
-                    
-                    # S3 업로드 옵션
-                    upload_to_s3 = st.checkbox("☁️ S3에 오디오 업로드", value=False, help="음성 파일을 AWS S3에 업로드합니다.")
-                    if upload_to_s3:
-                        audio_url = upload_audio_to_s3(signature_wavpath)
-                        if audio_url:
-                            voice_signature["audio_file_url"] = audio_url
-                            st.success(f"✅ S3 업로드 완료: {audio_url}")
-                        else:
-                            st.warning("⚠️ S3 업로드 실패 (환경 변수 확인 필요)")
-                    
-                    st.session_state.voice_signature = voice_signature
-                    
-                    # 음성 서명 저장
-                    signature_file = save_voice_signature(voice_signature, output_dir="documents")
-                    st.success(f"✅ 음성 서명 생성 완료! 서명 데이터: {signature_file}")
-                    st.json(voice_signature)
-                    
-                    # 음성 서명이 포함된 PDF 재생성
-                    if st.session_state.pdf_filepath:
-                        with st.spinner("음성 서명이 포함된 PDF 재생성 중..."):
-                            backup_filepath = st.session_state.pdf_filepath.replace('.pdf', '_backup.pdf')
-                            if os.path.exists(st.session_state.pdf_filepath):
-                                import shutil
-                                shutil.copy2(st.session_state.pdf_filepath, backup_filepath)
-                            
-                            with open(st.session_state.pdf_filepath, 'wb') as f:
-                                create_document_pdf(
-                                    st.session_state.document_content,
-                                    selected_template,
-                                    st.session_state.personal_info,
-                                    f,
-                                    voice_signature=voice_signature
-                                )
-                            
-                            # 해시값 업데이트
-                            new_hash = calculate_document_hash(st.session_state.pdf_filepath)
-                            if new_hash:
-                                voice_signature["document_hash"] = new_hash
-                                save_voice_signature(voice_signature, output_dir="documents")
-                            
-                            st.success("✅ 음성 서명이 포함된 PDF가 재생성되었습니다!")
-                            
-                            # 재생성된 PDF 다운로드
-                            with open(st.session_state.pdf_filepath, 'rb') as f:
-                                pdf_bytes = f.read()
-                            st.download_button(
-                                "📥 음성 서명 포함 PDF 다운로드",
-                                data=pdf_bytes,
-                                file_name=os.path.basename(st.session_state.pdf_filepath),
-                                mime="application/pdf",
-                                use_container_width=True
-                            )
-                    
-                except Exception as e:
-                    st.error(f"음성 서명 생성 중 오류: {str(e)}")
-                    import traceback
-                    st.code(traceback.format_exc())
+import streamlit as st
+from cryptography.fernet import Fernet
+import functools
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+import pydub
+
+from voicedoc import archive, media, metrics, prerender, profiling, sessions
+from voicedoc.admin import admin_requested, render_admin_panel
+from voicedoc.gpt import extract_personal_info, generate_document_content
+from voicedoc.recorder import save_frames_from_audio_receiver, display_wavfile
+from voicedoc.config import DOCUMENTS_DIR, USE_FRAGMENTS
+from voicedoc.consent import verify_consent, warm_up as warm_up_consent
+from voicedoc.correction import PROBLEM_MESSAGES, apply_correction, field_problem
+from voicedoc.evidence import encode_evidence
+from voicedoc.signature import calculate_document_hash, create_voice_signature
+from voicedoc.storage import get_audio_file_url, upload_audio_to_s3
+from voicedoc.templates import field_labels, selectable_templates
+from voicedoc.transcribe import transcribe
+from voicedoc.tts import tts_play
+
+# 스크립트 1회 실행(rerun) 시간 측정 시작
+_script_started = time.perf_counter()
+
+# 세션 식별자 (세션 전용 임시 폴더와 보관소 색인에 사용)
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = archive.new_session_id()
+
+session_id = st.session_state["session_id"]
+
+# 유휴 정리된 세션이면 저장해 둔 작업(인식 텍스트, 개인정보, 본문 등)을 되살림
+sessions.begin_run(st.session_state)
+
+# 오디오 녹음 파일 저장 경로 (세션 임시 폴더 안의 고유 파일명)
+if "wavpath" not in st.session_state:
+    st.session_state["wavpath"] = archive.new_temp_path(session_id)
+
+# ==========================================
+# [0] 기본 페이지 설정 및 초기화
+# ==========================================
+st.set_page_config(page_title="Accessible Voice PDF", layout="centered")
+
+# METRICS_PORT가 지정되면 /metrics 엔드포인트를 프로세스당 한 번 시작
+metrics.start_metrics_server()
+
+# 녹음·PDF를 URL로 제공하는 미디어 서버 (MEDIA_PORT, 프로세스당 한 번)
+media.start_media_server()
+
+# 오래된 임시 파일과 보관 문서를 지우는 정리 스레드 (프로세스당 한 번)
+archive.start_retention_sweeper()
+
+# 오래 방치된 세션의 녹음 버퍼·본문·미리 렌더링 PDF를 해제하는 정리 스레드 (프로세스당 한 번)
+sessions.start_session_reaper()
+
+# 프로파일링 모드(세션 토글 또는 ?profile=1)이면 이번 실행 전체를 프로파일링
+profiling.start_run(st.session_state, st.query_params)
+
+
+# ==========================================
+# 단계별 부분 재실행 (st.fragment)
+# ==========================================
+# 녹음·변환·추출·서명 단계는 각자 다시 실행됩니다. 단계 안의 위젯을 누르거나 녹음 프레임이 들어오면
+# 그 단계 함수만 실행되고, 머리말·서류 선택·다른 단계는 다시 그리지 않습니다.
+# 부분 재실행 때는 마지막 전체 실행의 인자가 그대로 쓰이므로, 단계가 읽는 값은 st.session_state에서 읽고
+# 다른 단계가 쓰는 값(본문 등)을 바꾸면 rerun_app()으로 페이지 전체를 다시 실행합니다.
+def step_fragment(name):
+    """단계 함수를 부분 재실행 단위로 만들고 실행 시간을 step_<name> 단계로 기록합니다.
+
+    부분 재실행에서는 페이지 맨 위의 profiling.start_run()이 실행되지 않으므로,
+    프로파일링이 켜져 있으면 여기서 그 단계 실행만 따로 프로파일링합니다.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            started = time.perf_counter()
+            # 부분 재실행만 계속되는 세션도 사용 중으로 표시합니다.
+            sessions.begin_run(st.session_state)
+            # 전체 실행 중이면 페이지의 프로파일에 포함되고, 부분 재실행이면 새로 시작합니다.
+            own_profile = not profiling.active() and profiling.start_run(st.session_state, st.query_params)
+            if own_profile:
+                profiling.mark_step(f"step_{name}")
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe("voicedoc_stage_seconds", time.perf_counter() - started, stage=f"step_{name}")
+                if own_profile:
+                    profile_files = profiling.finish_run()
+                    if profile_files:
+                        st.caption("🔬 프로파일 저장: " + ", ".join(profile_files))
+        return st.fragment(run) if USE_FRAGMENTS and hasattr(st, "fragment") else run
+    return decorate
+
+
+def rerun_app():
+    """다른 단계가 쓰는 값을 바꿨을 때 페이지 전체를 다시 실행합니다."""
+    profiling.finish_run()
+    st.rerun()
+
+
+def notify(step, kind, body):
+    """페이지 전체를 다시 실행한 뒤에도 보여 줄 안내 (kind: success, warning, json 등)."""
+    st.session_state.setdefault("notices", {}).setdefault(step, []).append((kind, body))
+
+
+def show_notices(step):
+    for kind, body in st.session_state.get("notices", {}).pop(step, []):
+        getattr(st, kind)(body)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+st.markdown(
+    """
+    <style>
+    .big-btn { font-size:20px; padding:18px 24px; border-radius:12px; cursor:pointer; }
+    .high-contrast { background-color:#0B5FFF; color: #FFFFFF; border:none; }
+    .guide-box { background-color:#e8f0fe; padding:15px; border-radius:10px; border: 1px solid #0B5FFF; margin-bottom: 20px;}
+    </style>
+    """,
+    unsafe_allow_html=True,
+)
+
+st.title("말하는대로") 
+
+# 세션 상태 변수 초기화
+if 'plain_text' not in st.session_state:
+    st.session_state.plain_text = ""
+
+if 'system_key' not in st.session_state:
+    st.session_state.system_key = Fernet.generate_key()
+
+if 'encrypted_text' not in st.session_state:
+    st.session_state.encrypted_text = ""
+
+if 'personal_info' not in st.session_state:
+    st.session_state.personal_info = None
+
+if 'document_content' not in st.session_state:
+    st.session_state.document_content = None
+
+if 'voice_signature' not in st.session_state:
+    st.session_state.voice_signature = None
+
+if 'pdf_filepath' not in st.session_state:
+    st.session_state.pdf_filepath = None
+
+# ==========================================
+# [1단계] 서류 종류 선택
+# ==========================================
+st.header("[1단계] 서류 종류 선택")
+
+if st.button("🔊 1단계 안내 듣기"):
+    tts_play("1단계입니다. 작성할 서류 종류를 선택해주세요.")
+
+templates = {template.name: template for template in selectable_templates()}
+
+selected_template = st.selectbox("작성할 서류 종류를 선택하세요.", list(templates.keys()))
+st.markdown(f"""<div class="guide-box">{templates[selected_template].guide}</div>""", unsafe_allow_html=True)
+
+if st.button("🔊 입력 가이드 듣기"):
+    tts_play(templates[selected_template].tts)
+
+# [2단계] 개인정보 음성 입력
+st.markdown("---")
+st.header("[2단계] 개인정보 음성 입력")
+
+
+@step_fragment("recording")
+def recording_step():
+    """녹음 위젯. 프레임을 받을 때마다 이 단계만 다시 실행하고, 녹음이 저장되면 페이지 전체를 다시 그립니다.
+
+    읽는 값: wavpath, audio_buffer
+    """
+    st.markdown("### 오디오 녹음")
+    wavpath = st.session_state["wavpath"]
+    before = _mtime(wavpath)
+    save_frames_from_audio_receiver(wavpath)
+    if _mtime(wavpath) != before:
+        # 새 녹음이 저장되었으므로 재생·변환 단계를 다시 그립니다.
+        rerun_app()
+
+
+@step_fragment("transcription")
+def transcription_step():
+    """녹음 재생, Whisper 변환, 인식 텍스트.
+
+    읽는 값: wavpath / 쓰는 값: voice_text (같은 단계 안에서만 표시)
+    """
+    wavpath = st.session_state["wavpath"]
+
+    # 녹음된 파일이 있으면 재생
+    if Path(wavpath).exists():
+        st.markdown(f"**녹음 파일:** {wavpath}")
+        display_wavfile(wavpath)
+
+        # Whisper 변환 버튼
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            if st.button("🎤 Whisper로 텍스트 변환", key="whisper_convert", help="녹음된 오디오를 텍스트로 변환합니다."):
+                profiling.mark_step("whisper_convert")
+                with st.spinner("Whisper 모델 로딩 및 변환 중..."):
+                    try:
+                        transcribed_text = transcribe(wavpath)
+                        st.session_state["voice_text"] = transcribed_text
+                        st.success("✅ 변환 완료")
+                    except Exception as e:
+                        st.error(f"❌ 변환 중 오류 발생: {str(e)}")
+        with col2:
+            if st.button("🔄 녹음 초기화", key="reset_recording", help="녹음을 초기화합니다."):
+                if "audio_buffer" in st.session_state:
+                    st.session_state["audio_buffer"] = pydub.AudioSegment.empty()
+                st.session_state["wavpath"] = archive.new_temp_path(st.session_state["session_id"])
+                rerun_app()
+
+    # 음성에서 가져온 텍스트 표시
+    st.markdown("### 음성에서 가져온 텍스트")
+    if st.session_state.get("voice_text"):
+        st.text_area("Recognized text (from voice)", value=st.session_state.get("voice_text", ""), key="voice_text", height=140, label_visibility="collapsed")
+    else:
+        st.text_area("Recognized text (from voice)", value="", key="voice_text", height=140, label_visibility="collapsed",
+                     help="위의 녹음 후 'Whisper로 텍스트 변환' 버튼을 누르거나 직접 입력하세요.")
+
+
+@step_fragment("extraction")
+def extraction_step(selected_template):
+    """개인정보 추출·본문 생성과 항목 수정.
+
+    읽는 값: personal_info, document_content, system_key
+    쓰는 값: personal_info, document_content, plain_text, encrypted_text, regenerate_fields
+    본문이 바뀌면 3·4단계가 새 본문을 쓰도록 페이지 전체를 다시 실행합니다 (결과 안내는 show_notices로 이어서 표시).
+    """
+    input_text = st.text_area("📝 음성 입력 결과 붙여넣기 또는 직접 입력:", height=100, help="입력 후 '개인정보 추출' 버튼을 눌러주세요.")
+
+    # 개인정보 추출 버튼
+    if st.button("🔍 개인정보 추출하기", type="primary", use_container_width=True):
+        profiling.mark_step("extract")
+        if not input_text:
+            st.warning("⚠️ 텍스트를 입력해주세요.")
+        else:
+            with st.spinner("개인정보 추출 중..."):
+                try:
+                    personal_info = extract_personal_info(input_text)
+                    st.session_state.personal_info = personal_info
+                    st.session_state.plain_text = input_text
+
+                    # 자동 암호화
+                    cipher = Fernet(st.session_state.system_key)
+                    encrypted_bytes = cipher.encrypt(input_text.encode())
+                    st.session_state.encrypted_text = encrypted_bytes.decode()
+
+                    notify("extraction", "success", "✅ 개인정보 추출 완료!")
+                    notify("extraction", "json", personal_info)
+
+                    # 문서 생성
+                    with st.spinner("문서 내용 생성 중..."):
+                        document_content = generate_document_content(personal_info, selected_template)
+                        st.session_state.document_content = document_content
+                        st.session_state.pop("regenerate_fields", None)
+                        notify("extraction", "success", "✅ 문서 내용 생성 완료!")
+
+                except Exception as e:
+                    st.error(f"❌ 오류 발생: {str(e)}")
+                else:
+                    rerun_app()
+    show_notices("extraction")
+
+    # 잘못 인식된 항목만 고치기 (GPT를 다시 부르지 않음)
+    if st.session_state.personal_info and st.session_state.document_content:
+        with st.expander("✏️ 개인정보 항목 수정"):
+            labels = field_labels()
+            with st.form("field_correction"):
+                edited = {
+                    key: st.text_input(label, value=st.session_state.personal_info.get(key, ""))
+                    for key, label in labels.items()
+                }
+                submitted = st.form_submit_button("수정 반영", use_container_width=True)
+
+            if submitted:
+                problems = {key: field_problem(key, value) for key, value in edited.items()}
+                problems = {key: problem for key, problem in problems.items() if problem}
+                for key, problem in problems.items():
+                    st.error(f"❌ {labels[key]}: {PROBLEM_MESSAGES[problem]}")
+
+                if not problems:
+                    started = time.perf_counter()
+                    # 추출 값의 앞뒤 공백이나 빈 항목만 다른 것은 수정으로 보지 않도록 양쪽을 같은 방식으로 다듬습니다.
+                    current = st.session_state.personal_info
+                    old_info = {**current, **{key: (current.get(key) or "").strip() for key in edited}}
+                    new_info = {**old_info, **{key: value.strip() for key, value in edited.items()}}
+                    changed = new_info != old_info
+                    content, regenerate = apply_correction(st.session_state.document_content, old_info, new_info)
+                    if changed:
+                        st.session_state.personal_info = new_info
+                        st.session_state.document_content = content
+                        # 서명은 수정 전 문서에 대한 것이므로 다시 받아야 합니다.
+                        if st.session_state.voice_signature:
+                            st.session_state.voice_signature = None
+                            st.session_state.pdf_filepath = None
+                            notify("correction", "warning", "⚠️ 문서가 바뀌어 음성 서명을 다시 해주세요.")
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    if regenerate:
+                        st.session_state["regenerate_fields"] = regenerate
+                    else:
+                        st.session_state.pop("regenerate_fields", None)
+                        notify("correction", "success", f"✅ 수정 반영 완료 ({elapsed_ms:.0f}ms, 본문 재생성 없음)")
+                    if changed:
+                        rerun_app()
+            show_notices("correction")
+
+            if st.session_state.get("regenerate_fields"):
+                names = ", ".join(labels.get(key, key) for key in st.session_state["regenerate_fields"])
+                st.info(f"ℹ️ {names} 항목은 본문에 새로 써야 합니다. 정보 표에는 반영되었습니다.")
+                if st.button("🔁 본문 다시 생성", use_container_width=True):
+                    with st.spinner("문서 내용 생성 중..."):
+                        try:
+                            st.session_state.document_content = generate_document_content(
+                                st.session_state.personal_info, selected_template
+                            )
+                            st.session_state.pop("regenerate_fields", None)
+                            notify("correction", "success", "✅ 문서 내용 생성 완료!")
+                        except Exception as e:
+                            st.error(f"❌ 오류 발생: {str(e)}")
+                        else:
+                            rerun_app()
+
+
+recording_step()
+transcription_step()
+extraction_step(selected_template)
+
+# ==========================================
+# [3단계] 서류 확인 및 PDF 생성
+# ==========================================
+st.markdown("---")
+st.header("[3단계] 서류 확인 및 다운로드")
+
+if st.button("🔊 3단계 안내 듣기"):
+    tts_play("3단계입니다. 생성된 문서를 확인하고, PDF 생성 버튼을 눌러 서류를 다운로드하세요.")
+
+if not st.session_state.document_content:
+    st.info("☝️ 위 2단계에서 개인정보를 추출하고 문서를 생성해주세요.")
+else:
+    # 사용자가 문서를 검토하는 동안 PDF를 백그라운드에서 미리 만들어 둡니다.
+    # 입력(본문, 서류 종류, 개인정보, 서명)이 바뀌면 키가 달라지므로 이전 결과는 버립니다.
+    pdf_key = prerender.prerender(
+        st.session_state.document_content,
+        selected_template,
+        st.session_state.personal_info,
+        voice_signature=st.session_state.voice_signature
+    )
+    if st.session_state.get("prerender_key") not in (None, pdf_key):
+        prerender.discard(st.session_state["prerender_key"])
+    st.session_state["prerender_key"] = pdf_key
+
+    st.caption("📄 생성된 문서 내용:")
+    st.text_area("문서 내용", value=st.session_state.document_content, height=200, disabled=True)
+
+    # 파일 저장 옵션
+    save_to_file = st.checkbox("💾 파일로 저장하기", value=False, help="PDF를 로컬 파일로 저장합니다.")
+    # 사용자가 직접 저장한 파일은 세션 임시 폴더(보관 시간이 지나면 정리됨)가 아닌 DOCUMENTS_DIR에 둡니다.
+    output_dir = DOCUMENTS_DIR if save_to_file else None
+    
+    # PDF 생성 버튼
+    if st.button("📄 PDF 서류 생성하기", type="primary", use_container_width=True):
+        profiling.mark_step("pdf_build")
+        if not st.session_state.personal_info or not st.session_state.document_content:
+            st.error("PDF로 만들 데이터가 없습니다.")
+        else:
+            try:
+                # 미리 렌더링된 PDF (아직 렌더링 중이면 끝날 때까지 기다림)
+                pdf_bytes = prerender.get_pdf(
+                    st.session_state.document_content,
+                    selected_template,
+                    st.session_state.personal_info,
+                    voice_signature=st.session_state.voice_signature
+                )
+                file_name = f"{selected_template}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+
+                if save_to_file:
+                    # 화면에 표시된 본문 그대로 파일로 저장
+                    name = st.session_state.personal_info.get("name", "Unknown")
+                    file_name = f"{name}_{file_name}"
+                    os.makedirs(output_dir, exist_ok=True)
+                    filepath = os.path.join(output_dir, file_name)
+                    with open(filepath, 'wb') as f:
+                        f.write(pdf_bytes)
+                    st.session_state.pdf_filepath = filepath
+                    
+                    # 보관소에 저장 (해시·세션·서명자로 색인)
+                    record = archive.store_document(
+                        filepath,
+                        session_id=session_id,
+                        signer=st.session_state.personal_info.get("name"),
+                        doc_type=selected_template
+                    )
+                    
+                    st.success(f"✅ PDF 생성 및 저장 완료! ({record['size'] / 1024:.1f} KB) 문서 해시: {record['document_hash']}")
+                else:
+                    st.success(f"✅ PDF 생성 완료! ({len(pdf_bytes) / 1024:.1f} KB)")
+
+                media.download_button("📥 PDF 다운로드", file_name, data=pdf_bytes)
+
+            except Exception as e:
+                st.error(f"PDF 생성 중 오류: {str(e)}")
+                import traceback
+                st.code(traceback.format_exc())
+
+    # ==========================================
+    # [4단계] 음성 서명 (선택)
+    # ==========================================
+    st.markdown("---")
+    st.header("[4단계] 음성 서명 (선택)")
+    
+    @step_fragment("signing")
+    def signing_step(selected_template):
+        """음성 서명 녹음과 서명 생성. 녹음 프레임, 체크박스, 버튼은 이 단계만 다시 실행합니다.
+
+        읽는 값: session_id, signature_wavpath, document_content, personal_info, pdf_filepath
+        쓰는 값: voice_signature, pdf_filepath (미리 렌더링 키는 다음 전체 실행에서 갱신)
+        """
+        session_id = st.session_state["session_id"]
+
+        use_voice_signature = st.checkbox("🎤 음성 서명 사용하기", value=False, help="음성 서명을 PDF에 포함시킵니다.")
+
+        if use_voice_signature:
+            # 녹음하는 동안 동의 확인 모델을 미리 불러옵니다
+            warm_up_consent()
+            st.markdown("### 음성 동의 녹음")
+            st.info("💡 '본인은 상기 내용을 확인하고 이에 동의합니다.' 라고 말씀해주세요.")
+
+            # 음성 서명용 녹음 경로
+            if "signature_wavpath" not in st.session_state:
+                st.session_state["signature_wavpath"] = archive.new_temp_path(session_id, prefix="signature")
+
+            signature_wavpath = st.session_state["signature_wavpath"]
+
+            # 음성 서명용 별도 녹음 (기존 녹음과 분리)
+            save_frames_from_audio_receiver(
+                signature_wavpath,
+                key="signature-audio",
+                buffer_key="signature_audio_buffer",
+                seal=False  # 동의 문구 녹음은 증거 파일로 인코딩·보관되므로 평문으로 둡니다
+            )
+
+            if Path(signature_wavpath).exists():
+                st.markdown(f"**음성 서명 파일:** {signature_wavpath}")
+                display_wavfile(signature_wavpath)
+
+                if st.button("✅ 음성 서명 생성", type="primary"):
+                    profiling.mark_step("signing")
+                    if not st.session_state.pdf_filepath:
+                        # 임시로 PDF 파일 생성 (세션 임시 폴더)
+                        temp_pdf = archive.new_temp_path(session_id, prefix="document", suffix=".pdf")
+                        with open(temp_pdf, 'wb') as f:
+                            f.write(prerender.get_pdf(
+                                st.session_state.document_content,
+                                selected_template,
+                                st.session_state.personal_info,
+                                voice_signature=None
+                            ))
+                        st.session_state.pdf_filepath = temp_pdf
+
+                    try:
+                        # 동의 문구를 말했는지 확인합니다
+                        consent = verify_consent(signature_wavpath)
+                        if consent is None:
+                            st.warning("⚠️ 동의 문구를 확인하지 못했습니다 (음성 인식 모델 확인 필요)")
+                        elif consent["matched"]:
+                            st.success(f"✅ 동의 문구 확인 (일치도 {consent['score']:.0%}, {consent['elapsed_ms']}ms)")
+                        else:
+                            st.warning(f"⚠️ 동의 문구와 다르게 인식되었습니다 (일치도 {consent['score']:.0%}): {consent['transcript']}")
+
+                        # 서명 녹음을 Opus/FLAC 증거 파일로 줄입니다 (원본 PCM 해시는 서명에 기록)
+                        evidence = encode_evidence(signature_wavpath)
+                        voice_signature = create_voice_signature(
+                            st.session_state.document_content,
+                            st.session_state.pdf_filepath,
+                            signature_wavpath,
+                            evidence=evidence,
+                            consent=consent
+                        )
+                        signer = st.session_state.personal_info.get("name")
+                        archive.store_document(evidence["path"], session_id=session_id, signer=signer, kind="audio")
+
+                        # S3 업로드 옵션
+                        upload_to_s3 = st.checkbox("☁️ S3에 오디오 업로드", value=False, help="음성 파일을 AWS S3에 업로드합니다.")
+                        if upload_to_s3:
+                            audio_url = upload_audio_to_s3(evidence["path"], content_type=evidence["content_type"])
+                            if audio_url:
+                                voice_signature["audio_file_url"] = audio_url
+                                st.success(f"✅ S3 업로드 완료: {audio_url}")
+                            else:
+                                st.warning("⚠️ S3 업로드 실패 (환경 변수 확인 필요)")
+                        if not voice_signature.get("audio_file_url"):
+                            # PDF QR 코드에 넣을 주소는 서명을 확정할 때 한 번만 정합니다 (업로드 포함).
+                            # PDF 렌더링과 미리 렌더링은 이 값을 쓰고 업로드하지 않습니다.
+                            voice_signature["audio_file_url"] = get_audio_file_url(evidence["path"], use_web_url=True)
+
+                        st.session_state.voice_signature = voice_signature
+
+                        # 음성 서명 저장
+                        signature_record = archive.store_signature(voice_signature, session_id=session_id, signer=signer)
+                        st.success(f"✅ 음성 서명 생성 완료! 서명 데이터: {signature_record['document_hash']}")
+                        st.json(voice_signature)
+
+                        # 음성 서명이 포함된 PDF 재생성
+                        if st.session_state.pdf_filepath:
+                            with st.spinner("음성 서명이 포함된 PDF 재생성 중..."):
+                                # 서명 전 PDF는 보관소에 남깁니다 (내용 주소 저장이므로 별도 백업 파일 불필요)
+                                if os.path.exists(st.session_state.pdf_filepath):
+                                    archive.store_document(
+                                        st.session_state.pdf_filepath,
+                                        session_id=session_id,
+                                        signer=signer,
+                                        doc_type=selected_template
+                                    )
+
+                                with open(st.session_state.pdf_filepath, 'wb') as f:
+                                    f.write(prerender.get_pdf(
+                                        st.session_state.document_content,
+                                        selected_template,
+                                        st.session_state.personal_info,
+                                        voice_signature=voice_signature
+                                    ))
+
+                                # 해시값 업데이트
+                                new_hash = calculate_document_hash(st.session_state.pdf_filepath)
+                                if new_hash:
+                                    voice_signature["document_hash"] = new_hash
+                                    archive.store_document(
+                                        st.session_state.pdf_filepath,
+                                        session_id=session_id,
+                                        signer=signer,
+                                        doc_type=selected_template
+                                    )
+                                    archive.store_signature(voice_signature, session_id=session_id, signer=signer)
+
+                                st.success("✅ 음성 서명이 포함된 PDF가 재생성되었습니다!")
+
+                                # 재생성된 PDF 다운로드 (파일을 다시 읽지 않고 URL로 제공)
+                                media.download_button(
+                                    "📥 음성 서명 포함 PDF 다운로드",
+                                    os.path.basename(st.session_state.pdf_filepath),
+                                    path=st.session_state.pdf_filepath
+                                )
+
+                    except Exception as e:
+                        st.error(f"음성 서명 생성 중 오류: {str(e)}")
+                        import traceback
+                        st.code(traceback.format_exc())
+
+    signing_step(selected_template)
+
+
+# ==========================================
+# [관리자] 성능 지표
+# ==========================================
+metrics.record_session_memory(st.session_state)
+sessions.end_run(st.session_state)
+metrics.observe("voicedoc_stage_seconds", time.perf_counter() - _script_started, stage="script_run")
+
+if admin_requested():
+    render_admin_panel()
+
+profile_files = profiling.finish_run()
+if profile_files:
+    st.caption("🔬 프로파일 저장: " + ", ".join(profile_files))
@@ -0,0 +1,7 @@
+"""말하는대로 - 음성 기반 자동 문서 작성 파이프라인.
+
+Streamlit 앱(result.py)은 매 상호작용마다 스크립트 전체를 다시 실행하므로,
+무거운 초기화(폰트 등록, PDF 스타일, OpenAI 클라이언트, Whisper 모델)는
+이 패키지의 각 모듈에서 프로세스당 한 번만 수행되도록 캐시합니다.
+whisper, boto3, qrcode, gTTS 같은 무거운 의존성은 처음 사용할 때 불러옵니다.
+"""
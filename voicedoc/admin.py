@@ -0,0 +1,42 @@
+"""운영자용 관리 화면 (사이드바)."""
+import os
+
+import streamlit as st
+
+from . import metrics, profiling, sessions
+
+
+def admin_requested():
+    """쿼리 파라미터 ?admin=<ADMIN_TOKEN> 으로 관리 화면이 요청되었는지 확인합니다."""
+    token = os.getenv("ADMIN_TOKEN")
+    return bool(token) and st.query_params.get("admin") == token
+
+
+def render_admin_panel():
+    """세션별 메모리, 단계별 지연 시간, 최근 span, Prometheus 지표를 사이드바에 표시합니다."""
+    with st.sidebar:
+        st.header("관리자: 성능 지표")
+        st.checkbox(
+            "🔬 이 세션 프로파일링",
+            key=profiling.SESSION_FLAG,
+            help=f"켜면 이후 실행마다 cProfile/tracemalloc 결과를 {profiling.PROFILE_DIR}/ 에 저장합니다."
+        )
+
+        st.subheader("세션별 메모리 (추정)")
+        st.dataframe(sessions.top_consumers(), use_container_width=True)
+
+        if not metrics.ENABLED:
+            st.info("METRICS_ENABLED=1 로 실행하면 지표가 수집됩니다.")
+            return
+
+        st.subheader("단계별 소요 시간")
+        st.dataframe(metrics.stage_summary(), use_container_width=True)
+
+        st.subheader("OpenAI 사용량")
+        st.dataframe(metrics.openai_summary(), use_container_width=True)
+
+        st.subheader("최근 span")
+        st.dataframe(metrics.recent_spans()[:50], use_container_width=True)
+
+        with st.expander("Prometheus 텍스트"):
+            st.code(metrics.render_prometheus(), language="text")
@@ -0,0 +1,293 @@
+"""문서 보관소: 내용 주소(content-addressed) 저장소 + SQLite 색인 + 세션별 임시 폴더.
+
+보관소 구조 (ARCHIVE_DIR, 기본 archive/):
+    blobs/ab/abcdef...   : SHA-256 해시를 이름으로 하는 파일 본문 (PDF, 서명 JSON, 음성)
+    index.sqlite3        : 해시·세션·서명자·시각으로 색인된 메타데이터
+
+녹음 등 작업 중인 파일은 세션마다 TMP_DIR/<session_id>/ 아래에 고유 이름으로 만들고,
+백그라운드 정리 스레드가 보관 시간이 지난 임시 폴더를 지웁니다.
+TMP_DIR은 사용자의 문서 폴더일 수 있으므로, 정리는 이 모듈이 만든 세션 폴더(이름이 세션 id 형식)와
+예전 방식의 녹음 파일(<시각>.wav, signature_<시각>.wav)만 지우고 다른 파일은 건드리지 않습니다.
+서명된 문서(보관 문서, documents/ 의 파일)는 검증(voicedoc.verify)에 필요하므로 기본으로 지우지 않고,
+ARCHIVE_RETENTION_DAYS 나 ARCHIVE_MAX_BYTES 를 지정했을 때만 지웁니다.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from .config import DOCUMENTS_DIR, get_tmp_dir
+from .signature import sha256_file
+
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", "archive")).resolve()
+
+# 세션 임시 폴더 보관 시간 (시간)
+TMP_RETENTION_HOURS = float(os.getenv("TMP_RETENTION_HOURS", "24"))
+# 보관 문서 보관 기간 (일, 0이면 기간 제한 없음). 지정하면 서명 문서와 documents/ 의 파일도 지웁니다.
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))
+# 보관소 최대 용량 (바이트, 0이면 제한 없음). 넘으면 오래된 문서부터 지웁니다.
+ARCHIVE_MAX_BYTES = int(os.getenv("ARCHIVE_MAX_BYTES", "0"))
+# 정리 주기 (초)
+SWEEP_INTERVAL = float(os.getenv("SWEEP_INTERVAL", "600"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    document_hash TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    session_id TEXT,
+    signer TEXT,
+    doc_type TEXT,
+    signed_hash TEXT,
+    size INTEGER NOT NULL,
+    blob_path TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_session ON documents(session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_documents_signer ON documents(signer, created_at);
+CREATE INDEX IF NOT EXISTS idx_documents_signed_hash ON documents(signed_hash);
+CREATE INDEX IF NOT EXISTS idx_documents_created ON documents(created_at);
+"""
+
+_local = threading.local()
+
+# new_session_id()가 만드는 세션 폴더 이름
+_SESSION_DIR_RE = re.compile(r"[0-9a-f]{32}")
+# 예전 방식으로 TMP_DIR에 바로 저장하던 녹음 파일 이름 (2024-01-31_09-00-00.wav, signature_2024-01-31_09-00-00.wav)
+_LEGACY_RECORDING_RE = re.compile(r"(signature_)?\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.wav")
+
+
+# ==========================================
+# 세션별 임시 폴더
+# ==========================================
+
+def new_session_id():
+    """세션 식별자를 생성합니다."""
+    return uuid.uuid4().hex
+
+
+def session_temp_dir(session_id):
+    """세션 전용 임시 폴더를 반환합니다."""
+    path = get_tmp_dir() / session_id
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def new_temp_path(session_id, prefix="recording", suffix=".wav"):
+    """세션 임시 폴더 안에 겹치지 않는 파일 경로를 만듭니다."""
+    stamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
+    return str(session_temp_dir(session_id) / f"{prefix}_{stamp}_{uuid.uuid4().hex[:8]}{suffix}")
+
+
+# ==========================================
+# 내용 주소 저장소 + 색인
+# ==========================================
+
+def _connect():
+    """스레드별 SQLite 연결을 반환합니다."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(ARCHIVE_DIR / "index.sqlite3"), timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _blob_path(document_hash):
+    return ARCHIVE_DIR / "blobs" / document_hash[:2] / document_hash
+
+
+def _put_blob(source, document_hash):
+    """본문을 해시 경로에 저장합니다. 이미 있으면 다시 쓰지 않습니다."""
+    target = _blob_path(document_hash)
+    if target.exists():
+        return target
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    if isinstance(source, (bytes, bytearray)):
+        tmp.write_bytes(source)
+    else:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+    return target
+
+
+def _index(document_hash, kind, blob, size, session_id=None, signer=None, doc_type=None, signed_hash=None):
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO documents "
+            "(document_hash, kind, session_id, signer, doc_type, signed_hash, size, blob_path, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (document_hash, kind, session_id, signer, doc_type, signed_hash, size, str(blob), time.time())
+        )
+    return find_by_hash(document_hash)
+
+
+def store_document(filepath, session_id=None, signer=None, doc_type=None, kind="pdf"):
+    """PDF(또는 음성) 파일을 보관소에 저장하고 색인 레코드를 반환합니다."""
+    document_hash = sha256_file(filepath)
+    blob = _put_blob(filepath, document_hash)
+    return _index(document_hash, kind, blob, os.path.getsize(filepath),
+                  session_id=session_id, signer=signer, doc_type=doc_type)
+
+
+def store_signature(voice_signature, session_id=None, signer=None):
+    """음성 서명 데이터를 JSON으로 보관하고, 서명 대상 PDF 해시로 색인합니다."""
+    data = json.dumps(voice_signature, indent=2, ensure_ascii=False).encode('utf-8')
+    document_hash = hashlib.sha256(data).hexdigest()
+    blob = _put_blob(data, document_hash)
+    return _index(document_hash, "signature", blob, len(data), session_id=session_id,
+                  signer=signer, signed_hash=voice_signature.get("document_hash"))
+
+
+def find_by_hash(document_hash):
+    """해시로 보관 문서를 찾습니다."""
+    row = _connect().execute(
+        "SELECT * FROM documents WHERE document_hash = ?", (document_hash,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def find_signatures_for(document_hash):
+    """PDF 해시에 대한 음성 서명 레코드 목록을 반환합니다."""
+    rows = _connect().execute(
+        "SELECT * FROM documents WHERE kind = 'signature' AND signed_hash = ? ORDER BY created_at",
+        (document_hash,)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def find_by_signer(signer, limit=100):
+    """서명자 이름으로 최근 보관 문서를 찾습니다."""
+    rows = _connect().execute(
+        "SELECT * FROM documents WHERE signer = ? ORDER BY created_at DESC LIMIT ?", (signer, limit)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def find_by_session(session_id):
+    """세션에서 만든 보관 문서를 시간순으로 반환합니다."""
+    rows = _connect().execute(
+        "SELECT * FROM documents WHERE session_id = ? ORDER BY created_at", (session_id,)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def iter_by_kind(kind):
+    """종류(pdf, signature, audio)별 보관 레코드를 차례로 반환합니다."""
+    cursor = _connect().execute("SELECT * FROM documents WHERE kind = ?", (kind,))
+    for row in cursor:
+        yield dict(row)
+
+
+# ==========================================
+# 보관 기간 정리
+# ==========================================
+
+def _delete_rows(conn, rows):
+    with conn:
+        for row in rows:
+            conn.execute("DELETE FROM documents WHERE document_hash = ?", (row["document_hash"],))
+    for row in rows:
+        try:
+            os.remove(row["blob_path"])
+        except OSError:
+            pass
+
+
+def _latest_mtime(path):
+    latest = path.stat().st_mtime
+    if path.is_dir():
+        for child in path.rglob("*"):
+            try:
+                latest = max(latest, child.stat().st_mtime)
+            except OSError:
+                pass
+    return latest
+
+
+def _is_sweepable_tmp(entry):
+    """TMP_DIR 항목 중 이 앱이 만든 것(세션 폴더, 예전 녹음 파일)인지 확인합니다."""
+    if entry.is_dir():
+        return _SESSION_DIR_RE.fullmatch(entry.name) is not None
+    return _LEGACY_RECORDING_RE.fullmatch(entry.name) is not None
+
+
+def sweep(now=None):
+    """보관 기간이 지난 임시 파일과 보관 문서를 지우고, 지운 항목 수를 반환합니다."""
+    now = now or time.time()
+    removed = 0
+
+    # 세션 임시 폴더 (및 예전 방식으로 TMP_DIR에 바로 저장된 녹음 파일)
+    tmp_cutoff = now - TMP_RETENTION_HOURS * 3600
+    for entry in get_tmp_dir().iterdir():
+        try:
+            if not _is_sweepable_tmp(entry) or _latest_mtime(entry) >= tmp_cutoff:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink()
+            removed += 1
+        except OSError:
+            pass
+
+    conn = _connect()
+
+    if ARCHIVE_RETENTION_DAYS > 0:
+        archive_cutoff = now - ARCHIVE_RETENTION_DAYS * 86400
+        rows = conn.execute(
+            "SELECT document_hash, blob_path FROM documents WHERE created_at < ?", (archive_cutoff,)
+        ).fetchall()
+        _delete_rows(conn, rows)
+        removed += len(rows)
+
+        # 예전 방식으로 documents/ 에 쌓인 파일
+        if os.path.isdir(DOCUMENTS_DIR):
+            for entry in Path(DOCUMENTS_DIR).iterdir():
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < archive_cutoff:
+                        entry.unlink()
+                        removed += 1
+                except OSError:
+                    pass
+
+    if ARCHIVE_MAX_BYTES > 0:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total > ARCHIVE_MAX_BYTES:
+            evict = []
+            for row in conn.execute("SELECT document_hash, blob_path, size FROM documents ORDER BY created_at"):
+                if total <= ARCHIVE_MAX_BYTES:
+                    break
+                evict.append(row)
+                total -= row["size"]
+            _delete_rows(conn, evict)
+            removed += len(evict)
+
+    return removed
+
+
+@lru_cache(maxsize=None)
+def start_retention_sweeper(interval=SWEEP_INTERVAL):
+    """보관 기간 정리 스레드를 프로세스당 한 번만 시작합니다."""
+    def loop():
+        while True:
+            try:
+                sweep()
+            except Exception:
+                pass
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="voicedoc-retention", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,167 @@
+"""긴 녹음의 병렬 분할 변환.
+
+몇 분짜리 녹음은 무음 구간에서 CHUNK_SECONDS 안팎의 조각으로 나누고,
+프로세스 풀에서 조각들을 동시에 변환한 뒤 시간 순서대로 이어 붙입니다.
+적당한 무음이 없어 강제로 자른 경계는 CHUNK_OVERLAP_SECONDS만큼 겹쳐 변환하고,
+겹친 구간의 구간(segment)은 중간 시각이 속한 조각의 것만 남겨 중복을 없앱니다.
+
+설정:
+    LONG_AUDIO_SECONDS     이 길이(초) 이상이면 분할 변환   기본 120
+    CHUNK_SECONDS          조각 목표 길이(초)               기본 30
+    CHUNK_OVERLAP_SECONDS  강제 분할 시 겹침 길이(초)        기본 1
+    TRANSCRIBE_WORKERS     변환 프로세스 수 (CPU 코어 수를 넘지 않음)  기본 2
+
+풀의 각 프로세스는 모델을 한 번만 불러와 계속 재사용합니다.
+프로세스마다 Whisper 모델 전체를 메모리에 올리므로 (large 모델은 수 GB) 코어 수가 아니라
+메모리에 맞춰 TRANSCRIBE_WORKERS를 정합니다.
+조각은 파일로 쓰지 않고 16kHz float32 배열로 넘기므로, 암호화된 녹음(voicedoc.sealed)도
+평문 조각 파일을 남기지 않으며 풀 프로세스는 암호화 키가 필요 없습니다.
+"""
+import multiprocessing
+import os
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from .sealed import WHISPER_SAMPLE_RATE, is_sealed, open_audio
+
+LONG_AUDIO_SECONDS = float(os.getenv("LONG_AUDIO_SECONDS", "120"))
+CHUNK_SECONDS = float(os.getenv("CHUNK_SECONDS", "30"))
+CHUNK_OVERLAP_SECONDS = float(os.getenv("CHUNK_OVERLAP_SECONDS", "1"))
+TRANSCRIBE_WORKERS = max(1, min(int(os.getenv("TRANSCRIBE_WORKERS", "2")), os.cpu_count() or 1))
+
+# 무음으로 볼 최소 길이(ms)와 평균 음량 대비 기준(dB)
+MIN_SILENCE_MS = 400
+SILENCE_BELOW_AVERAGE_DB = 16
+# 겹친 경계에서 앞 조각과 되풀이되는 단어를 찾을 최대 단어 수
+MAX_REPEATED_WORDS = 8
+
+
+def audio_seconds(wavpath):
+    """녹음 길이(초)를 반환합니다. WAV가 아니면 pydub으로 읽습니다."""
+    try:
+        with open_audio(wavpath) as f, wave.open(f, "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        from pydub import AudioSegment
+        return len(AudioSegment.from_file(wavpath)) / 1000
+
+
+def _load_segment(wavpath):
+    from pydub import AudioSegment
+
+    if is_sealed(wavpath):
+        with open_audio(wavpath) as f:
+            return AudioSegment.from_file(f, format="wav")
+    return AudioSegment.from_file(wavpath)
+
+
+def split_at_silence(wavpath, chunk_seconds=CHUNK_SECONDS, overlap_seconds=CHUNK_OVERLAP_SECONDS):
+    """녹음을 무음 경계에서 잘라 16kHz 모노 조각으로 나눕니다.
+
+    각 조각은 dict(audio, offset, own_start, own_end)이며 audio는 Whisper 입력 형식(float32 배열),
+    시각은 모두 원본 기준 초입니다.
+    offset은 조각이 시작하는 시각, [own_start, own_end)는 이 조각이 책임지는 구간입니다.
+    """
+    import numpy as np
+    from pydub import silence
+
+    audio = _load_segment(wavpath).set_channels(1).set_frame_rate(WHISPER_SAMPLE_RATE).set_sample_width(2)
+    length = len(audio)
+    target = int(chunk_seconds * 1000)
+    overlap = int(overlap_seconds * 1000)
+
+    cut_points = []
+    if audio.dBFS != float("-inf"):
+        cut_points = [
+            (start + end) // 2
+            for start, end in silence.detect_silence(
+                audio, min_silence_len=MIN_SILENCE_MS,
+                silence_thresh=audio.dBFS - SILENCE_BELOW_AVERAGE_DB, seek_step=10)
+        ]
+
+    chunks = []
+    own_start = audio_start = 0
+    while own_start < length:
+        if length - own_start <= target * 1.5:
+            own_end, hard_cut = length, False
+        else:
+            window = [m for m in cut_points if own_start + target // 2 <= m <= own_start + target * 3 // 2]
+            if window:
+                own_end, hard_cut = min(window, key=lambda m: abs(m - own_start - target)), False
+            else:
+                own_end, hard_cut = own_start + target, True
+        audio_end = min(length, own_end + overlap) if hard_cut else own_end
+
+        samples = np.frombuffer(audio[audio_start:audio_end].raw_data, np.int16)
+        chunks.append({
+            "audio": samples.astype(np.float32) / 32768.0,
+            "offset": audio_start / 1000,
+            "own_start": own_start / 1000,
+            "own_end": own_end / 1000 if own_end < length else float("inf"),
+        })
+
+        own_start = own_end
+        audio_start = max(0, own_end - overlap) if hard_cut else own_end
+    return chunks
+
+
+def _transcribe_chunk(audio, offset, backend, options, initial_prompt):
+    """풀 프로세스: 조각 하나를 변환하고 구간 시각을 원본 기준으로 옮깁니다."""
+    from .transcribe import get_transcriber
+
+    result = get_transcriber(backend, **options).transcribe(audio, initial_prompt=initial_prompt)
+    return [
+        {"start": s["start"] + offset, "end": s["end"] + offset, "text": s["text"]}
+        for s in result["segments"]
+    ]
+
+
+def _drop_repeated_prefix(previous_text, text):
+    """겹친 경계에서 앞 구간 끝과 되풀이되는 단어를 다음 구간 앞에서 지웁니다."""
+    previous_words, words = previous_text.split(), text.split()
+    for k in range(min(MAX_REPEATED_WORDS, len(previous_words), len(words)), 0, -1):
+        if previous_words[-k:] == words[:k]:
+            return " ".join(words[k:])
+    return text
+
+
+def stitch(chunks, chunk_segments):
+    """조각별 구간을 시간 순서대로 잇고 겹친 구간의 중복을 없앱니다."""
+    segments = []
+    for chunk, chunk_result in zip(chunks, chunk_segments):
+        kept = [
+            dict(s) for s in chunk_result
+            if chunk["own_start"] <= (s["start"] + s["end"]) / 2 < chunk["own_end"]
+        ]
+        if segments and kept and chunk["offset"] < chunk["own_start"]:
+            kept[0]["text"] = _drop_repeated_prefix(segments[-1]["text"], kept[0]["text"])
+        segments += [s for s in kept if s["text"].strip()]
+    return {"text": " ".join(s["text"].strip() for s in segments), "segments": segments}
+
+
+@lru_cache(maxsize=None)
+def _get_pool(workers):
+    """변환 프로세스 풀을 프로세스당 한 번만 만듭니다."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def transcribe_chunked(wavpath, backend, options, initial_prompt=None, workers=TRANSCRIBE_WORKERS):
+    """긴 녹음을 나눠 병렬로 변환하고 {"text", "segments"}를 반환합니다."""
+    options = dict(options)
+    # 풀 프로세스끼리 코어를 나눠 씁니다.
+    options.setdefault("threads", max(1, (os.cpu_count() or 1) // workers))
+
+    chunks = split_at_silence(wavpath)
+    pool = _get_pool(workers)
+    try:
+        futures = [
+            pool.submit(_transcribe_chunk, c["audio"], c["offset"], backend, options, initial_prompt)
+            for c in chunks
+        ]
+        chunk_segments = [f.result() for f in futures]
+    except BrokenProcessPool:
+        _get_pool.cache_clear()
+        raise
+    return stitch(chunks, chunk_segments)
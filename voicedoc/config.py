@@ -0,0 +1,23 @@
+"""환경 설정 값을 모아둡니다."""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+# 오디오 녹음 파일 저장 경로
+TMP_DIR = Path(os.getenv("SOUND_DIR", "C:/Users/shpup/OneDrive/문서/ddonggari/sound"))
+
+# 생성된 PDF 및 서명 데이터 저장 경로
+DOCUMENTS_DIR = os.getenv("DOCUMENTS_DIR", "documents")
+
+# 녹음·변환·추출·서명 단계를 st.fragment로 따로 다시 실행 (0이면 매번 페이지 전체 실행)
+USE_FRAGMENTS = os.getenv("USE_FRAGMENTS", "1") == "1"
+
+# 음성 서명 동의 문구
+CONSENT_PHRASE = "본인은 상기 내용을 확인하고 이에 동의합니다."
+
+
+@lru_cache(maxsize=None)
+def get_tmp_dir():
+    """녹음 파일 저장 폴더를 프로세스당 한 번만 생성하고 반환합니다."""
+    TMP_DIR.mkdir(exist_ok=True, parents=True)
+    return TMP_DIR
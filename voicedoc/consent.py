@@ -0,0 +1,125 @@
+"""음성 서명 동의 문구 확인.
+
+3초 안팎의 짧은 동의 녹음을 작은 모델(CONSENT_MODEL, 기본 tiny)로 탐욕적(beam 1) 디코딩하고,
+변환 결과 안에서 동의 문구와 가장 비슷한 부분을 찾아 글자 단위 유사도(0~1)를 점수로 냅니다.
+ASR 오류(띄어쓰기, 받침 등)를 견디도록 문구 전체가 아니라 부분 정렬로 비교하며,
+동의 문구를 initial_prompt로 주지 않습니다 (무음에서 문구를 지어내는 것을 막기 위해).
+소리가 거의 없는 녹음은 모델을 돌리지 않고 바로 0점 처리합니다.
+
+설정:
+    CONSENT_MODEL      동의 확인용 모델 크기          기본 tiny
+    CONSENT_THRESHOLD  통과 기준 점수                 기본 0.8
+"""
+import array
+import os
+import re
+import sys
+import threading
+import time
+import wave
+
+from . import metrics
+from .config import CONSENT_PHRASE
+
+CONSENT_MODEL = os.getenv("CONSENT_MODEL", "tiny")
+CONSENT_THRESHOLD = float(os.getenv("CONSENT_THRESHOLD", "0.8"))
+
+# 16비트 샘플 RMS가 이보다 작으면 무음으로 봅니다.
+SILENCE_RMS = 200
+
+
+def _normalize(text):
+    """공백과 문장 부호를 지웁니다."""
+    return re.sub(r"[\s\W_]+", "", text)
+
+
+def phrase_similarity(phrase, transcript):
+    """transcript 안에서 phrase와 가장 가까운 부분과의 글자 유사도(1 - 편집 거리 / 문구 길이)."""
+    phrase, transcript = _normalize(phrase), _normalize(transcript)
+    if not phrase:
+        return 1.0
+    # 부분 정렬: transcript의 어느 위치에서 시작·끝나도 비용이 없습니다.
+    previous = [0] * (len(transcript) + 1)
+    for i, p in enumerate(phrase, 1):
+        current = [i]
+        for j, t in enumerate(transcript, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (p != t)))
+        previous = current
+    return max(0.0, 1 - min(previous) / len(phrase))
+
+
+def _speech_rms(wavpath):
+    """16비트 WAV의 RMS를 반환합니다. 다른 형식이면 None."""
+    with wave.open(str(wavpath), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            return None
+        samples = array.array("h", wav.readframes(wav.getnframes()))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return (sum(s * s for s in samples) / len(samples)) ** 0.5
+
+
+def _get_consent_transcriber():
+    from .transcribe import get_transcriber
+    return get_transcriber(model_name=CONSENT_MODEL, beam_size=1)
+
+
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+_warmed = threading.Event()
+
+
+def warm_up():
+    """동의 확인 모델을 백그라운드에서 미리 불러옵니다.
+
+    불러오기에 성공하면 다시 하지 않고, 실패했으면(모델 다운로드 실패 등) 다음 호출에서 다시 시도합니다.
+    이미 불러오는 중이면 그 스레드를 반환합니다.
+    """
+    global _warm_up_thread
+
+    def load():
+        try:
+            _get_consent_transcriber()
+            _warmed.set()
+        except Exception:
+            pass
+
+    with _warm_up_lock:
+        if _warmed.is_set() or (_warm_up_thread is not None and _warm_up_thread.is_alive()):
+            return _warm_up_thread
+        _warm_up_thread = threading.Thread(target=load, name="voicedoc-consent-warmup", daemon=True)
+        _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def verify_consent(wavpath, phrase=CONSENT_PHRASE, threshold=CONSENT_THRESHOLD):
+    """녹음에서 동의 문구를 확인합니다.
+
+    반환값: score(0~1), matched, transcript, elapsed_ms, model. 변환에 실패하면 None.
+    """
+    started = time.perf_counter()
+    try:
+        with metrics.span("consent_verify"):
+            try:
+                rms = _speech_rms(wavpath)
+            except (wave.Error, EOFError):
+                rms = None
+            if rms is not None and rms < SILENCE_RMS:
+                transcript = ""
+            else:
+                transcriber = _get_consent_transcriber()
+                with transcriber.lock:
+                    transcript = transcriber.transcribe(wavpath)["text"].strip()
+    except Exception:
+        return None
+
+    score = phrase_similarity(phrase, transcript)
+    return {
+        "score": round(score, 3),
+        "matched": score >= threshold,
+        "transcript": transcript,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000),
+        "model": CONSENT_MODEL,
+    }
@@ -0,0 +1,107 @@
+"""개인정보 항목 단위 수정.
+
+추출된 개인정보 중 한 항목만 잘못 인식된 경우(연락처 숫자, 주소 등) GPT를 다시 부르지 않고
+그 항목만 고칩니다. 정보 표는 personal_info에서 바로 그려지므로 값만 바꾸면 되고,
+본문에 이전 값이 그대로 들어간 부분은 새 값으로 바꿉니다.
+숫자 항목(주민등록번호, 연락처, 생년월일)은 구분자나 앞자리 0이 달라도 같은 숫자 묶음이면 같은 값으로 보고,
+바꿀 때는 본문의 표기(1990년 1월 1일, 1990-01-01)를 유지한 채 숫자만 바꿉니다.
+
+본문을 고칠 수 없는 경우에만 본문을 다시 생성해야 한다고 알려 줍니다.
+    - 본문에 없던 항목에 새 값을 넣은 경우 (본문에 새 내용을 써야 함)
+    - 본문에 있던 값을 지운 경우
+    - 두 글자 미만이라 본문의 다른 낱말과 구별할 수 없는 값
+"""
+import re
+
+from . import metrics
+
+# 숫자와 구분자로만 된 값(주민등록번호, 연락처, 날짜)은 숫자 묶음으로 비교합니다.
+_NUMERIC_VALUE = re.compile(r"[\d\s\-./()년월일]+")
+
+
+def _digits(value):
+    return re.sub(r"\D", "", value)
+
+
+def field_problem(key, value):
+    """항목 값 검사. 문제가 있으면 짧은 사유(rrn, phone, birthdate), 없으면 None. 빈 값은 통과."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if key == "rrn" and len(_digits(value)) != 13:
+        return "rrn"
+    if key == "phone" and not 9 <= len(_digits(value)) <= 11:
+        return "phone"
+    if key == "birthdate" and len(_digits(value)) < 6:
+        return "birthdate"
+    return None
+
+
+PROBLEM_MESSAGES = {
+    "rrn": "주민등록번호는 숫자 13자리여야 합니다.",
+    "phone": "연락처는 숫자 9~11자리여야 합니다.",
+    "birthdate": "생년월일에는 연·월·일 숫자가 필요합니다.",
+}
+
+
+def _mention_pattern(value):
+    """본문에서 value가 언급된 부분을 찾는 정규식."""
+    groups = re.findall(r"\d+", value)
+    if groups and _NUMERIC_VALUE.fullmatch(value):
+        # 010-1234-5678 / 010 1234 5678, 1990-01-01 / 1990년 1월 1일
+        parts = [r"0*" + g.lstrip("0") if g.lstrip("0") else g for g in groups]
+        return re.compile(r"(?<!\d)" + r"\D{0,3}".join(parts) + r"(?!\d)")
+    return re.compile(r"\s+".join(re.escape(token) for token in value.split()))
+
+
+def _replacement(old_value, new_value):
+    """본문에서 찾은 부분을 새 값으로 바꾸는 함수.
+
+    숫자 항목은 본문의 표기(구분자, '년/월/일', 앞자리 0 생략)를 그대로 두고 숫자 묶음만 바꿉니다.
+    """
+    old_groups = re.findall(r"\d+", old_value)
+    new_groups = re.findall(r"\d+", new_value)
+    numeric = old_groups and _NUMERIC_VALUE.fullmatch(old_value) and _NUMERIC_VALUE.fullmatch(new_value)
+    if not numeric or len(old_groups) != len(new_groups):
+        return lambda match: new_value
+
+    def replace(match):
+        groups = iter(new_groups)
+
+        def swap(run):
+            group = next(groups)
+            if not run.group().startswith("0"):
+                # 본문이 앞자리 0을 생략했다면 새 값도 생략합니다 (1월 1일).
+                return group.lstrip("0") or group
+            # 두 자리 월·일 표기(01-01)는 두 자리로 맞춥니다.
+            return group.zfill(2) if len(run.group()) == 2 else group
+        return re.sub(r"\d+", swap, match.group())
+    return replace
+
+
+def apply_correction(content, old_info, new_info):
+    """수정된 개인정보를 본문에 반영합니다.
+
+    반환값: (새 본문, 본문을 다시 생성해야 하는 항목 key 목록)
+    """
+    regenerate = []
+    with metrics.span("field_correction"):
+        for key, new_value in new_info.items():
+            old_value = (old_info.get(key) or "").strip()
+            new_value = (new_value or "").strip()
+            if old_value == new_value:
+                continue
+            if not old_value:
+                # 본문에 없던 내용은 새로 써야 합니다.
+                regenerate.append(key)
+                continue
+            pattern = _mention_pattern(old_value)
+            if not pattern.search(content):
+                # 본문에 언급되지 않은 항목: 정보 표만 바뀝니다.
+                continue
+            if not new_value or len(old_value) < 2:
+                regenerate.append(key)
+                continue
+            content = pattern.sub(_replacement(old_value, new_value), content)
+    metrics.inc("voicedoc_field_corrections_total", result="regenerate" if regenerate else "patched")
+    return content, regenerate
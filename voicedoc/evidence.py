@@ -0,0 +1,126 @@
+"""음성 서명 증거 파일 인코딩.
+
+서명 녹음(WAV)을 업로드·보관 전에 Opus(손실, 음성용) 또는 FLAC(무손실)으로 줄입니다.
+원본 PCM 샘플의 SHA-256(pcm_sha256)과 인코딩된 파일의 SHA-256(sha256)을 함께 기록하므로
+    - FLAC : 보관 파일을 다시 풀어 원본 PCM 해시와 대조할 수 있고,
+    - Opus : 보관 파일 해시로 변조 여부를, PCM 해시로 원본 녹음과의 대응을 확인합니다.
+
+설정:
+    EVIDENCE_FORMAT  opus | flac | wav (wav면 변환하지 않음)   기본 opus
+    OPUS_BITRATE     Opus 비트레이트                           기본 32k
+
+인코딩에는 ffmpeg(pydub)가 필요하며, 실패하면 경고 로그를 남기고(voicedoc_evidence_fallbacks_total)
+만들다 만 파일을 지운 뒤 원본 WAV를 그대로 사용합니다.
+"""
+import hashlib
+import logging
+import os
+import wave
+from pathlib import Path
+
+from . import metrics
+from .signature import sha256_file
+
+EVIDENCE_FORMAT = os.getenv("EVIDENCE_FORMAT", "opus")
+OPUS_BITRATE = os.getenv("OPUS_BITRATE", "32k")
+
+# 형식별 (파일 확장자, pydub export 인자, Content-Type)
+FORMATS = {
+    "opus": (".opus", {"format": "ogg", "codec": "libopus", "bitrate": OPUS_BITRATE}, "audio/ogg"),
+    "flac": (".flac", {"format": "flac"}, "audio/flac"),
+    "wav": (".wav", None, "audio/wav"),
+}
+
+# PCM 해시 계산 시 한 번에 읽을 프레임 수
+PCM_READ_FRAMES = 65536
+
+logger = logging.getLogger(__name__)
+
+
+def content_type_for(filepath):
+    """파일 확장자로 Content-Type을 정합니다."""
+    suffix = Path(filepath).suffix.lower()
+    for extension, _, content_type in FORMATS.values():
+        if suffix == extension:
+            return content_type
+    return "application/octet-stream"
+
+
+def pcm_sha256(audio_filepath):
+    """녹음의 PCM 샘플만으로 SHA-256을 계산합니다. (해시, "s16le/48000Hz/1ch" 형식 설명)을 반환합니다.
+
+    WAV는 헤더를 제외한 샘플 데이터를, 그 밖의 형식은 pydub으로 풀어낸 샘플을 해시합니다.
+    """
+    digest = hashlib.sha256()
+    try:
+        with wave.open(str(audio_filepath), "rb") as wav:
+            width, rate, channels = wav.getsampwidth(), wav.getframerate(), wav.getnchannels()
+            while True:
+                frames = wav.readframes(PCM_READ_FRAMES)
+                if not frames:
+                    break
+                digest.update(frames)
+    except (wave.Error, EOFError):
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(audio_filepath)
+        width, rate, channels = audio.sample_width, audio.frame_rate, audio.channels
+        digest.update(audio.raw_data)
+    return digest.hexdigest(), f"s{width * 8}le/{rate}Hz/{channels}ch"
+
+
+def encode_evidence(wavpath, fmt=None):
+    """서명 녹음을 증거 형식으로 인코딩하고 메타데이터 dict를 반환합니다.
+
+    반환값: path, format, content_type, size, sha256, pcm_sha256, pcm_format, source_size
+    """
+    fmt = fmt or EVIDENCE_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"알 수 없는 증거 형식: {fmt} (사용 가능: {', '.join(FORMATS)})")
+
+    pcm_hash, pcm_format = pcm_sha256(wavpath)
+    target = str(wavpath)
+    extension, export_args, _ = FORMATS[fmt]
+
+    if export_args:
+        with metrics.span("evidence_encode"):
+            try:
+                from pydub import AudioSegment
+                audio = AudioSegment.from_file(wavpath)
+                if fmt == "opus":
+                    # 음성 증거는 모노면 충분합니다.
+                    audio = audio.set_channels(1)
+                target = str(Path(wavpath).with_suffix(extension))
+                audio.export(target, **export_args)
+            except Exception as e:
+                logger.warning("증거 파일을 %s로 인코딩하지 못해 원본 WAV를 사용합니다: %s", fmt, e)
+                metrics.inc("voicedoc_evidence_fallbacks_total", format=fmt)
+                if target != str(wavpath):
+                    try:
+                        os.remove(target)
+                    except OSError:
+                        pass
+                fmt, target = "wav", str(wavpath)
+
+    return {
+        "path": target,
+        "format": fmt,
+        "content_type": content_type_for(target),
+        "size": os.path.getsize(target),
+        "sha256": sha256_file(target),
+        "pcm_sha256": pcm_hash,
+        "pcm_format": pcm_format,
+        "source_size": os.path.getsize(wavpath),
+    }
+
+
+def verify_evidence(audio_filepath, voice_signature):
+    """보관된 증거 파일이 음성 서명 기록과 일치하는지 확인합니다.
+
+    파일 해시가 기록과 같아야 하며, 무손실 형식(FLAC, WAV)은 PCM 해시까지 대조합니다.
+    """
+    if voice_signature.get("audio_file_sha256") and \
+            sha256_file(audio_filepath) != voice_signature["audio_file_sha256"]:
+        return False
+    if voice_signature.get("audio_format", "wav") in ("flac", "wav") and voice_signature.get("audio_pcm_sha256"):
+        return pcm_sha256(audio_filepath)[0] == voice_signature["audio_pcm_sha256"]
+    return True
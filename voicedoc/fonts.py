@@ -0,0 +1,30 @@
+"""PDF용 한글 폰트 등록."""
+import os
+from functools import lru_cache
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+FONT_PATHS = [
+    "C:/Windows/Fonts/malgun.ttf",  # 맑은 고딕
+    "C:/Windows/Fonts/gulim.ttc",   # 굴림
+    "C:/Windows/Fonts/batang.ttc",   # 바탕
+]
+
+
+@lru_cache(maxsize=None)
+def register_korean_fonts():
+    """한글 폰트를 등록합니다. TTF 파싱은 프로세스당 한 번만 수행됩니다."""
+    try:
+        for font_path in FONT_PATHS:
+            if os.path.exists(font_path):
+                if font_path.endswith('.ttf'):
+                    pdfmetrics.registerFont(TTFont('Korean', font_path))
+                    return 'Korean'
+                elif font_path.endswith('.ttc'):
+                    pdfmetrics.registerFont(TTFont('Korean', font_path, subfontIndex=0))
+                    return 'Korean'
+
+        return 'Helvetica'
+    except Exception as e:
+        return 'Helvetica'
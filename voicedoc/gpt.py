@@ -0,0 +1,156 @@
+"""GPT(OpenAI) 기반 개인정보 추출 및 문서 본문 생성.
+
+개인정보 추출은 저렴하고 빠른 모델을 먼저 쓰고, 결과 검증에 실패할 때만 상위 모델로 다시 요청합니다.
+    - 추출: JSON 스키마(모든 key, 문자열 값), 주민등록번호·연락처·생년월일 자릿수, 이름이 원문에 있는지
+본문 생성은 문서 품질에 직접 영향을 주므로 기본으로 상위 모델(GPT_FALLBACK_MODEL)을 그대로 씁니다.
+GPT_GENERATE_MODEL에 저렴한 모델을 지정하면 같은 방식으로 전환하며, 이때 검증은
+빈 응답, 길이 제한으로 잘린 응답, 신청인 이름 누락만 확인합니다 (문장 품질은 확인하지 않음).
+
+프롬프트는 고정된 지시문(시스템 메시지)을 앞에, 바뀌는 값(녹음 텍스트, 개인 정보)을 맨 뒤
+사용자 메시지에 둡니다. 고정 부분은 프로세스 안에서 바이트 단위로 같으므로
+OpenAI 프롬프트 캐시(앞부분 1024토큰 이상 일치 시)가 적용될 수 있습니다.
+요청 수, 토큰, 캐시 적중 토큰, 상위 모델 전환은 모델별로 지표에 기록됩니다.
+
+설정:
+    GPT_EXTRACT_MODEL   개인정보 추출에 먼저 쓰는 모델      기본 gpt-4o-mini
+    GPT_GENERATE_MODEL  본문 생성에 먼저 쓰는 모델          기본 GPT_FALLBACK_MODEL
+    GPT_FALLBACK_MODEL  검증 실패 시 다시 요청할 모델       기본 gpt-4o
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+from . import metrics
+from .correction import field_problem
+from .templates import get_template, info_keys
+
+FALLBACK_MODEL = os.getenv("GPT_FALLBACK_MODEL", "gpt-4o")
+EXTRACT_MODEL = os.getenv("GPT_EXTRACT_MODEL", "gpt-4o-mini")
+GENERATE_MODEL = os.getenv("GPT_GENERATE_MODEL", FALLBACK_MODEL)
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """OpenAI 클라이언트를 프로세스당 한 번만 생성합니다."""
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def _models(first):
+    """먼저 쓸 모델과 상위 모델 순서 (같으면 한 번만)."""
+    return [first] if first == FALLBACK_MODEL else [first, FALLBACK_MODEL]
+
+
+def _chat(stage, model, messages, **kwargs):
+    """Chat Completions 요청 한 번. 사용량을 모델별로 기록하고 응답을 반환합니다."""
+    with metrics.span(stage):
+        raw_response = get_client().chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            **kwargs
+        )
+    metrics.record_openai_usage(stage, raw_response, model)
+    return raw_response.parse()
+
+
+def _compact(value):
+    return re.sub(r"\s+", "", value)
+
+
+@lru_cache(maxsize=None)
+def _extract_system_prompt():
+    """추출용 고정 지시문 (추출 항목은 프로세스 안에서 바뀌지 않음)."""
+    keys_str = "\n".join(f"- {key}" for key in info_keys())
+    return f"""당신은 개인정보 정보를 정리하고, 반드시 JSON 형식으로만 응답해야 합니다.
+
+사용자가 준 텍스트에서 개인정보를 추출해 JSON으로 정리해줘.
+
+반드시 아래 key만 사용해서 JSON으로 출력해.
+없는 값은 "" (빈 문자열) 로 넣어.
+
+keys:
+{keys_str}"""
+
+
+def _extraction_problem(info, text):
+    """추출 결과 검증. 문제가 있으면 사유(지표 라벨), 없으면 None."""
+    if not isinstance(info, dict) or any(not isinstance(info.get(key), str) for key in info_keys()):
+        return "schema"
+    for key in ("rrn", "phone", "birthdate"):
+        problem = field_problem(key, info[key])
+        if problem:
+            return problem
+    if info["name"] and _compact(info["name"]) not in _compact(text):
+        return "name"
+    if text.strip() and not any(info[key] for key in info_keys()):
+        return "empty"
+    return None
+
+
+def extract_personal_info(text):
+    """텍스트에서 개인정보를 추출합니다. 추출 항목은 기본 항목과 서식 파일에 정의된 항목입니다."""
+    messages = [
+        {"role": "system", "content": _extract_system_prompt()},
+        {"role": "user", "content": f"텍스트:\n{text}"}
+    ]
+    models = _models(EXTRACT_MODEL)
+    for model in models:
+        response = _chat("gpt_extract", model, messages, response_format={"type": "json_object"})
+        result_text = response.choices[0].message.content.strip()
+        try:
+            info = json.loads(result_text)
+        except ValueError:
+            if model == models[-1]:
+                raise
+            problem = "json"
+        else:
+            problem = _extraction_problem(info, text)
+            if problem is None or model == models[-1]:
+                return info
+        metrics.inc("voicedoc_gpt_escalations_total", stage="gpt_extract", reason=problem)
+
+
+@lru_cache(maxsize=64)
+def _generate_system_prompt(doc_type):
+    """본문 생성용 고정 지시문 (문서 유형별로 한 번 만들어 같은 문자열을 재사용)."""
+    return f"""{get_template(doc_type).prompt}
+
+사용자가 주는 개인 정보를 활용하여 "{doc_type}"에 들어갈 본문 내용을 작성해주세요.
+
+**작성 지침:**
+1. 제공된 개인 정보를 정확하게 반영하세요.
+2. 문서의 형식이나 구조는 작성하지 말고, 본문 내용만 작성하세요.
+3. 자연스럽고 읽기 쉬운 문장으로 작성하세요.
+4. 개인 정보가 없는 항목은 적절히 처리하거나 생략하세요.
+5. 문서 유형에 맞는 적절한 톤과 스타일을 유지하세요."""
+
+
+def _generation_problem(response, info_json):
+    """생성 결과 검증. 문제가 있으면 사유(지표 라벨), 없으면 None."""
+    choice = response.choices[0]
+    content = (choice.message.content or "").strip()
+    if not content:
+        return "empty"
+    if choice.finish_reason == "length":
+        return "length"
+    name = info_json.get("name")
+    if isinstance(name, str) and name.strip() and _compact(name) not in _compact(content):
+        return "name"
+    return None
+
+
+def generate_document_content(info_json, doc_type="근로계약서"):
+    """개인정보를 바탕으로 문서 내용을 생성합니다."""
+    info_str = json.dumps(info_json, indent=2, ensure_ascii=False)
+    messages = [
+        {"role": "system", "content": _generate_system_prompt(doc_type)},
+        {"role": "user", "content": f"**개인 정보:**\n{info_str}\n\n위 정보를 바탕으로 {doc_type}의 본문 내용만 작성해주세요."}
+    ]
+    models = _models(GENERATE_MODEL)
+    for model in models:
+        response = _chat("gpt_generate", model, messages, temperature=0.5, max_tokens=2000)
+        problem = _generation_problem(response, info_json)
+        if problem is None or model == models[-1]:
+            return (response.choices[0].message.content or "").strip()
+        metrics.inc("voicedoc_gpt_escalations_total", stage="gpt_generate", reason=problem)
@@ -0,0 +1,376 @@
+"""녹음 파일과 PDF를 URL로 제공하는 미디어 서버.
+
+st.audio / st.download_button에 바이트를 넘기면 스크립트가 다시 실행될 때마다
+파일 전체가 웹소켓으로 다시 전송됩니다. 대신 파일을 등록하고 URL만 넘기면
+브라우저가 이 서버에서 직접 받아 가므로, 녹음이 길어도 재실행 때 보내는 내용은 URL 한 줄입니다.
+
+    - 등록한 파일(또는 메모리의 PDF 바이트)만 추측할 수 없는 토큰 URL로 제공합니다.
+    - Range 요청(206 Partial Content)으로 재생 위치 이동이 가능합니다.
+    - ETag는 파일 SHA-256과 수정 시각으로 만들고 If-None-Match(304), If-Range를 지원합니다.
+    - 파일을 통째로 읽지 않고 MEDIA_CHUNK_SIZE 단위로 보냅니다. 암호화된 녹음(voicedoc.sealed)은
+      요청 구간만 복호화해 보냅니다.
+
+녹음에는 주민등록번호·주소가 들어 있고 접근 제어는 URL 토큰뿐이므로 기본으로 꺼져 있습니다.
+켜면 MEDIA_HOST(기본 127.0.0.1)에만 열고 평문 http로 제공하므로, 다른 기기에서 쓰려면
+HTTPS 프록시를 앞에 두고 MEDIA_BASE_URL에 그 주소를 지정합니다.
+페이지가 https로 열렸는데 MEDIA_BASE_URL이 없으면 http 주소를 만들지 않고 바이트를 직접 넘깁니다.
+바이트를 직접 넘길 때 st.audio는 녹음 전체가 필요하므로, 녹음은 "녹음 듣기"를 켰을 때만 복호화해
+세션에 한 벌 두고(AUDIO_PREVIEW_KEY) 파일이 바뀔 때까지 재실행마다 다시 읽지 않습니다. 끄면 버립니다.
+
+설정:
+    MEDIA_PORT        미디어 서버 포트 (비우면 끄고 바이트를 직접 넘김)   기본 꺼짐
+    MEDIA_HOST        미디어 서버가 여는 주소                            기본 127.0.0.1
+    MEDIA_BASE_URL    브라우저가 접근할 주소 (프록시 뒤에서 사용)        기본 http://<접속 호스트>:MEDIA_PORT
+    MEDIA_MAX_ENTRIES 등록 항목 최대 수 (넘으면 오래된 것부터 해제)      기본 1024
+    MEDIA_MAX_MB      메모리에 보관하는 바이트 항목(PDF) 합계 상한(MB)    기본 64
+"""
+import hashlib
+import logging
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from . import metrics
+from .evidence import content_type_for
+from .sealed import audio_size, open_audio
+from .signature import sha256_file
+
+MEDIA_PORT = os.getenv("MEDIA_PORT", "")
+MEDIA_HOST = os.getenv("MEDIA_HOST", "127.0.0.1")
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "").rstrip("/")
+MEDIA_MAX_ENTRIES = int(os.getenv("MEDIA_MAX_ENTRIES", "1024"))
+MEDIA_MAX_BYTES = int(float(os.getenv("MEDIA_MAX_MB", "64")) * 1024 * 1024)
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+_lock = threading.Lock()
+# 토큰 -> 항목 (path 또는 data, filename, content_type, attachment, etag)
+_entries = OrderedDict()
+# 파일 경로 / 바이트 해시 -> 토큰 (같은 대상은 같은 URL로 제공해 브라우저 캐시를 살림)
+_tokens = {}
+# _entries 중 메모리 바이트 항목의 크기 합계
+_data_bytes = 0
+
+# 미디어 서버 없이 재생 중인 녹음 {"path", "version", "data"} (세션 상태 키)
+AUDIO_PREVIEW_KEY = "audio_preview"
+
+
+class _Entry:
+    __slots__ = ("path", "data", "filename", "content_type", "attachment", "source", "size", "etag", "etag_key")
+
+    def __init__(self, path, data, filename, content_type, attachment, source):
+        self.path = path
+        self.data = data
+        self.filename = filename
+        self.content_type = content_type
+        self.attachment = attachment
+        self.source = source
+        self.size = None
+        self.etag = None
+        self.etag_key = None
+
+    def stat(self):
+        """(크기, ETag). 파일은 (크기, 수정 시각)이 바뀔 때만 해시를 다시 계산합니다."""
+        if self.data is not None:
+            if self.etag is None:
+                self.etag = f'"{hashlib.sha256(self.data).hexdigest()[:32]}"'
+            return len(self.data), self.etag
+        st = os.stat(self.path)
+        key = (st.st_size, st.st_mtime_ns)
+        if key != self.etag_key:
+            # 암호화된 녹음은 복호화한 크기를 알리고, ETag는 디스크의 파일로 만듭니다.
+            self.size = audio_size(self.path)
+            self.etag = f'"{sha256_file(self.path)[:32]}-{st.st_mtime_ns:x}"'
+            self.etag_key = key
+        return self.size, self.etag
+
+
+def _entry_bytes(entry):
+    return len(entry.data) if entry.data is not None else 0
+
+
+def _pop(token):
+    """_lock을 잡은 채로 호출합니다."""
+    global _data_bytes
+    entry = _entries.pop(token)
+    _data_bytes -= _entry_bytes(entry)
+    _tokens.pop(entry.source, None)
+
+
+def _register(source, entry):
+    global _data_bytes
+    with _lock:
+        token = _tokens.get(source)
+        if token is None or token not in _entries:
+            token = secrets.token_urlsafe(24)
+            _tokens[source] = token
+        else:
+            _data_bytes -= _entry_bytes(_entries[token])
+        _entries[token] = entry
+        _entries.move_to_end(token)
+        _data_bytes += _entry_bytes(entry)
+        # 방금 등록한 항목은 남기고 오래된 것부터 해제합니다.
+        while len(_entries) > 1 and (len(_entries) > MEDIA_MAX_ENTRIES or _data_bytes > MEDIA_MAX_BYTES):
+            _pop(next(iter(_entries)))
+    return token
+
+
+def register_file(path, content_type=None, filename=None, attachment=False):
+    """파일을 등록하고 토큰을 반환합니다. 같은 경로는 같은 토큰을 씁니다."""
+    path = str(Path(path).resolve())
+    if content_type is None:
+        content_type = "application/pdf" if path.endswith(".pdf") else content_type_for(path)
+    entry = _Entry(path, None, filename or os.path.basename(path), content_type, attachment, ("file", path))
+    return _register(entry.source, entry)
+
+
+def register_bytes(data, filename, content_type, attachment=True):
+    """메모리의 바이트(미리 렌더링된 PDF 등)를 등록하고 토큰을 반환합니다. 복사하지 않고 참조만 보관합니다."""
+    source = ("bytes", hashlib.sha256(data).hexdigest(), filename)
+    entry = _Entry(None, data, filename, content_type, attachment, source)
+    return _register(source, entry)
+
+
+def unregister_files(prefix):
+    """경로가 prefix로 시작하는 등록 파일을 해제합니다 (세션 임시 폴더 정리 시)."""
+    prefix = str(Path(prefix).resolve())
+    with _lock:
+        for token in [t for t, e in _entries.items() if e.path and e.path.startswith(prefix)]:
+            _pop(token)
+
+
+def unregister_bytes(data):
+    """register_bytes로 등록한 같은 내용의 항목을 해제합니다."""
+    digest = hashlib.sha256(data).hexdigest()
+    with _lock:
+        for token in [t for t, e in _entries.items() if e.source[:2] == ("bytes", digest)]:
+            _pop(token)
+
+
+def _lookup(token):
+    with _lock:
+        return _entries.get(token)
+
+
+def _parse_range(header, size):
+    """Range 헤더를 (시작, 끝) 바이트 위치로 바꿉니다. 형식 오류나 여러 구간이면 None(전체 전송),
+    만족할 수 없는 구간이면 False."""
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N : 마지막 N바이트
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _content_disposition(entry):
+    kind = "attachment" if entry.attachment else "inline"
+    ascii_name = entry.filename.encode("ascii", "replace").decode().replace('"', "")
+    return f"{kind}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(entry.filename)}"
+
+
+def _make_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MediaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_HEAD(self):
+            self._serve(send_body=False)
+
+        def do_GET(self):
+            self._serve(send_body=True)
+
+        def _serve(self, send_body):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            entry = _lookup(parts[1]) if len(parts) >= 2 and parts[0] == "media" else None
+            try:
+                size, etag = entry.stat() if entry else (None, None)
+            except OSError:
+                entry = None
+            if entry is None:
+                self.send_error(404)
+                return
+
+            common = [
+                ("ETag", etag),
+                ("Accept-Ranges", "bytes"),
+                ("Cache-Control", "private, max-age=3600"),
+            ]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                for name, value in common:
+                    self.send_header(name, value)
+                self.end_headers()
+                metrics.inc("voicedoc_media_requests_total", status="304")
+                return
+
+            byte_range = None
+            if self.headers.get("Range") and self.headers.get("If-Range", etag) == etag:
+                byte_range = _parse_range(self.headers["Range"], size)
+            if byte_range is False:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                metrics.inc("voicedoc_media_requests_total", status="416")
+                return
+
+            start, end = byte_range or (0, size - 1)
+            length = max(0, end - start + 1)
+            self.send_response(206 if byte_range else 200)
+            for name, value in common:
+                self.send_header(name, value)
+            self.send_header("Content-Type", entry.content_type)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Content-Disposition", _content_disposition(entry))
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            metrics.inc("voicedoc_media_requests_total", status="206" if byte_range else "200")
+            if not send_body or not length:
+                return
+
+            try:
+                if entry.data is not None:
+                    self.wfile.write(memoryview(entry.data)[start:end + 1])
+                else:
+                    with open_audio(entry.path) as f:
+                        f.seek(start)
+                        remaining = length
+                        while remaining:
+                            chunk = f.read(min(MEDIA_CHUNK_SIZE, remaining))
+                            if not chunk:
+                                break
+                            self.wfile.write(chunk)
+                            remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # 재생 위치를 옮기면 브라우저가 이전 요청을 끊습니다.
+                pass
+            metrics.inc("voicedoc_media_bytes_total", length)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MediaHandler
+
+
+@lru_cache(maxsize=None)
+def start_media_server(port=None):
+    """미디어 서버를 프로세스당 한 번만 시작합니다. 꺼져 있거나 포트를 열 수 없으면 None."""
+    port = port or MEDIA_PORT
+    if not port:
+        return None
+
+    from http.server import ThreadingHTTPServer
+
+    try:
+        server = ThreadingHTTPServer((MEDIA_HOST, int(port)), _make_handler())
+    except OSError as e:
+        # 다른 프로세스(8501이 찼을 때 옮겨 간 Streamlit 등)가 포트를 쓰고 있으면 바이트를 직접 넘깁니다.
+        logger.warning("미디어 서버를 %s:%s에 열 수 없어 파일을 페이지로 직접 보냅니다: %s", MEDIA_HOST, port, e)
+        metrics.inc("voicedoc_media_server_errors_total")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="voicedoc-media", daemon=True).start()
+    return server
+
+
+def media_url(token, base_url=None):
+    """토큰의 URL. base_url이 없으면 MEDIA_BASE_URL 또는 http://localhost:<포트>."""
+    server = start_media_server()
+    base = base_url or MEDIA_BASE_URL or f"http://localhost:{server.server_address[1]}"
+    return f"{base}/media/{token}"
+
+
+def _page_url():
+    """브라우저가 연 페이지 주소의 (scheme, host). 실행 중인 Streamlit 서버가 없으면 (None, None)."""
+    import streamlit as st
+    try:
+        url = urlsplit(getattr(st.context, "url", None) or "")
+        headers = st.context.headers
+        scheme = headers.get("X-Forwarded-Proto") or url.scheme or None
+        host = url.hostname or (headers.get("Host") or "").rsplit(":", 1)[0] or None
+    except (AttributeError, RuntimeError):
+        return None, None
+    return scheme, host
+
+
+def _browser_base_url():
+    """브라우저에 넘길 미디어 서버 주소. 서버가 꺼져 있거나 https 페이지에서 쓸 주소가 없으면 None."""
+    server = start_media_server()
+    if server is None:
+        return None
+    if MEDIA_BASE_URL:
+        return MEDIA_BASE_URL
+    scheme, host = _page_url()
+    if scheme == "https":
+        # https 페이지에서 http 주소는 혼합 콘텐츠로 막히므로 MEDIA_BASE_URL 없이는 쓰지 않습니다.
+        metrics.inc("voicedoc_media_fallbacks_total", reason="https")
+        return None
+    return f"http://{host or 'localhost'}:{server.server_address[1]}"
+
+
+def _preview_bytes(path):
+    """미디어 서버 없이 재생할 녹음 바이트. 같은 파일이면 재실행 때 다시 읽거나 복호화하지 않습니다."""
+    import streamlit as st
+    version = os.stat(path).st_mtime_ns
+    preview = st.session_state.get(AUDIO_PREVIEW_KEY)
+    if not preview or preview["path"] != str(path) or preview["version"] != version:
+        with open_audio(path) as f:
+            preview = {"path": str(path), "version": version, "data": f.read()}
+        st.session_state[AUDIO_PREVIEW_KEY] = preview
+    return preview["data"]
+
+
+def audio_player(path):
+    """녹음 파일 재생 위젯. 미디어 서버 주소가 있으면 URL만 넘기고, 없으면 "녹음 듣기"를 켰을 때만 바이트를 넘깁니다."""
+    import streamlit as st
+    base_url = _browser_base_url()
+    if base_url is None:
+        key = "audio_preview_" + hashlib.sha256(str(path).encode("utf-8")).hexdigest()[:12]
+        if not st.checkbox("▶️ 녹음 듣기", key=key):
+            st.session_state.pop(AUDIO_PREVIEW_KEY, None)
+            return
+        st.audio(_preview_bytes(path), format=f"audio/{Path(path).suffix.lstrip('.')}", start_time=0)
+        return
+    token = register_file(path)
+    # 같은 경로에 다시 녹음하면 주소가 바뀌어 브라우저 캐시를 쓰지 않습니다.
+    version = os.stat(path).st_mtime_ns
+    st.audio(f"{media_url(token, base_url)}?v={version:x}", start_time=0)
+
+
+def download_button(label, file_name, data=None, path=None, mime="application/pdf"):
+    """다운로드 버튼. 미디어 서버 주소가 있으면 링크로 제공해 바이트를 페이지에 싣지 않습니다."""
+    import streamlit as st
+    base_url = _browser_base_url()
+    if base_url is None:
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        st.download_button(label, data=data, file_name=file_name, mime=mime, use_container_width=True)
+        return
+    if data is not None:
+        token = register_bytes(data, file_name, mime)
+    else:
+        token = register_file(path, content_type=mime, filename=file_name, attachment=True)
+    st.link_button(label, media_url(token, base_url), use_container_width=True)
@@ -0,0 +1,325 @@
+"""파이프라인 단계별 지연 시간 및 자원 사용량 계측.
+
+METRICS_ENABLED=1 일 때만 기록하며, 꺼져 있으면 span()은 공유 no-op 컨텍스트를 돌려주고
+카운터/게이지 함수는 바로 반환하므로 비용이 거의 없습니다.
+수집한 값은 Prometheus 텍스트 형식(render_prometheus)으로 내보내며,
+METRICS_PORT를 지정하면 별도 스레드의 HTTP 서버(/metrics)로 제공합니다.
+지표에 세션 메모리와 OpenAI 사용량이 들어 있으므로 서버는 METRICS_HOST에만 엽니다.
+
+설정:
+    METRICS_ENABLED   1이면 수집                                   기본 꺼짐
+    METRICS_PORT      /metrics 서버 포트 (비우면 끔)               기본 꺼짐
+    METRICS_HOST      /metrics 서버가 여는 주소                     기본 127.0.0.1
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+
+ENABLED = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_recent_spans = deque(maxlen=200)
+
+_HELP = {
+    "voicedoc_stage_seconds": ("histogram", "파이프라인 단계별 소요 시간(초)"),
+    "voicedoc_openai_tokens_total": ("counter", "OpenAI 토큰 사용량"),
+    "voicedoc_openai_retries_total": ("counter", "OpenAI 요청 재시도 횟수"),
+    "voicedoc_openai_requests_total": ("counter", "OpenAI 요청 횟수"),
+    "voicedoc_gpt_escalations_total": ("counter", "검증 실패로 상위 모델에 다시 요청한 횟수"),
+    "voicedoc_stage_errors_total": ("counter", "단계별 오류 횟수"),
+    "voicedoc_uploaded_bytes_total": ("counter", "업로드한 바이트 수"),
+    "voicedoc_pdf_bytes_total": ("counter", "생성한 PDF 바이트 수"),
+    "voicedoc_pdf_documents_total": ("counter", "생성한 PDF 수"),
+    "voicedoc_evidence_fallbacks_total": ("counter", "증거 파일 인코딩에 실패해 원본 WAV를 쓴 횟수(형식별)"),
+    "voicedoc_field_corrections_total": ("counter", "개인정보 항목 수정 횟수(본문 치환/재생성 필요)"),
+    "voicedoc_media_requests_total": ("counter", "미디어 서버 응답 수(상태 코드별)"),
+    "voicedoc_media_bytes_total": ("counter", "미디어 서버가 보낸 바이트 수"),
+    "voicedoc_media_server_errors_total": ("counter", "미디어 서버를 열지 못한 횟수"),
+    "voicedoc_media_fallbacks_total": ("counter", "미디어 서버 대신 바이트를 직접 넘긴 횟수(이유별)"),
+    "voicedoc_prerender_total": ("counter", "PDF 미리 렌더링 시작 및 캐시 조회 결과(hit/wait/miss)"),
+    "voicedoc_session_reaps_total": ("counter", "유휴 세션 정리 및 복원 횟수"),
+    "voicedoc_session_reaped_bytes_total": ("counter", "유휴 세션 정리로 해제한 바이트 수(추정)"),
+    "voicedoc_sessions": ("gauge", "활성/정리된 세션 수"),
+    "voicedoc_queue_depth": ("gauge", "공유 자원 대기열 길이"),
+    "voicedoc_session_state_max_bytes": ("gauge", "프로세스의 모든 세션 중 세션 상태가 가장 컸을 때의 바이트 수(추정)"),
+    "voicedoc_process_peak_rss_bytes": ("gauge", "프로세스 최대 RSS(바이트)"),
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """카운터를 증가시킵니다."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """게이지 값을 설정합니다."""
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def add_gauge(name, delta, **labels):
+    """게이지 값을 delta만큼 더합니다. 대기열 길이처럼 증감하는 값에 사용합니다."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + delta
+
+
+def max_gauge(name, value, **labels):
+    """게이지를 지금까지의 최댓값으로 유지합니다."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        if value > _gauges.get(key, 0):
+            _gauges[key] = value
+
+
+def observe(name, value, **labels):
+    """히스토그램에 관측값을 기록합니다."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                hist["buckets"][i] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+
+@contextmanager
+def _timed_span(stage):
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("voicedoc_stage_seconds", elapsed, stage=stage)
+        if failed:
+            inc("voicedoc_stage_errors_total", stage=stage)
+        with _lock:
+            _recent_spans.append({
+                "stage": stage,
+                "started_at": time.time() - elapsed,
+                "duration_ms": round(elapsed * 1000, 2),
+                "error": failed,
+            })
+
+
+def span(stage):
+    """단계 하나의 소요 시간을 기록하는 컨텍스트를 반환합니다.
+
+    사용 예:
+        with metrics.span("transcribe"):
+            ...
+    """
+    if not ENABLED:
+        return _NOOP
+    return _timed_span(stage)
+
+
+def record_openai_usage(stage, raw_response, model=""):
+    """OpenAI 응답의 요청 수, 토큰 사용량(prompt/completion/cached)과 재시도 횟수를 모델별로 기록합니다."""
+    if not ENABLED:
+        return
+    inc("voicedoc_openai_requests_total", stage=stage, model=model)
+    inc("voicedoc_openai_retries_total", getattr(raw_response, "retries_taken", 0) or 0, stage=stage)
+    usage = getattr(raw_response.parse(), "usage", None)
+    if usage is None:
+        return
+    inc("voicedoc_openai_tokens_total", usage.prompt_tokens or 0, stage=stage, model=model, kind="prompt")
+    inc("voicedoc_openai_tokens_total", usage.completion_tokens or 0, stage=stage, model=model, kind="completion")
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details else None
+    if cached:
+        inc("voicedoc_openai_tokens_total", cached, stage=stage, model=model, kind="cached")
+
+
+def openai_summary():
+    """관리자 화면용 단계·모델별 OpenAI 사용량(요청, 토큰, 프롬프트 캐시 적중률, 상위 모델 전환)을 반환합니다."""
+    with _lock:
+        counters = dict(_counters)
+    rows = {}
+    escalations = {}
+    for (name, labels), value in counters.items():
+        labels = dict(labels)
+        if name == "voicedoc_gpt_escalations_total":
+            escalations[labels.get("stage", "")] = escalations.get(labels.get("stage", ""), 0) + value
+            continue
+        if name not in ("voicedoc_openai_requests_total", "voicedoc_openai_tokens_total"):
+            continue
+        row = rows.setdefault((labels.get("stage", ""), labels.get("model", "")), {
+            "requests": 0, "prompt": 0, "cached": 0, "completion": 0,
+        })
+        row["requests" if name == "voicedoc_openai_requests_total" else labels.get("kind", "")] += value
+    return [
+        {
+            "stage": stage,
+            "model": model,
+            "requests": row["requests"],
+            "prompt_tokens": row["prompt"],
+            "cached_tokens": row["cached"],
+            "cache_hit_rate": round(row["cached"] / row["prompt"], 3) if row["prompt"] else 0.0,
+            "completion_tokens": row["completion"],
+            "escalations": escalations.get(stage, 0),
+        }
+        for (stage, model), row in sorted(rows.items())
+    ]
+
+
+def _session_value_bytes(value):
+    """세션 상태 값 하나가 점유하는 바이트 수를 대략 추정합니다."""
+    raw = getattr(value, "raw_data", None)  # pydub.AudioSegment
+    if raw is not None:
+        return len(raw)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+def record_session_memory(session_state):
+    """세션 상태의 점유 바이트 수를 추정해 프로세스 전체 최댓값(세션 구분 없음)과 최대 RSS를 기록합니다.
+
+    세션별 내역은 voicedoc.sessions.top_consumers()로 봅니다 (세션 id를 라벨로 쓰면 시계열이 끝없이 늘어납니다).
+    """
+    if not ENABLED:
+        return
+    total = sum(_session_value_bytes(session_state[k]) for k in list(session_state.keys()))
+    max_gauge("voicedoc_session_state_max_bytes", total)
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KiB, macOS는 바이트 단위
+    set_gauge("voicedoc_process_peak_rss_bytes", peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def render_prometheus():
+    """수집된 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {k: {"buckets": list(v["buckets"]), "sum": v["sum"], "count": v["count"]}
+                      for k, v in _histograms.items()}
+
+    lines = []
+    names = sorted({k[0] for k in counters} | {k[0] for k in gauges} | {k[0] for k in histograms})
+    for name in names:
+        kind, help_text = _HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (n, labels), value in sorted(gauges.items()):
+            if n == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            for bound, count in zip(LATENCY_BUCKETS, hist["buckets"]):
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def stage_summary():
+    """관리자 화면용 단계별 요약(횟수, 평균, 합계)을 반환합니다."""
+    with _lock:
+        items = [(k, v["count"], v["sum"]) for k, v in _histograms.items() if k[0] == "voicedoc_stage_seconds"]
+    rows = []
+    for (_, labels), count, total in sorted(items):
+        stage = dict(labels).get("stage", "")
+        rows.append({
+            "stage": stage,
+            "count": count,
+            "avg_ms": round(total / count * 1000, 1) if count else 0.0,
+            "total_s": round(total, 2),
+        })
+    return rows
+
+
+def recent_spans():
+    """최근 기록된 span 목록을 최신순으로 반환합니다."""
+    with _lock:
+        return list(reversed(_recent_spans))
+
+
+@lru_cache(maxsize=None)
+def start_metrics_server(port=None):
+    """/metrics 엔드포인트를 제공하는 HTTP 서버를 프로세스당 한 번만 시작합니다. 꺼져 있거나 포트를 열 수 없으면 None."""
+    port = port or os.getenv("METRICS_PORT")
+    if not ENABLED or not port:
+        return None
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((METRICS_HOST, int(port)), MetricsHandler)
+    except OSError as e:
+        # 다른 Streamlit 워커가 이미 포트를 쓰고 있어도 앱은 계속 동작해야 합니다.
+        logger.warning("지표 서버를 %s:%s에 열 수 없습니다: %s", METRICS_HOST, port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="voicedoc-metrics", daemon=True).start()
+    return server
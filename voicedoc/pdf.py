@@ -0,0 +1,503 @@
+"""문서 유형별 PDF 생성.
+
+PDF_COMPACT=1(기본)이면 간결 출력 모드로 만듭니다.
+    - 페이지 스트림 압축을 rl_config 설정과 무관하게 켭니다.
+    - 음성 증거 QR 코드를 PNG 래스터 대신 벡터 도형으로 그립니다.
+글꼴은 reportlab이 항상 사용한 글리프만 부분 집합으로 넣고, 같은 글꼴·이미지는
+문서 안에서 한 번만 저장하므로(내용 해시 기준) 따로 처리하지 않습니다.
+"""
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.flowables import Flowable
+from reportlab.platypus import Image as RLImage
+
+from . import metrics
+from .config import DOCUMENTS_DIR
+from .fonts import register_korean_fonts
+from .gpt import generate_document_content
+from .signature import generate_qr_code, qr_available
+from .storage import get_audio_file_url
+from .templates import get_template
+
+PDF_COMPACT = os.getenv("PDF_COMPACT", "1") == "1"
+
+
+@lru_cache(maxsize=None)
+def get_pdf_styles():
+    """모든 PDF 스타일을 중앙에서 정의하고 반환합니다. 프로세스당 한 번만 생성됩니다."""
+    korean_font = register_korean_fonts()
+    styles = getSampleStyleSheet()
+
+    pdf_styles = {
+        'DocTitle': ParagraphStyle(
+            'DocTitle',
+            parent=styles['Heading1'],
+            fontName=korean_font,
+            fontSize=16,
+            textColor='#000000',
+            spaceAfter=15,
+            alignment=TA_CENTER
+        ),
+        'TableLabelStyle': ParagraphStyle(
+            'TableLabelStyle',
+            parent=styles['Normal'],
+            fontName=korean_font,
+            fontSize=10,
+            textColor='#000000',
+            alignment=TA_LEFT
+        ),
+        'TableValueStyle': ParagraphStyle(
+            'TableValueStyle',
+            parent=styles['Normal'],
+            fontName=korean_font,
+            fontSize=10,
+            textColor='#000000',
+            alignment=TA_LEFT
+        ),
+        'ContentStyle': ParagraphStyle(
+            'ContentStyle',
+            parent=styles['Normal'],
+            fontName=korean_font,
+            fontSize=10,
+            leading=14,
+            textColor='#000000',
+            alignment=TA_LEFT
+        ),
+        'GenericTitle': ParagraphStyle(
+            'GenericTitle',
+            parent=styles['Heading1'],
+            fontName=korean_font,
+            fontSize=18,
+            textColor='#000000',
+            spaceAfter=12,
+            alignment=TA_CENTER
+        ),
+        'GenericBody': ParagraphStyle(
+            'GenericBody',
+            parent=styles['Normal'],
+            fontName=korean_font,
+            fontSize=11,
+            leading=18,
+            textColor='#000000',
+            spaceAfter=6,
+            alignment=TA_JUSTIFY
+        )
+    }
+
+    return pdf_styles
+
+
+def create_paragraph(text, style_name):
+    """Paragraph 객체를 생성하는 헬퍼 함수."""
+    if not text:
+        text = ""
+
+    text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'\*([^*]+)\*', r'<b>\1</b>', text)
+
+    tag_placeholders = {}
+    protected_text = text
+    tag_counter = 0
+
+    def replace_tag(match):
+        nonlocal tag_counter
+        tag = match.group(0)
+        placeholder = f'__HTML_TAG_{tag_counter}__'
+        tag_placeholders[placeholder] = tag
+        tag_counter += 1
+        return placeholder
+
+    protected_text = re.sub(r'<[^>]+>', replace_tag, protected_text)
+    escaped_text = protected_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+    for placeholder, tag in tag_placeholders.items():
+        escaped_text = escaped_text.replace(placeholder, tag)
+
+    escaped_text = escaped_text.replace('\n', '<br/>')
+
+    pdf_styles = get_pdf_styles()
+    style = pdf_styles.get(style_name, pdf_styles['GenericBody'])
+    return Paragraph(escaped_text, style)
+
+
+def _form_doc_template(buffer, compact=False):
+    """신청서/계약서 공용 문서 템플릿을 생성합니다."""
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=25*mm,
+        leftMargin=25*mm,
+        topMargin=20*mm,
+        bottomMargin=20*mm,
+        pageCompression=1 if compact else None
+    )
+
+
+def _vector_qr_code(data, size):
+    """QR 코드를 벡터 도형(Drawing)으로 만듭니다. 래스터 이미지보다 작고 인쇄해도 선명합니다."""
+    widget = QrCodeWidget(data, barBorder=4)
+    x1, y1, x2, y2 = widget.getBounds()
+    drawing = Drawing(size, size, transform=[size / (x2 - x1), 0, 0, size / (y2 - y1), 0, 0])
+    drawing.add(widget)
+    return drawing
+
+
+def _header_table_style():
+    """헤더 행이 있는 정보 테이블 스타일을 반환합니다."""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), register_korean_fonts()),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('TOPPADDING', (0, 1), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+
+
+class BoxedSection(Flowable):
+    """제목 + 테두리 상자 안의 본문. 페이지가 넘어가면 본문 사이(또는 문단 안)에서 나뉘고,
+    나뉜 부분마다 제목을 반복하고 테두리를 닫아 그립니다."""
+
+    def __init__(self, header, body, padding=8, header_gap=5*mm):
+        super().__init__()
+        self.header = header
+        self.body = body
+        self.padding = padding
+        self.header_gap = header_gap
+
+    def _frame_height(self, avail_width, avail_height):
+        _, self._header_height = self.header.wrap(avail_width, avail_height)
+        return self._header_height + self.header_gap + 2 * self.padding
+
+    def wrap(self, availWidth, availHeight):
+        self.width = availWidth
+        inner_width = availWidth - 2 * self.padding
+        height = self._frame_height(availWidth, availHeight)
+        self._heights = []
+        for flowable in self.body:
+            _, h = flowable.wrap(inner_width, availHeight)
+            self._heights.append(h)
+            height += h
+            if height > availHeight:
+                # 어차피 나눠야 하므로 나머지는 재지 않습니다 (페이지 수에 선형).
+                break
+        self.height = height
+        return availWidth, height
+
+    def split(self, availWidth, availHeight):
+        inner_width = availWidth - 2 * self.padding
+        remaining = availHeight - self._frame_height(availWidth, availHeight)
+        count = 0
+        for flowable in self.body:
+            _, h = flowable.wrap(inner_width, remaining)
+            if h > remaining:
+                break
+            remaining -= h
+            count += 1
+        fitted, body = self.body[:count], self.body[count:]
+        if body:
+            # 걸친 문단은 문단 안에서 나눕니다.
+            parts = body[0].split(inner_width, remaining)
+            if len(parts) > 1:
+                fitted = fitted + parts[:1]
+                body = parts[1:] + body[1:]
+        if not fitted or not body:
+            return []
+        return [
+            BoxedSection(self.header, fitted, self.padding, self.header_gap),
+            BoxedSection(self.header, body, self.padding, self.header_gap),
+        ]
+
+    def draw(self):
+        y = self.height - self._header_height
+        self.header.drawOn(self.canv, 0, y)
+        y -= self.header_gap
+        self.canv.setStrokeColor(colors.black)
+        self.canv.setLineWidth(1)
+        self.canv.rect(0, 0, self.width, y)
+        y -= self.padding
+        for flowable, h in zip(self.body, self._heights):
+            y -= h
+            flowable.drawOn(self.canv, self.padding, y)
+
+
+# 이보다 긴 문단은 문장 경계에서 여러 Paragraph로 나눕니다.
+# 한 Paragraph를 페이지마다 나누면 남은 부분 전체를 다시 줄바꿈하므로 시간이 쪽수의 제곱으로 늘어납니다.
+MAX_PARAGRAPH_CHARS = 1500
+
+
+def _split_long_text(text, limit=MAX_PARAGRAPH_CHARS):
+    """긴 문단을 문장 단위로 묶어 limit 글자 이하 조각 목록으로 나눕니다."""
+    if len(text) <= limit:
+        return [text]
+    pieces, current = [], ""
+    for sentence in re.split(r'(?<=[.!?])[ \t]+', text):
+        if current and len(current) + len(sentence) + 1 > limit:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _content_flowables(content):
+    """본문을 줄 단위 Paragraph로 나눕니다. 빈 줄은 반 줄 간격으로 바꿉니다."""
+    leading = get_pdf_styles()['ContentStyle'].leading
+    flowables = []
+    for line in (content or "").split('\n'):
+        if line.strip():
+            flowables += [create_paragraph(piece, 'ContentStyle') for piece in _split_long_text(line)]
+        else:
+            flowables.append(Spacer(1, leading / 2))
+    return flowables
+
+
+def _append_content_section(story, title, content):
+    """본문 섹션(제목 + 테두리 상자)을 story에 추가합니다. 긴 본문은 여러 페이지로 이어집니다."""
+    header = create_paragraph(f"<b>■ {title}</b>", 'TableLabelStyle')
+    story.append(BoxedSection(header, _content_flowables(content)))
+    story.append(Spacer(1, 15*mm))
+
+
+def _consent_status(voice_signature):
+    """서명란에 표시할 동의 문구 확인 결과 (voicedoc.consent.verify_consent 결과 기준)."""
+    matched = voice_signature.get("consent_matched")
+    if matched is None:
+        # 동의 확인 모델을 쓰지 못한 경우: 녹음만 있고 문구는 확인하지 않았습니다.
+        return "음성 동의 녹음, 문구 미확인"
+    if matched:
+        return "음성 동의 완료"
+    return f"동의 문구 불일치, 일치도 {voice_signature.get('consent_score', 0):.0%}"
+
+
+def _append_signature_section(story, info_json, voice_signature, signer_role, compact=False):
+    """전자 서명 메타데이터 서명란을 story에 추가합니다."""
+    story.append(create_paragraph("<b>■ 전자 서명 및 증거 메타데이터</b>", 'TableLabelStyle'))
+    story.append(Spacer(1, 5*mm))
+
+    metadata_rows = []
+    signer_name = info_json.get("name", "미상")
+    metadata_rows.append([
+        create_paragraph("전자 서명 주체", 'TableLabelStyle'),
+        create_paragraph(f"{signer_role}: {signer_name} ({_consent_status(voice_signature)})", 'TableValueStyle')
+    ])
+
+    timestamp = voice_signature.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    metadata_rows.append([
+        create_paragraph("전자 서명 일시", 'TableLabelStyle'),
+        create_paragraph(timestamp, 'TableValueStyle')
+    ])
+
+    doc_hash = voice_signature.get("document_hash", "")
+    if doc_hash:
+        hash_display = f"{doc_hash[:16]}...{doc_hash[-8:]}"
+        metadata_rows.append([
+            create_paragraph("문서 해시", 'TableLabelStyle'),
+            create_paragraph(f"SHA-256: {hash_display}", 'TableValueStyle')
+        ])
+
+    # QR 코드 생성 및 삽입. 주소는 서명할 때 한 번 정해 둔 값을 쓰고, 렌더링(미리 렌더링 포함)에서는 업로드하지 않습니다.
+    audio_url = voice_signature.get("audio_file_url") or \
+        get_audio_file_url(voice_signature.get("audio_file_path", ""), use_web_url=False)
+    if audio_url and compact:
+        metadata_rows.append([
+            create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
+            _vector_qr_code(audio_url, 40*mm)
+        ])
+    elif audio_url and qr_available():
+        # QR 이미지는 디스크에 남기지 않고 메모리에서 바로 삽입합니다.
+        qr_buffer = generate_qr_code(audio_url, output_file=BytesIO(), size=150)
+
+        if qr_buffer:
+            try:
+                qr_image = RLImage(qr_buffer, width=40*mm, height=40*mm)
+                metadata_rows.append([
+                    create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
+                    qr_image
+                ])
+            except Exception:
+                metadata_rows.append([
+                    create_paragraph("음성 증거 첨부", 'TableLabelStyle'),
+                    create_paragraph("QR 코드 생성 실패", 'TableValueStyle')
+                ])
+
+    if metadata_rows:
+        metadata_table = Table(metadata_rows, colWidths=[50*mm, 110*mm])
+        metadata_table.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('LEFTPADDING', (0, 0), (-1, -1), 5),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+        ]))
+        story.append(metadata_table)
+
+
+def create_application_form_pdf(content, doc_type, info_json, buffer, voice_signature=None, compact=False,
+                                template=None):
+    """신청서 형식의 구조화된 PDF를 생성합니다."""
+    template = template or get_template(doc_type)
+    doc = _form_doc_template(buffer, compact)
+
+    story = []
+
+    # 제목
+    story.append(create_paragraph(f"<b>{doc_type}</b>", 'DocTitle'))
+    story.append(Spacer(1, 10*mm))
+
+    # 개인정보 테이블 (서식의 fields 순서, optional 항목은 값이 있을 때만)
+    data = [
+        [create_paragraph("<b>항목</b>", 'TableLabelStyle'),
+         create_paragraph("<b>내용</b>", 'TableLabelStyle')],
+    ]
+    for label, value in template.info_rows(info_json):
+        data.append([
+            create_paragraph(label, 'TableLabelStyle'),
+            create_paragraph(value, 'TableValueStyle')
+        ])
+
+    table = Table(data, colWidths=[40*mm, 120*mm], repeatRows=1, splitInRow=1)
+    table.setStyle(_header_table_style())
+
+    story.append(table)
+    story.append(Spacer(1, 10*mm))
+
+    # 신청 사유/내용 섹션
+    _append_content_section(story, template.content_title, content)
+
+    # 전자 서명 메타데이터 서명란
+    if voice_signature:
+        _append_signature_section(story, info_json, voice_signature, template.signer_role, compact)
+
+    doc.build(story)
+
+
+def create_employment_contract_pdf(content, doc_type, info_json, buffer, voice_signature=None, compact=False,
+                                   template=None):
+    """근로계약서 형식의 구조화된 PDF를 생성합니다."""
+    template = template or get_template(doc_type)
+    doc = _form_doc_template(buffer, compact)
+
+    story = []
+
+    # 제목
+    story.append(create_paragraph(f"<b>{doc_type}</b>", 'DocTitle'))
+    story.append(Spacer(1, 10*mm))
+
+    # 당사자 정보 테이블
+    party_data = [[create_paragraph(f"<b>{column}</b>", 'TableLabelStyle') for column in template.columns]]
+    for row in template.party_rows(info_json):
+        party_data.append(
+            [create_paragraph(row[0], 'TableLabelStyle')]
+            + [create_paragraph(value, 'TableValueStyle') for value in row[1:]]
+        )
+
+    col_widths = [width*mm for width in template.column_widths]
+    party_table = Table(party_data, colWidths=col_widths, repeatRows=1, splitInRow=1)
+    party_table.setStyle(_header_table_style())
+
+    story.append(party_table)
+    story.append(Spacer(1, 10*mm))
+
+    # 근로 조건 및 내용
+    _append_content_section(story, template.content_title, content)
+
+    # 전자 서명 메타데이터 서명란
+    if voice_signature:
+        _append_signature_section(story, info_json, voice_signature, template.signer_role, compact)
+
+    doc.build(story)
+
+
+def create_generic_pdf(content, doc_type, info_json, buffer, voice_signature=None, compact=False, template=None):
+    """기본 템플릿: 제목과 본문 문단만 있는 PDF를 생성합니다."""
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=30*mm,
+        leftMargin=30*mm,
+        topMargin=30*mm,
+        bottomMargin=30*mm,
+        pageCompression=1 if compact else None
+    )
+
+    story = []
+    story.append(create_paragraph(f"<b>{doc_type}</b>", 'GenericTitle'))
+    story.append(Spacer(1, 20*mm))
+
+    paragraphs = content.split('\n\n')
+    for para in paragraphs:
+        if para.strip():
+            story += [create_paragraph(piece, 'GenericBody') for piece in _split_long_text(para)]
+            story.append(Spacer(1, 6))
+
+    doc.build(story)
+
+
+# 서식 파일의 layout 값 -> PDF 생성 함수
+LAYOUT_BUILDERS = {
+    "application_form": create_application_form_pdf,
+    "employment_contract": create_employment_contract_pdf,
+    "generic": create_generic_pdf,
+}
+
+
+def create_document_pdf(content, doc_type, info_json, output, voice_signature=None, compact=PDF_COMPACT):
+    """doc_type의 서식(layout)에 맞는 PDF 템플릿 함수를 호출하고, 만든 PDF의 크기(바이트)를 반환합니다.
+
+    Args:
+        output: BytesIO 버퍼 또는 파일 경로 (문자열)
+        compact: 간결 출력 모드 (페이지 압축, 벡터 QR 코드)
+    """
+    template = get_template(doc_type)
+    start = output.tell() if hasattr(output, "tell") else 0
+    with metrics.span("pdf_build"):
+        LAYOUT_BUILDERS[template.layout](content, doc_type, info_json, output, voice_signature, compact, template)
+    size = (output.tell() - start) if hasattr(output, "tell") else os.path.getsize(output)
+    metrics.inc("voicedoc_pdf_bytes_total", size, compact=str(bool(compact)).lower())
+    metrics.inc("voicedoc_pdf_documents_total", compact=str(bool(compact)).lower())
+    return size
+
+
+def generate_document(info_json, doc_type="근로계약서", save_file=True, output_dir=DOCUMENTS_DIR):
+    """추출된 JSON 정보와 문서 유형을 바탕으로 문서를 생성하고 파일로 저장합니다."""
+    document_content = generate_document_content(info_json, doc_type)
+
+    if save_file:
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        name = info_json.get("name", "Unknown")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{name}_{doc_type}_{timestamp}.pdf"
+        filepath = os.path.join(output_dir, filename)
+
+        with open(filepath, 'wb') as f:
+            create_document_pdf(document_content, doc_type, info_json, f, voice_signature=None)
+
+        return document_content, filepath
+
+    return document_content, None
@@ -0,0 +1,137 @@
+"""PDF 미리 렌더링(speculative pre-rendering) 캐시.
+
+문서 본문이 준비되면 사용자가 'PDF 서류 생성하기'를 누르기 전에 백그라운드 스레드에서 PDF를 만들어 둡니다.
+결과는 입력 전체(본문, 문서 유형, 개인정보, 음성 서명, 간결 출력 여부)의 SHA-256 키로 저장하므로
+입력이 하나라도 바뀌면 다른 키가 되어 이전 결과는 쓰이지 않습니다 (오래된 항목은 LRU로 밀려남).
+버튼을 누르면 get_pdf()가 캐시된 바이트를 바로 돌려주고, 렌더링 중이면 끝날 때까지만 기다립니다.
+
+렌더링 스레드 풀은 프로세스 전체(모든 세션)가 함께 씁니다. 여러 세션이 동시에 본문을 만들면
+미리 렌더링은 풀 앞에 줄을 서지만, get_pdf()는 줄을 서지 않습니다. 캐시에 없거나 아직 시작하지 않은
+렌더링이면 예약을 취소하고 호출한 스레드에서 바로 렌더링하므로, 버튼을 누른 사용자는
+다른 세션의 미리 렌더링을 기다리지 않습니다.
+렌더링(reportlab)은 GIL을 잡는 파이썬 코드라 스레드를 늘려도 처리량은 거의 늘지 않으므로,
+PRERENDER_WORKERS는 동시에 본문을 검토하는 세션 수가 아니라 CPU 코어 몇 개를 내줄지로 정합니다.
+
+PDF에 넣을 음성 증거 QR 주소는 서명할 때 한 번 정한 voice_signature["audio_file_url"]을 쓰며,
+렌더링(미리 렌더링 포함)은 녹음을 업로드하지 않습니다 (voicedoc.pdf).
+
+설정:
+    PRERENDER_WORKERS      백그라운드 렌더링 스레드 수 (모든 세션 공용)   기본 2
+    PRERENDER_CACHE_SIZE   보관할 PDF 수 (프로세스 전체)                  기본 32
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from . import metrics
+from .pdf import PDF_COMPACT, create_document_pdf
+
+PRERENDER_WORKERS = int(os.getenv("PRERENDER_WORKERS", "2"))
+PRERENDER_CACHE_SIZE = int(os.getenv("PRERENDER_CACHE_SIZE", "32"))
+
+_lock = threading.Lock()
+# 키 -> Future (결과: PDF 바이트)
+_cache = OrderedDict()
+
+
+@lru_cache(maxsize=None)
+def _get_executor():
+    """렌더링 스레드 풀 (프로세스당 한 번 생성)."""
+    return ThreadPoolExecutor(max_workers=PRERENDER_WORKERS, thread_name_prefix="voicedoc-prerender")
+
+
+def render_key(content, doc_type, info_json, voice_signature=None, compact=PDF_COMPACT):
+    """PDF 입력 전체의 SHA-256 키."""
+    payload = json.dumps(
+        [content, doc_type, info_json, voice_signature, bool(compact)],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render(content, doc_type, info_json, voice_signature, compact):
+    buffer = BytesIO()
+    create_document_pdf(content, doc_type, info_json, buffer, voice_signature=voice_signature, compact=compact)
+    return buffer.getvalue()
+
+
+def _store(key, future):
+    """_lock 안에서 호출."""
+    _cache[key] = future
+    while len(_cache) > PRERENDER_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _submit(key, args):
+    """키에 대한 렌더링을 예약하고 Future를 반환합니다. 이미 있으면 기존 Future. _lock 안에서 호출."""
+    future = _cache.get(key)
+    if future is not None:
+        _cache.move_to_end(key)
+        return future, False
+    future = _get_executor().submit(_render, *args)
+    _store(key, future)
+    return future, True
+
+
+def prerender(content, doc_type, info_json, voice_signature=None, compact=PDF_COMPACT):
+    """백그라운드 렌더링을 시작하고 키를 반환합니다 (기다리지 않음). 같은 입력은 다시 렌더링하지 않습니다."""
+    key = render_key(content, doc_type, info_json, voice_signature, compact)
+    with _lock:
+        _, submitted = _submit(key, (content, doc_type, info_json, voice_signature, compact))
+    if submitted:
+        metrics.inc("voicedoc_prerender_total", result="started")
+    return key
+
+
+def get_pdf(content, doc_type, info_json, voice_signature=None, compact=PDF_COMPACT):
+    """PDF 바이트를 반환합니다. 미리 렌더링된 결과가 있으면 바로, 렌더링 중이면 끝날 때까지 기다립니다."""
+    key = render_key(content, doc_type, info_json, voice_signature, compact)
+    with _lock:
+        future = _cache.get(key)
+        # 풀에서 아직 시작하지 않은 렌더링은 다른 세션의 렌더링 뒤에 줄 서 있으므로 취소하고 여기서 만듭니다.
+        if future is None or future.cancel():
+            future = Future()
+            future.set_running_or_notify_cancel()
+            _store(key, future)
+            owner = True
+        else:
+            _cache.move_to_end(key)
+            owner = False
+
+    if owner:
+        metrics.inc("voicedoc_prerender_total", result="miss")
+        try:
+            future.set_result(_render(content, doc_type, info_json, voice_signature, compact))
+        except Exception as e:
+            future.set_exception(e)
+    else:
+        metrics.inc("voicedoc_prerender_total", result="hit" if future.done() else "wait")
+    try:
+        with metrics.span("pdf_prerender_wait"):
+            return future.result()
+    except Exception:
+        # 실패한 렌더링은 캐시에 남기지 않아 다음 요청에서 다시 시도합니다.
+        discard(key)
+        raise
+
+
+def peek(key):
+    """렌더링이 끝난 PDF 바이트를 기다리지 않고 반환합니다. 없거나 렌더링 중이면 None."""
+    with _lock:
+        future = _cache.get(key) if key else None
+    if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+        return None
+    return future.result()
+
+
+def discard(key):
+    """캐시 항목 하나를 지웁니다 (입력이 바뀌어 더는 쓰지 않을 때)."""
+    with _lock:
+        future = _cache.pop(key, None)
+    if future is not None:
+        future.cancel()
@@ -0,0 +1,154 @@
+"""스크립트 1회 실행(rerun) 단위의 온디맨드 프로파일링.
+
+세션별 토글(관리자 화면) 또는 쿼리 파라미터 ?profile=1 로 켭니다.
+쿼리 파라미터 방식은 PROFILING_ALLOWED=1 일 때만 허용됩니다.
+
+한 번의 실행마다 PROFILE_DIR 아래에 세 가지 파일을 남깁니다.
+    <시각>_<id>_<단계>.pstats  : cProfile 결과 (snakeviz, python -m pstats 로 확인)
+    <시각>_<id>_<단계>.folded  : 샘플링 스택 (flamegraph.pl, speedscope 로 플레임그래프 생성)
+    <시각>_<id>_<단계>.alloc.txt : tracemalloc 상위 할당 위치
+<단계>는 mark_step()으로 표시한 작업 단계(whisper_convert, extract, pdf_build, signing 등)입니다.
+st.fragment로 한 단계만 다시 실행될 때는 페이지 맨 위의 start_run()이 실행되지 않으므로,
+단계 함수를 감싼 쪽(result.py의 step_fragment)이 active()로 확인해 그 단계 실행만 따로 프로파일링합니다.
+"""
+import cProfile
+import os
+import sys
+import threading
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILING_ALLOWED = os.getenv("PROFILING_ALLOWED", "").lower() in ("1", "true", "yes")
+
+# 샘플링 간격 (초)
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+SESSION_FLAG = "profiling_enabled"
+
+_local = threading.local()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+class _StackSampler(threading.Thread):
+    """대상 스레드의 호출 스택을 주기적으로 샘플링해 collapsed stack 형식으로 모읍니다."""
+
+    def __init__(self, target_thread_id, interval):
+        super().__init__(name="voicedoc-profiler-sampler", daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RunProfile:
+    """한 번의 스크립트 실행을 감싸는 프로파일 세션."""
+
+    def __init__(self):
+        self.steps = []
+        self.started_at = datetime.now()
+        self.run_id = uuid.uuid4().hex[:8]
+        self.profiler = cProfile.Profile()
+        self.sampler = _StackSampler(threading.get_ident(), SAMPLE_INTERVAL)
+
+    def start(self):
+        global _tracemalloc_users
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+            _tracemalloc_users += 1
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self):
+        """프로파일링을 멈추고 결과 파일 경로 목록을 반환합니다."""
+        global _tracemalloc_users
+        self.profiler.disable()
+        self.sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0:
+                tracemalloc.stop()
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        label = "+".join(self.steps) if self.steps else "idle"
+        stem = PROFILE_DIR / f"{self.started_at.strftime('%Y%m%d_%H%M%S')}_{self.run_id}_{label}"
+
+        pstats_path = stem.with_suffix(".pstats")
+        self.profiler.dump_stats(str(pstats_path))
+
+        folded_path = stem.with_suffix(".folded")
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for stack, count in self.sampler.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        alloc_path = stem.with_suffix(".alloc.txt")
+        with open(alloc_path, "w", encoding="utf-8") as f:
+            f.write(f"# 단계: {label}\n")
+            for stat in snapshot.statistics("traceback")[:30]:
+                f.write(f"{stat.size / 1024:.1f} KiB, {stat.count} blocks\n")
+                for line in stat.traceback.format(limit=8):
+                    f.write(f"    {line}\n")
+
+        return [str(pstats_path), str(folded_path), str(alloc_path)]
+
+
+def profiling_requested(session_state, query_params):
+    """이번 실행을 프로파일링해야 하는지 확인합니다."""
+    if session_state.get(SESSION_FLAG):
+        return True
+    return PROFILING_ALLOWED and query_params.get("profile") == "1"
+
+
+def start_run(session_state, query_params):
+    """요청된 경우 이번 스크립트 실행의 프로파일링을 시작합니다."""
+    # 예외로 중단된 이전 실행이 남긴 프로파일은 결과를 남기고 정리합니다.
+    finish_run()
+    if not profiling_requested(session_state, query_params):
+        return None
+    profile = RunProfile()
+    profile.start()
+    _local.profile = profile
+    return profile
+
+
+def active():
+    """이번 실행이 프로파일링 중인지 확인합니다."""
+    return getattr(_local, "profile", None) is not None
+
+
+def mark_step(step):
+    """현재 실행에서 수행한 작업 단계를 표시합니다. 프로파일링 중이 아니면 아무것도 하지 않습니다."""
+    profile = getattr(_local, "profile", None)
+    if profile is not None and step not in profile.steps:
+        profile.steps.append(step)
+
+
+def finish_run():
+    """이번 실행의 프로파일링을 끝내고 결과 파일 경로 목록을 반환합니다."""
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        return []
+    _local.profile = None
+    return profile.stop()
@@ -0,0 +1,61 @@
+"""streamlit-webrtc 기반 오디오 녹음 및 재생 위젯."""
+import pydub
+import streamlit as st
+from streamlit_webrtc import webrtc_streamer, WebRtcMode
+
+from .media import audio_player
+from .sealed import SEAL_RECORDINGS, write_wav
+
+# 오디오 입력 설정
+MEDIA_STREAM_CONSTRAINTS = {
+    "video": False,
+    "audio": {
+        "echoCancellation": False,
+        "noiseSuppression": True,
+        "autoGainControl": True,
+    },
+}
+
+
+# 오디오 프레임 수집 -> pydub으로 저장
+def save_frames_from_audio_receiver(wavpath, key="sendonly-audio", buffer_key="audio_buffer", seal=SEAL_RECORDINGS):
+    """오디오 프레임을 세션 버퍼에 모으고, 녹음이 끝나면 WAV로 저장합니다.
+
+    seal이면 평문 WAV를 디스크에 쓰지 않고 저장하면서 바로 암호화합니다 (voicedoc.sealed).
+    """
+    webrtc_ctx = webrtc_streamer(
+        key=key,
+        mode=WebRtcMode.SENDONLY,
+        media_stream_constraints=MEDIA_STREAM_CONSTRAINTS,
+    )
+
+    if buffer_key not in st.session_state:
+        st.session_state[buffer_key] = pydub.AudioSegment.empty()
+
+    # 무한 루프 제거: 한 번만 처리
+    if webrtc_ctx.audio_receiver:
+        try:
+            audio_frames = webrtc_ctx.audio_receiver.get_frames(timeout=1)
+            for audio_frame in audio_frames:
+                sound = pydub.AudioSegment(
+                    data=audio_frame.to_ndarray().tobytes(),
+                    sample_width=audio_frame.format.bytes,
+                    frame_rate=audio_frame.sample_rate,
+                    channels=len(audio_frame.layout.channels),
+                )
+                st.session_state[buffer_key] += sound
+        except Exception:
+            pass  # 타임아웃 등은 정상
+
+    # 녹음이 끝나면 버퍼를 WAV로 저장
+    audio_buffer = st.session_state[buffer_key]
+    if not webrtc_ctx.state.playing and len(audio_buffer) > 0:
+        write_wav(wavpath, audio_buffer.raw_data, audio_buffer.channels, audio_buffer.sample_width,
+                  audio_buffer.frame_rate, seal=seal)
+        st.session_state[buffer_key] = pydub.AudioSegment.empty()
+
+
+# 저장된 wav 파일 재생
+def display_wavfile(wavpath):
+    """저장된 녹음 파일을 재생합니다. 파일은 미디어 서버 URL로 제공해 재실행마다 다시 보내지 않습니다."""
+    audio_player(wavpath)
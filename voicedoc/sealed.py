@@ -0,0 +1,281 @@
+"""녹음 파일 암호화 저장 (AES-256-GCM 구간 단위 스트리밍).
+
+개인정보(주민등록번호, 주소 등)를 말한 녹음은 TMP_DIR에 평문 WAV로 남기지 않고
+저장하는 순간 SEGMENT_SIZE 단위로 나눠 AES-GCM으로 암호화합니다.
+읽을 때도 필요한 구간만 복호화하는 스트림(SealedReader)으로 읽으므로
+평문 파일 전체가 디스크에 생기지 않습니다 (재생은 미디어 서버의 Range 요청, 변환은 ffmpeg 파이프).
+
+파일 형식:
+    머리말   MAGIC(8) | nonce 접두어(8) | 구간 크기(4, big-endian)
+    구간     flag(1) | 암호문 길이(4) | 암호문 + 태그(16)
+각 구간의 nonce는 접두어 + 구간 번호(4)이고, 머리말·구간 번호·flag를 AAD로 묶어
+구간의 순서 바꾸기, 다른 파일 구간 끼워 넣기, 뒷부분 잘라내기(마지막 구간 flag 확인)를 막습니다.
+
+키는 RECORDING_KEY(URL-safe base64 32바이트)로 지정하며, 없으면 프로세스마다 새로 만듭니다.
+이 경우 프로세스가 끝나면 남은 임시 녹음은 더 이상 복호화할 수 없습니다.
+
+설정:
+    SEAL_RECORDINGS   개인정보 녹음을 암호화해 저장 (0이면 평문 WAV)   기본 1
+    RECORDING_KEY     녹음 암호화 키                                 기본 프로세스별 임의 키
+"""
+import base64
+import io
+import os
+import shutil
+import struct
+import subprocess
+import threading
+from functools import lru_cache
+
+SEAL_RECORDINGS = os.getenv("SEAL_RECORDINGS", "1") == "1"
+
+MAGIC = b"VDSEAL1\0"
+SEGMENT_SIZE = 64 * 1024
+TAG_SIZE = 16
+FINAL = 1
+
+_HEADER = struct.Struct(">8s8sI")
+_RECORD = struct.Struct(">BI")
+
+# Whisper 입력 형식
+WHISPER_SAMPLE_RATE = 16000
+
+
+@lru_cache(maxsize=None)
+def recording_key():
+    """녹음 암호화 키 (프로세스당 한 번 정합니다)."""
+    key = os.getenv("RECORDING_KEY")
+    if key:
+        key = base64.urlsafe_b64decode(key)
+        if len(key) != 32:
+            raise ValueError("RECORDING_KEY는 32바이트(URL-safe base64)여야 합니다")
+        return key
+    return os.urandom(32)
+
+
+def _aead(key):
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    return AESGCM(key or recording_key())
+
+
+def _aad(header, index, flag):
+    return header + struct.pack(">IB", index, flag)
+
+
+def _read_exact(f, size):
+    """size 바이트를 읽습니다. 파일이 그보다 짧으면 (잘린 파일) ValueError."""
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("암호화된 녹음 파일이 잘렸거나 손상되었습니다")
+    return data
+
+
+class SealedWriter(io.RawIOBase):
+    """쓰는 대로 구간 단위로 암호화해 저장하는 파일 객체. close()에서 마지막 구간을 표시합니다."""
+
+    def __init__(self, path, key=None, segment_size=SEGMENT_SIZE):
+        super().__init__()
+        self._aes = _aead(key)
+        self._segment_size = segment_size
+        self._prefix = os.urandom(8)
+        self._header = _HEADER.pack(MAGIC, self._prefix, segment_size)
+        self._file = open(path, "wb")
+        self._file.write(self._header)
+        self._pending = bytearray()
+        self._index = 0
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, data):
+        self._pending += data
+        self._position += len(data)
+        # 마지막 구간 표시를 위해 꽉 찬 구간도 다음 데이터가 올 때까지 하나는 남겨 둡니다.
+        while len(self._pending) > self._segment_size:
+            self._seal(bytes(self._pending[:self._segment_size]), 0)
+            del self._pending[:self._segment_size]
+        return len(data)
+
+    def _seal(self, plaintext, flag):
+        nonce = self._prefix + struct.pack(">I", self._index)
+        ciphertext = self._aes.encrypt(nonce, plaintext, _aad(self._header, self._index, flag))
+        self._file.write(_RECORD.pack(flag, len(ciphertext)))
+        self._file.write(ciphertext)
+        self._index += 1
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._seal(bytes(self._pending), FINAL)
+                self._pending.clear()
+            finally:
+                self._file.close()
+        super().close()
+
+
+class SealedReader(io.RawIOBase):
+    """암호화된 녹음을 구간 단위로 복호화해 읽는 파일 객체 (seek 지원).
+
+    한 번에 한 구간(SEGMENT_SIZE)만 메모리에 둡니다. 인증에 실패하면 ValueError.
+    """
+
+    def __init__(self, path, key=None):
+        super().__init__()
+        self._aes = _aead(key)
+        self._file = open(path, "rb")
+        try:
+            self._open(path)
+        except ValueError:
+            self._file.close()
+            raise
+
+    def _open(self, path):
+        self._header = _read_exact(self._file, _HEADER.size)
+        magic, self._prefix, self._segment_size = _HEADER.unpack(self._header)
+        if magic != MAGIC:
+            raise ValueError(f"암호화된 녹음 파일이 아닙니다: {path}")
+        if not self._segment_size:
+            raise ValueError("암호화된 녹음 파일이 잘렸거나 손상되었습니다")
+        self._record_size = _RECORD.size + self._segment_size + TAG_SIZE
+        body = os.fstat(self._file.fileno()).st_size - _HEADER.size
+        self._segments = max(1, -(-body // self._record_size))
+        self._position = 0
+        self._cached = (None, b"")
+        # 마지막 구간 길이로 평문 전체 크기를 구합니다 (복호화 없이).
+        self._file.seek(_HEADER.size + (self._segments - 1) * self._record_size)
+        _, last_length = _RECORD.unpack(_read_exact(self._file, _RECORD.size))
+        if not TAG_SIZE <= last_length <= self._segment_size + TAG_SIZE:
+            raise ValueError("암호화된 녹음 파일이 잘렸거나 손상되었습니다")
+        self.size = (self._segments - 1) * self._segment_size + last_length - TAG_SIZE
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self.size}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def _segment(self, index):
+        if self._cached[0] == index:
+            return self._cached[1]
+        self._file.seek(_HEADER.size + index * self._record_size)
+        flag, length = _RECORD.unpack(_read_exact(self._file, _RECORD.size))
+        if (flag == FINAL) != (index == self._segments - 1):
+            raise ValueError("암호화된 녹음 파일이 잘렸거나 손상되었습니다")
+        nonce = self._prefix + struct.pack(">I", index)
+        from cryptography.exceptions import InvalidTag
+        try:
+            plaintext = self._aes.decrypt(nonce, _read_exact(self._file, length), _aad(self._header, index, flag))
+        except InvalidTag:
+            raise ValueError("암호화된 녹음 파일 인증 실패 (키가 다르거나 변조됨)") from None
+        self._cached = (index, plaintext)
+        return plaintext
+
+    def readinto(self, buffer):
+        if self._position >= self.size:
+            return 0
+        index, offset = divmod(self._position, self._segment_size)
+        chunk = self._segment(index)[offset:offset + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def is_sealed(path):
+    """암호화된 녹음 파일인지 확인합니다."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def open_audio(path):
+    """녹음 파일을 읽기용 바이너리 스트림으로 엽니다. 암호화된 파일은 읽는 대로 복호화합니다."""
+    if is_sealed(path):
+        return io.BufferedReader(SealedReader(path), buffer_size=SEGMENT_SIZE)
+    return open(path, "rb")
+
+
+def audio_size(path):
+    """녹음 파일의 (평문) 크기."""
+    if is_sealed(path):
+        with SealedReader(path) as reader:
+            return reader.size
+    return os.path.getsize(path)
+
+
+def _wav_header(channels, sample_width, frame_rate, data_size):
+    byte_rate = frame_rate * channels * sample_width
+    return (
+        b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, frame_rate, byte_rate,
+                                channels * sample_width, sample_width * 8)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def write_wav(path, pcm, channels, sample_width, frame_rate, seal=True):
+    """PCM 바이트를 WAV로 저장합니다. seal이면 평문을 디스크에 쓰지 않고 바로 암호화합니다."""
+    with (SealedWriter(path) if seal else open(path, "wb")) as f:
+        f.write(_wav_header(channels, sample_width, frame_rate, len(pcm)))
+        view = memoryview(pcm)
+        for offset in range(0, len(view), SEGMENT_SIZE):
+            f.write(view[offset:offset + SEGMENT_SIZE])
+
+
+def load_whisper_audio(path):
+    """녹음을 Whisper 입력(16kHz 모노 float32 numpy 배열)으로 읽습니다.
+
+    whisper.load_audio와 같은 ffmpeg 변환을 쓰되, 파일 경로 대신 복호화 스트림을 표준 입력으로 넘깁니다.
+    """
+    import numpy as np
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg가 필요합니다")
+    command = [ffmpeg, "-nostdin", "-loglevel", "error", "-threads", "0", "-i", "pipe:0",
+               "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(WHISPER_SAMPLE_RATE), "pipe:1"]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    errors = []
+
+    def feed():
+        try:
+            with open_audio(path) as source:
+                shutil.copyfileobj(source, process.stdin, SEGMENT_SIZE)
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            # 복호화 실패(변조 등)는 ffmpeg가 앞부분만으로 성공하더라도 실패로 처리합니다.
+            errors.append(e)
+        finally:
+            process.stdin.close()
+
+    feeder = threading.Thread(target=feed, name="voicedoc-seal-feed", daemon=True)
+    feeder.start()
+    out = process.stdout.read()
+    error = process.stderr.read()
+    feeder.join()
+    if errors:
+        process.wait()
+        raise errors[0]
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg 오디오 변환 실패: {error.decode(errors='replace').strip()}")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
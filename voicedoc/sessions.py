@@ -0,0 +1,283 @@
+"""세션별 메모리 집계와 유휴 세션 정리.
+
+실행이 끝날 때마다 세션 상태의 항목별 점유 바이트 수(추정)를 기록하고,
+SESSION_IDLE_MINUTES 동안 실행이 없던 세션(닫지 않고 방치한 탭 등)은 백그라운드 스레드가 정리합니다.
+    - 이어서 작업할 수 있는 값(인식 텍스트, 개인정보, 본문, 음성 서명 등)은 세션 임시 폴더에
+      암호화해 저장한 뒤(voicedoc.sealed) 세션 상태에서 지웁니다.
+    - 녹음 버퍼는 버리고, 세션의 미리 렌더링된 PDF와 미디어 서버 등록도 해제합니다.
+탭으로 돌아오면 다음 실행의 begin_run()이 저장해 둔 값을 다시 불러옵니다.
+Whisper 모델과 음성 안내(TTS)는 세션이 아니라 프로세스 단위 캐시(lru_cache)에 있으므로 세션 수와 무관합니다.
+
+다른 세션의 상태는 Streamlit 실행 컨텍스트의 세션 상태 객체를 약한 참조로 보관해 접근하므로,
+Streamlit이 닫은 세션은 따로 정리하지 않아도 목록에서 빠집니다.
+정리 스레드와 그 세션의 실행은 세션별 잠금으로 나눕니다. begin_run()은 잠금을 잡고 활성 시각을 갱신하며,
+정리는 같은 잠금 안에서 유휴 여부를 다시 확인한 뒤에만 상태를 지우므로, 확인과 정리 사이에 시작한
+실행의 상태를 지우지 않습니다 (정리가 먼저 잠금을 잡았으면 실행은 정리가 끝난 뒤 저장한 값을 되살립니다).
+
+세션의 문서 암호화 키(system_key)는 디스크에 저장하지 않고 세션 상태에 남겨 둡니다.
+암호화된 본문(encrypted_text)과 같은 파일에 키를 두면 암호화한 의미가 없기 때문입니다.
+
+설정:
+    SESSION_IDLE_MINUTES    이 시간(분) 동안 실행이 없으면 정리 (0이면 끔)   기본 30
+    SESSION_REAP_INTERVAL   정리 주기(초)                                   기본 60
+"""
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+from . import media, metrics, prerender
+from .archive import session_temp_dir
+from .sealed import SealedReader, SealedWriter
+
+SESSION_IDLE_MINUTES = float(os.getenv("SESSION_IDLE_MINUTES", "30"))
+SESSION_REAP_INTERVAL = float(os.getenv("SESSION_REAP_INTERVAL", "60"))
+
+# 정리할 때 디스크에 저장했다가 돌아오면 되살리는 값 (system_key는 메모리에 남김)
+RESUMABLE_KEYS = (
+    "voice_text", "plain_text", "encrypted_text", "personal_info",
+    "document_content", "voice_signature", "pdf_filepath", "regenerate_fields",
+)
+# 정리할 때 그냥 버리는 값 (녹음 중이 아니면 비어 있어야 하는 버퍼)
+RELEASE_KEYS = ("audio_buffer", "signature_audio_buffer", "prerender_key", media.AUDIO_PREVIEW_KEY)
+# 정리된 세션의 저장 파일 경로를 담는 키
+SPILL_KEY = "spilled_state"
+
+_lock = threading.Lock()
+# session_id -> _Session
+_sessions = {}
+
+
+class _Session:
+    __slots__ = ("state", "last_active", "key_bytes", "reaped", "lock")
+
+    def __init__(self, state):
+        try:
+            self.state = weakref.ref(state)
+        except TypeError:
+            self.state = lambda: state
+        self.last_active = time.time()
+        self.key_bytes = {}
+        self.reaped = False
+        # 이 세션의 실행 시작(begin_run)과 정리(reap)를 나누는 잠금
+        self.lock = threading.Lock()
+
+
+def estimate_bytes(value, _depth=0):
+    """값 하나가 점유하는 바이트 수를 대략 추정합니다. dict/list는 두 단계까지 따라갑니다."""
+    raw = getattr(value, "raw_data", None)  # pydub.AudioSegment
+    if raw is not None:
+        return len(raw)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    size = sys.getsizeof(value)
+    if _depth < 2 and isinstance(value, dict):
+        size += sum(estimate_bytes(k, _depth + 1) + estimate_bytes(v, _depth + 1) for k, v in value.items())
+    elif _depth < 2 and isinstance(value, (list, tuple)):
+        size += sum(estimate_bytes(v, _depth + 1) for v in value)
+    return size
+
+
+def _items(state):
+    """세션 상태의 사용자 항목 (Streamlit 내부 위젯 항목 제외)."""
+    items = getattr(state, "filtered_state", None)
+    return dict(items if items is not None else state)
+
+
+def _get(state, key):
+    return state[key] if key in state else None
+
+
+def _underlying(session_state):
+    """st.session_state 프록시 대신 다른 스레드에서도 쓸 수 있는 이 세션의 상태 객체."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return session_state
+    ctx = get_script_run_ctx()
+    return ctx.session_state if ctx is not None else session_state
+
+
+def _session(session_id, state):
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is None or session.state() is not state:
+            session = _sessions[session_id] = _Session(state)
+    return session
+
+
+def _touch(session):
+    """session.lock 안에서 호출합니다."""
+    session.last_active = time.time()
+    session.reaped = False
+
+
+def _spill_path(session_id):
+    return str(session_temp_dir(session_id) / "session_state.sealed")
+
+
+def _encode(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"__b64__": base64.b64encode(value).decode()}
+    raise TypeError(type(value).__name__)
+
+
+def _decode(obj):
+    return base64.b64decode(obj["__b64__"]) if set(obj) == {"__b64__"} else obj
+
+
+def begin_run(session_state):
+    """실행 시작 시 호출합니다. 세션을 활성으로 표시하고, 정리된 세션이면 저장해 둔 값을 되살립니다.
+
+    되살렸으면 True.
+    """
+    state = _underlying(session_state)
+    session = _session(session_state["session_id"], state)
+    # 정리 중이면 끝날 때까지 기다린 뒤 저장된 값을 되살립니다.
+    with session.lock:
+        _touch(session)
+        return _restore(state)
+
+
+def _restore(state):
+    path = _get(state, SPILL_KEY)
+    if not path:
+        return False
+    del state[SPILL_KEY]
+    try:
+        with SealedReader(path) as reader:
+            values = json.loads(reader.readall(), object_hook=_decode)
+    except (OSError, ValueError):
+        # 보관 기간 정리로 지워졌거나 프로세스가 바뀌어 읽을 수 없으면 처음부터 시작합니다.
+        return False
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    for key, value in values.items():
+        state[key] = value
+    metrics.inc("voicedoc_session_reaps_total", result="restored")
+    return True
+
+
+def end_run(session_state):
+    """실행 끝에 호출합니다. 항목별 점유 바이트 수를 기록합니다 (미리 렌더링된 PDF 포함)."""
+    state = _underlying(session_state)
+    key_bytes = {key: estimate_bytes(value) for key, value in _items(state).items()}
+    pdf = prerender.peek(_get(state, "prerender_key"))
+    if pdf is not None:
+        key_bytes["prerender_key"] = len(pdf)
+    session = _session(session_state["session_id"], state)
+    with session.lock:
+        _touch(session)
+        session.key_bytes = key_bytes
+
+
+def reap(session_id, state):
+    """세션 하나를 정리하고 해제한 바이트 수(추정)를 반환합니다."""
+    items = _items(state)
+    spill = {key: items[key] for key in RESUMABLE_KEYS if items.get(key) is not None}
+    released = sum(estimate_bytes(value) for value in spill.values())
+    if spill:
+        with SealedWriter(_spill_path(session_id)) as f:
+            f.write(json.dumps(spill, ensure_ascii=False, default=_encode).encode("utf-8"))
+        state[SPILL_KEY] = _spill_path(session_id)
+
+    pdf_key = items.get("prerender_key")
+    if pdf_key:
+        pdf = prerender.peek(pdf_key)
+        if pdf is not None:
+            media.unregister_bytes(pdf)
+            released += len(pdf)
+        prerender.discard(pdf_key)
+    for key in RESUMABLE_KEYS + RELEASE_KEYS:
+        if key in items:
+            if key in RELEASE_KEYS:
+                released += estimate_bytes(items[key])
+            del state[key]
+    media.unregister_files(session_temp_dir(session_id))
+    return released
+
+
+def reap_idle(now=None, idle_seconds=None):
+    """유휴 세션을 정리하고 정리한 세션 수를 반환합니다. 닫힌 세션은 목록에서 뺍니다."""
+    now = now or time.time()
+    idle_seconds = SESSION_IDLE_MINUTES * 60 if idle_seconds is None else idle_seconds
+    with _lock:
+        candidates = list(_sessions.items())
+    reaped = 0
+    for session_id, session in candidates:
+        state = session.state()
+        if state is None:
+            with _lock:
+                if _sessions.get(session_id) is session:
+                    del _sessions[session_id]
+            continue
+        if session.reaped or now - session.last_active < idle_seconds:
+            continue
+        with session.lock:
+            # 위의 확인 뒤에 실행이 시작됐으면 (begin_run이 활성 시각을 갱신) 정리하지 않습니다.
+            if session.reaped or now - session.last_active < idle_seconds:
+                continue
+            try:
+                released = reap(session_id, state)
+            except Exception:
+                metrics.inc("voicedoc_session_reaps_total", result="error")
+                continue
+            session.reaped = True
+            session.key_bytes = {}
+        reaped += 1
+        metrics.inc("voicedoc_session_reaps_total", result="reaped")
+        metrics.inc("voicedoc_session_reaped_bytes_total", released)
+
+    with _lock:
+        active = sum(1 for s in _sessions.values() if not s.reaped)
+        metrics.set_gauge("voicedoc_sessions", active, state="active")
+        metrics.set_gauge("voicedoc_sessions", len(_sessions) - active, state="reaped")
+    return reaped
+
+
+def top_consumers(limit=10):
+    """관리자 화면용: 점유 바이트 수(추정)가 큰 세션 순으로 항목별 내역을 반환합니다."""
+    now = time.time()
+    with _lock:
+        sessions = [(sid, s.last_active, s.reaped, dict(s.key_bytes)) for sid, s in _sessions.items()]
+    rows = [
+        {
+            "session": sid[:8],
+            "total_kb": round(sum(key_bytes.values()) / 1024, 1),
+            "idle_min": round((now - last_active) / 60, 1),
+            "reaped": reaped,
+            "largest": ", ".join(
+                f"{key} {size / 1024:.0f}KB"
+                for key, size in sorted(key_bytes.items(), key=lambda item: -item[1])[:3]
+            ),
+        }
+        for sid, last_active, reaped, key_bytes in sessions
+    ]
+    rows.sort(key=lambda row: -row["total_kb"])
+    return rows[:limit]
+
+
+@lru_cache(maxsize=None)
+def start_session_reaper(interval=SESSION_REAP_INTERVAL):
+    """유휴 세션 정리 스레드를 프로세스당 한 번만 시작합니다. SESSION_IDLE_MINUTES=0 이면 None."""
+    if SESSION_IDLE_MINUTES <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                reap_idle()
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=loop, name="voicedoc-session-reaper", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,142 @@
+"""음성 서명 데이터, 문서 해시, QR 코드 생성."""
+import hashlib
+import json
+import mmap
+import os
+from datetime import datetime
+from functools import lru_cache
+
+from .config import CONSENT_PHRASE, DOCUMENTS_DIR
+
+# 해시 계산 시 한 번에 처리할 크기
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def _load_qrcode():
+    """qrcode 라이브러리를 처음 사용할 때 불러옵니다. 설치되어 있지 않으면 None을 반환합니다."""
+    try:
+        import qrcode
+        from PIL import Image
+    except ImportError:
+        return None
+    return qrcode, Image
+
+
+def qr_available():
+    """QR 코드 생성에 필요한 라이브러리가 설치되어 있는지 확인합니다."""
+    return _load_qrcode() is not None
+
+
+def sha256_file(filepath):
+    """파일을 mmap으로 매핑해 청크 단위로 SHA-256 해시를 계산합니다. 파일 전체를 메모리에 읽지 않습니다."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, HASH_CHUNK_SIZE):
+                    digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def calculate_document_hash(filepath):
+    """PDF 파일의 해시값을 계산합니다."""
+    try:
+        return sha256_file(filepath)
+    except Exception as e:
+        return None
+
+
+def generate_qr_code(data, output_file='qrcode.png', size=200):
+    """QR 코드를 생성합니다. output_file에는 파일 경로나 BytesIO 같은 파일 객체를 줄 수 있습니다."""
+    if not qr_available():
+        return None
+
+    qrcode, Image = _load_qrcode()
+
+    try:
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        qr.add_data(data)
+        qr.make(fit=True)
+
+        img = qr.make_image(fill_color="black", back_color="white")
+        img = img.resize((size, size), Image.Resampling.LANCZOS)
+        if isinstance(output_file, str):
+            img.save(output_file)
+        else:
+            img.save(output_file, format="PNG")
+            output_file.seek(0)
+
+        return output_file
+    except Exception as e:
+        return None
+
+
+def create_voice_signature(document_content, pdf_filepath, audio_filepath='recorded_audio.wav', evidence=None,
+                           consent=None):
+    """음성 서명 데이터를 생성합니다.
+
+    evidence에 evidence.encode_evidence()의 결과를 주면 인코딩된 증거 파일을 가리키고,
+    형식과 파일/PCM 해시를 함께 기록합니다.
+    consent에 consent.verify_consent()의 결과를 주면 동의 문구 확인 점수를 기록합니다.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if evidence:
+        audio_filepath = evidence["path"]
+
+    document_hash = calculate_document_hash(pdf_filepath) if os.path.exists(pdf_filepath) else None
+
+    audio_file_size = os.path.getsize(audio_filepath) if os.path.exists(audio_filepath) else 0
+    audio_file_url = os.path.abspath(audio_filepath) if os.path.exists(audio_filepath) else None
+
+    voice_signature = {
+        "timestamp": timestamp,
+        "document_hash": document_hash,
+        "audio_file_path": audio_file_url,
+        "audio_file_size": audio_file_size,
+        "consent_phrase": CONSENT_PHRASE
+    }
+
+    if evidence:
+        voice_signature.update({
+            "audio_format": evidence["format"],
+            "audio_file_sha256": evidence["sha256"],
+            "audio_pcm_sha256": evidence["pcm_sha256"],
+            "audio_pcm_format": evidence["pcm_format"],
+        })
+
+    if consent:
+        voice_signature.update({
+            "consent_score": consent["score"],
+            "consent_matched": consent["matched"],
+            "consent_transcript": consent["transcript"],
+            "consent_model": consent["model"],
+        })
+
+    return voice_signature
+
+
+def save_voice_signature(voice_signature, output_dir=DOCUMENTS_DIR):
+    """음성 서명 데이터를 JSON 파일로 저장합니다."""
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    signature_file = os.path.join(output_dir, f"voice_signature_{timestamp_str}.json")
+
+    with open(signature_file, 'w', encoding='utf-8') as f:
+        json.dump(voice_signature, f, indent=2, ensure_ascii=False)
+
+    return signature_file
@@ -0,0 +1,135 @@
+"""음성 파일 업로드(AWS S3) 및 공개 URL 생성."""
+import os
+from datetime import datetime
+from functools import lru_cache
+
+from . import metrics
+from .evidence import content_type_for
+
+
+@lru_cache(maxsize=None)
+def _load_boto3():
+    """boto3를 처음 사용할 때 불러옵니다. 설치되어 있지 않으면 None을 반환합니다."""
+    try:
+        import boto3
+        from botocore.exceptions import ClientError
+        from boto3.exceptions import S3UploadFailedError
+    except ImportError:
+        return None
+    return boto3, ClientError, S3UploadFailedError
+
+
+def s3_available():
+    """S3 업로드에 필요한 라이브러리가 설치되어 있는지 확인합니다."""
+    return _load_boto3() is not None
+
+
+@lru_cache(maxsize=None)
+def get_s3_client(region, aws_access_key_id=None, aws_secret_access_key=None):
+    """리전/자격 증명별 S3 클라이언트를 한 번만 생성합니다."""
+    boto3 = _load_boto3()[0]
+    if aws_access_key_id and aws_secret_access_key:
+        return boto3.client(
+            's3',
+            region_name=region,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key
+        )
+    return boto3.client('s3', region_name=region)
+
+
+def upload_audio_to_s3(audio_filepath, bucket_name=None, s3_key=None, region='ap-northeast-2', content_type=None):
+    """음성 파일을 AWS S3에 업로드하고 공개 URL을 반환합니다. Content-Type은 확장자(WAV, Opus, FLAC)로 정합니다."""
+    if not s3_available():
+        return None
+
+    if not os.path.exists(audio_filepath):
+        return None
+
+    if not bucket_name:
+        bucket_name = os.getenv("S3_BUCKET_NAME")
+
+    if region == 'ap-northeast-2':
+        region = os.getenv("S3_REGION") or os.getenv("AWS_DEFAULT_REGION") or region
+
+    if not bucket_name:
+        return None
+
+    if not s3_key:
+        date_folder = datetime.now().strftime("%Y/%m/%d")
+        filename = os.path.basename(audio_filepath)
+        s3_key = f"audio/{date_folder}/{filename}"
+
+    if not content_type:
+        content_type = content_type_for(audio_filepath)
+
+    _, ClientError, S3UploadFailedError = _load_boto3()
+
+    try:
+        s3_client = get_s3_client(
+            region,
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY")
+        )
+
+        with metrics.span("s3_upload"):
+            try:
+                s3_client.upload_file(
+                    audio_filepath,
+                    bucket_name,
+                    s3_key,
+                    ExtraArgs={
+                        'ContentType': content_type,
+                        'ACL': 'public-read'
+                    }
+                )
+            except (ClientError, S3UploadFailedError) as acl_error:
+                error_str = str(acl_error)
+                if 'AccessControlListNotSupported' in error_str or 'InvalidRequest' in error_str:
+                    s3_client.upload_file(
+                        audio_filepath,
+                        bucket_name,
+                        s3_key,
+                        ExtraArgs={
+                            'ContentType': content_type
+                        }
+                    )
+                else:
+                    raise
+        metrics.inc("voicedoc_uploaded_bytes_total", os.path.getsize(audio_filepath), target="s3")
+
+        public_url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{s3_key}"
+        return public_url
+
+    except Exception as e:
+        return None
+
+
+def upload_audio_to_web_server(audio_filepath, base_url=None):
+    """음성 파일을 웹 서버에 업로드하고 공개 URL을 반환합니다."""
+    s3_url = upload_audio_to_s3(audio_filepath)
+    if s3_url:
+        return s3_url
+
+    if not os.path.exists(audio_filepath):
+        return None
+
+    if not base_url:
+        base_url = os.getenv("WEB_SERVER_URL", "https://example.com/audio")
+
+    filename = os.path.basename(audio_filepath)
+    public_url = f"{base_url.rstrip('/')}/{filename}"
+
+    return public_url
+
+
+def get_audio_file_url(audio_filepath, use_web_url=True):
+    """음성 파일의 접근 가능한 URL을 생성합니다."""
+    if use_web_url:
+        web_url = upload_audio_to_web_server(audio_filepath)
+        if web_url:
+            return web_url
+
+    if os.path.exists(audio_filepath):
+        return os.path.abspath(audio_filepath)
+    return audio_filepath
@@ -0,0 +1,192 @@
+"""문서 유형(서식) 정의 로딩.
+
+서식은 voicedoc/forms/*.json (그리고 TEMPLATE_DIR 환경 변수로 지정한 폴더)에 선언적으로 정의합니다.
+새 서식은 JSON 파일 하나를 추가하면 되며 코드 수정이 필요 없습니다.
+파일은 프로세스당 한 번 읽고 검증해 DocumentTemplate 객체로 만들어 두므로,
+렌더링 때는 사전 조회 한 번으로 끝납니다.
+
+서식 파일 키:
+    name            문서 유형 이름 (화면 선택지, PDF 제목)
+    aliases         같은 서식을 가리키는 다른 이름 목록
+    order           선택지 순서 (작을수록 앞)
+    selectable      선택지에 표시할지 여부 (기본 true)
+    guide           입력 가이드 (화면 표시)
+    tts             입력 가이드 음성 안내 문구 (없으면 guide를 읽음)
+    prompt          본문 생성 시스템 프롬프트
+    layout          application_form | employment_contract | generic
+    content_title   본문 상자 제목
+    signer_role     전자 서명 주체 표시 (신청인, 근로자 등)
+    fields          application_form 정보 표 행: [{"key", "label", "optional"}]
+                    optional 행은 값이 있을 때만 표시합니다.
+    columns,parties employment_contract 당사자 표: 머리 행과 [{"role", "fields": [키 또는 null]}]
+    column_widths   employment_contract 당사자 표 열 너비(mm). 없으면 180mm를 균등 분할
+
+default.json은 등록되지 않은 문서 유형에 쓰는 기본 서식이며 "{doc_type}" 자리에 유형 이름이 들어갑니다.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+FORMS_DIR = Path(__file__).resolve().parent / "forms"
+EXTRA_FORMS_DIR = os.getenv("TEMPLATE_DIR")
+
+LAYOUTS = ("application_form", "employment_contract", "generic")
+
+# 개인정보 추출 시 항상 묻는 항목 (서식 필드가 더 있으면 뒤에 추가됩니다)
+BASE_FIELDS = ("name", "rrn", "address", "phone", "birthdate", "employer")
+
+# 서식 파일에 라벨이 없을 때 쓰는 기본 라벨
+BASE_LABELS = {
+    "name": "성명",
+    "rrn": "주민등록번호",
+    "address": "주소",
+    "phone": "연락처",
+    "birthdate": "생년월일",
+    "employer": "회사명",
+}
+
+DEFAULT_FORM = "default.json"
+
+
+class DocumentTemplate:
+    """검증을 마친 서식 정의."""
+
+    __slots__ = ("name", "aliases", "order", "selectable", "guide", "tts", "prompt", "layout",
+                 "content_title", "signer_role", "fields", "columns", "column_widths", "parties", "source")
+
+    def __init__(self, spec, source):
+        self.source = source
+        self.name = spec["name"]
+        self.aliases = tuple(spec.get("aliases", ()))
+        self.order = spec.get("order", 1000)
+        self.selectable = spec.get("selectable", True)
+        self.guide = spec.get("guide", "")
+        self.tts = spec.get("tts") or re.sub(r"\[[^\]]*\]|\s+", " ", self.guide).strip()
+        self.prompt = spec["prompt"]
+        self.layout = spec["layout"]
+        self.content_title = spec.get("content_title", "내용")
+        self.signer_role = spec.get("signer_role", "서명인")
+        self.fields = tuple(
+            (field["key"], field["label"], bool(field.get("optional", False)))
+            for field in spec.get("fields", ())
+        )
+        self.columns = tuple(spec.get("columns", ()))
+        self.column_widths = tuple(spec.get("column_widths") or [180 / max(1, len(self.columns))] * len(self.columns))
+        self.parties = tuple((party["role"], tuple(party["fields"])) for party in spec.get("parties", ()))
+
+    def field_keys(self):
+        """서식이 사용하는 개인정보 키 목록."""
+        keys = [key for key, _, _ in self.fields]
+        keys += [key for _, fields in self.parties for key in fields if key]
+        return keys
+
+    def info_rows(self, info_json):
+        """application_form 정보 표에 넣을 (라벨, 값) 목록."""
+        return [
+            (label, info_json.get(key, ""))
+            for key, label, optional in self.fields
+            if not optional or info_json.get(key)
+        ]
+
+    def party_rows(self, info_json):
+        """employment_contract 당사자 표에 넣을 행 목록 (역할, 값...)."""
+        return [
+            [role] + [info_json.get(key, "") if key else "" for key in fields]
+            for role, fields in self.parties
+        ]
+
+
+def _validate(spec, source):
+    """서식 정의를 검사하고, 문제가 있으면 파일 이름을 담아 ValueError를 냅니다."""
+    for key in ("name", "prompt", "layout"):
+        if not isinstance(spec.get(key), str) or not spec[key]:
+            raise ValueError(f"{source}: '{key}' 항목이 필요합니다")
+    if spec["layout"] not in LAYOUTS:
+        raise ValueError(f"{source}: 알 수 없는 layout '{spec['layout']}' (사용 가능: {', '.join(LAYOUTS)})")
+    for field in spec.get("fields", ()):
+        if not isinstance(field, dict) or not field.get("key") or not field.get("label"):
+            raise ValueError(f"{source}: fields 항목에는 key와 label이 필요합니다")
+    if spec["layout"] == "application_form" and not spec.get("fields"):
+        raise ValueError(f"{source}: application_form 서식에는 fields가 필요합니다")
+    if spec["layout"] == "employment_contract":
+        columns = spec.get("columns") or []
+        parties = spec.get("parties") or []
+        if not columns or not parties:
+            raise ValueError(f"{source}: employment_contract 서식에는 columns와 parties가 필요합니다")
+        if spec.get("column_widths") and len(spec["column_widths"]) != len(columns):
+            raise ValueError(f"{source}: column_widths 수는 columns 수와 같아야 합니다")
+        for party in parties:
+            if len(party.get("fields", ())) != len(columns) - 1:
+                raise ValueError(f"{source}: parties의 fields 수는 columns 수 - 1 이어야 합니다")
+
+
+def _read_form(path):
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    _validate(spec, path.name)
+    return spec
+
+
+def _form_files():
+    dirs = [FORMS_DIR] + ([Path(EXTRA_FORMS_DIR)] if EXTRA_FORMS_DIR else [])
+    return [path for d in dirs for path in sorted(d.glob("*.json")) if path.name != DEFAULT_FORM]
+
+
+@lru_cache(maxsize=None)
+def load_templates():
+    """서식 파일을 모두 읽어 {문서 유형 이름(별칭 포함): DocumentTemplate}을 반환합니다. 프로세스당 한 번."""
+    registry = {}
+    for path in _form_files():
+        template = DocumentTemplate(_read_form(path), path.name)
+        for name in (template.name,) + template.aliases:
+            if name in registry:
+                raise ValueError(f"{path.name}: '{name}' 서식이 {registry[name].source}와 겹칩니다")
+            registry[name] = template
+    return registry
+
+
+@lru_cache(maxsize=None)
+def _default_spec():
+    return _read_form(FORMS_DIR / DEFAULT_FORM)
+
+
+@lru_cache(maxsize=64)
+def _default_template(doc_type):
+    spec = {
+        key: value.replace("{doc_type}", doc_type) if isinstance(value, str) else value
+        for key, value in _default_spec().items()
+    }
+    return DocumentTemplate(spec, DEFAULT_FORM)
+
+
+def get_template(doc_type):
+    """문서 유형의 서식을 반환합니다. 등록되지 않은 유형은 기본 서식을 씁니다."""
+    return load_templates().get(doc_type) or _default_template(doc_type)
+
+
+@lru_cache(maxsize=None)
+def selectable_templates():
+    """화면 선택지에 표시할 서식 목록 (order 순)."""
+    unique = {id(t): t for t in load_templates().values() if t.selectable}
+    return tuple(sorted(unique.values(), key=lambda t: (t.order, t.name)))
+
+
+@lru_cache(maxsize=None)
+def info_keys():
+    """개인정보 추출 항목: 기본 항목 + 서식에서 쓰는 추가 항목 (순서 고정)."""
+    keys = list(BASE_FIELDS)
+    for template in selectable_templates():
+        keys += [key for key in template.field_keys() if key not in keys]
+    return tuple(keys)
+
+
+@lru_cache(maxsize=None)
+def field_labels():
+    """개인정보 항목별 화면 라벨 {key: label}. 기본 항목은 BASE_LABELS, 서식에서 추가한 항목은 서식 파일의 라벨."""
+    labels = dict(BASE_LABELS)
+    for template in selectable_templates():
+        for key, label, _ in template.fields:
+            labels.setdefault(key, label)
+    return {key: labels.get(key, key) for key in info_keys()}
@@ -0,0 +1,208 @@
+"""음성 → 텍스트 변환 (교체 가능한 Whisper 백엔드).
+
+TRANSCRIBER_BACKEND 환경 변수로 백엔드를 고릅니다.
+    openai-whisper : openai-whisper (PyTorch, 기본값)
+    faster-whisper : faster-whisper / CTranslate2 (CPU int8 양자화 지원)
+    whispercpp     : whisper.cpp 파이썬 바인딩 (pywhispercpp)
+
+공통 설정:
+    WHISPER_MODEL        모델 크기 (tiny, base, small, medium, ...)   기본 small
+    WHISPER_LANGUAGE     인식 언어 고정 (빈 값이면 자동 감지)        기본 ko
+    WHISPER_BEAM_SIZE    빔 크기 (1이면 탐욕적 디코딩, 2 이상이면 빔 탐색) 기본 1
+    WHISPER_THREADS      CPU 스레드 수 (0이면 라이브러리 기본값)       기본 0
+    WHISPER_COMPUTE_TYPE faster-whisper 연산 정밀도 (int8, float32 등)  기본 int8
+
+빔 탐색은 CPU에서 변환을 몇 배 느리게 하므로 기본은 탐욕적 디코딩이며, 필요할 때만 켭니다.
+모델은 (백엔드, 설정) 조합마다 프로세스당 한 번만 불러와 모든 세션이 공유합니다.
+긴 녹음은 voicedoc.chunked 에서 나눠 병렬로 변환합니다.
+백엔드는 파일 경로 또는 16kHz 모노 float32 배열을 받습니다. 암호화된 녹음(voicedoc.sealed)은
+메모리에서 복호화·변환한 배열로 넘깁니다.
+"""
+import importlib.util
+import os
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from . import metrics
+from .sealed import is_sealed, load_whisper_audio
+
+TRANSCRIBER_BACKEND = os.getenv("TRANSCRIBER_BACKEND", "openai-whisper")
+WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "small")
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "ko") or None
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE") or "1")
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+
+_load_lock = threading.Lock()
+
+
+def _audio_input(audio):
+    """백엔드 입력: 경로는 문자열로, 배열은 그대로."""
+    return str(audio) if isinstance(audio, (str, os.PathLike)) else audio
+
+
+class Transcriber(ABC):
+    """변환 백엔드 공통 인터페이스. transcribe()는 {"text", "segments"}를 반환합니다."""
+
+    name = "base"
+    module = None
+
+    def __init__(self, model_name=WHISPER_MODEL_NAME, language=WHISPER_LANGUAGE,
+                 beam_size=WHISPER_BEAM_SIZE, threads=WHISPER_THREADS, compute_type=WHISPER_COMPUTE_TYPE):
+        self.model_name = model_name
+        self.language = language
+        self.beam_size = beam_size
+        self.threads = threads
+        self.compute_type = compute_type
+        # 공유 모델은 동시에 한 세션만 사용합니다.
+        self.lock = threading.Lock()
+
+    @property
+    def beam_search(self):
+        """빔 탐색을 쓰는지 (beam_size가 1 이하면 탐욕적 디코딩)."""
+        return self.beam_size > 1
+
+    @abstractmethod
+    def transcribe(self, audio, initial_prompt=None):
+        """audio(경로 또는 16kHz 모노 float32 배열)를 변환합니다."""
+
+
+class OpenAIWhisperTranscriber(Transcriber):
+    """openai-whisper (PyTorch) 백엔드."""
+
+    name = "openai-whisper"
+    module = "whisper"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import whisper
+        if self.threads:
+            import torch
+            torch.set_num_threads(self.threads)
+        self.model = whisper.load_model(self.model_name)
+
+    def transcribe(self, audio, initial_prompt=None):
+        result = self.model.transcribe(
+            _audio_input(audio),
+            language=self.language,
+            # None이면 탐욕적 디코딩 (기존 model.transcribe(path)와 같음)
+            beam_size=self.beam_size if self.beam_search else None,
+            initial_prompt=initial_prompt,
+            fp16=False,
+        )
+        segments = [
+            {"start": s["start"], "end": s["end"], "text": s["text"]}
+            for s in result.get("segments", [])
+        ]
+        return {"text": result["text"], "segments": segments}
+
+
+class FasterWhisperTranscriber(Transcriber):
+    """faster-whisper (CTranslate2) 백엔드. CPU에서 int8 양자화로 실행합니다."""
+
+    name = "faster-whisper"
+    module = "faster_whisper"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.threads,
+        )
+
+    def transcribe(self, audio, initial_prompt=None):
+        segments, _ = self.model.transcribe(
+            _audio_input(audio),
+            language=self.language,
+            beam_size=max(1, self.beam_size),
+            initial_prompt=initial_prompt,
+        )
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+class WhisperCppTranscriber(Transcriber):
+    """whisper.cpp (pywhispercpp) 백엔드."""
+
+    name = "whispercpp"
+    module = "pywhispercpp"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from pywhispercpp.model import Model
+        options = {"print_progress": False, "print_realtime": False}
+        if self.threads:
+            options["n_threads"] = self.threads
+        self.model = Model(self.model_name, **options)
+
+    def transcribe(self, audio, initial_prompt=None):
+        options = {"language": self.language or "auto"}
+        if self.beam_search:
+            options["beam_search"] = {"beam_size": self.beam_size, "patience": -1.0}
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+        segments = self.model.transcribe(_audio_input(audio), **options)
+        # whisper.cpp 타임스탬프 단위는 10ms
+        segments = [{"start": s.t0 / 100, "end": s.t1 / 100, "text": s.text} for s in segments]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+BACKENDS = {
+    OpenAIWhisperTranscriber.name: OpenAIWhisperTranscriber,
+    FasterWhisperTranscriber.name: FasterWhisperTranscriber,
+    WhisperCppTranscriber.name: WhisperCppTranscriber,
+}
+
+
+def backend_available(backend):
+    """백엔드 라이브러리가 설치되어 있는지 (불러오지 않고) 확인합니다."""
+    cls = BACKENDS.get(backend)
+    return cls is not None and (cls.module is None or importlib.util.find_spec(cls.module) is not None)
+
+
+@lru_cache(maxsize=None)
+def _load_transcriber(backend, options):
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 변환 백엔드: {backend} (사용 가능: {', '.join(BACKENDS)})")
+    return BACKENDS[backend](**dict(options))
+
+
+def get_transcriber(backend=None, **options):
+    """백엔드/설정 조합별 변환기를 프로세스당 한 번만 생성해 반환합니다."""
+    with _load_lock:
+        with metrics.span("whisper_load"):
+            return _load_transcriber(backend or TRANSCRIBER_BACKEND, tuple(sorted(options.items())))
+
+
+def transcribe_segments(wavpath, backend=None, initial_prompt=None, **options):
+    """녹음 파일을 변환하고 {"text", "segments"} 결과를 반환합니다.
+
+    LONG_AUDIO_SECONDS 이상인 녹음은 무음 구간에서 나눠 여러 프로세스에서 변환합니다 (voicedoc.chunked).
+    """
+    from . import chunked
+
+    backend = backend or TRANSCRIBER_BACKEND
+    if chunked.TRANSCRIBE_WORKERS > 1 and chunked.audio_seconds(wavpath) >= chunked.LONG_AUDIO_SECONDS:
+        with metrics.span("transcribe"):
+            return chunked.transcribe_chunked(wavpath, backend, options, initial_prompt=initial_prompt)
+
+    audio = wavpath
+    if is_sealed(wavpath):
+        with metrics.span("unseal_audio"):
+            audio = load_whisper_audio(wavpath)
+
+    transcriber = get_transcriber(backend, **options)
+    metrics.add_gauge("voicedoc_queue_depth", 1, queue="transcribe")
+    with transcriber.lock:
+        metrics.add_gauge("voicedoc_queue_depth", -1, queue="transcribe")
+        with metrics.span("transcribe"):
+            return transcriber.transcribe(audio, initial_prompt=initial_prompt)
+
+
+def transcribe(wavpath, backend=None, **options):
+    """녹음 파일을 텍스트로 변환합니다."""
+    return transcribe_segments(wavpath, backend, **options)["text"]
@@ -0,0 +1,34 @@
+"""gTTS 기반 음성 안내."""
+import base64
+from functools import lru_cache
+from io import BytesIO
+
+import streamlit as st
+
+from . import metrics
+
+
+@lru_cache(maxsize=64)
+def synthesize_speech(text, lang='ko'):
+    """문자를 음성(mp3) 바이트로 변환합니다. 같은 안내 문구는 다시 합성하지 않습니다."""
+    from gtts import gTTS
+    with metrics.span("tts"):
+        tts = gTTS(text=text, lang=lang)
+        mp3 = BytesIO()
+        tts.write_to_fp(mp3)
+    return mp3.getvalue()
+
+
+def tts_play(text):
+    """문자를 음성(mp3)으로 생성 후 HTML로 재생"""
+    try:
+        b64 = base64.b64encode(synthesize_speech(text)).decode()
+
+        audio_html = f"""
+            <audio autoplay>
+                <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
+            </audio>
+        """
+        st.markdown(audio_html, unsafe_allow_html=True)
+    except Exception as e:
+        st.error(f"오디오 재생 오류: {e}")
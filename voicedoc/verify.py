@@ -0,0 +1,225 @@
+"""음성 서명 일괄 검증.
+
+보관소 색인(archive/index.sqlite3)과 예전 방식의 폴더(documents/ 의 PDF와 voice_signature_*.json)를
+모두 읽어, 서명에 기록된 document_hash로 PDF를 짝짓습니다.
+예전 서명 JSON에는 PDF 경로가 없으므로, 해시가 맞는 PDF가 없는 서명은 같은 폴더에서 서명 직전 시각의
+PDF(temp_<시각>.pdf와 그 _backup.pdf 등, 이름의 <시각>으로 판단)와 짝지어 변조 여부를 봅니다.
+PDF 해시는 여러 프로세스에서 mmap 청크 읽기로 병렬 계산합니다.
+
+분류:
+    valid              : PDF 해시와 일치하는 음성 서명이 있음
+    tampered           : 보관소 PDF의 내용이 기록된 해시와 다름, 또는 예전 폴더에서 시각으로 짝지은 서명의 해시와 다름
+    orphaned_document  : 어떤 서명과도 일치하지 않는 PDF
+    orphaned_signature : 어떤 PDF와도 일치하지 않는 서명
+
+사용 예:
+    python -m voicedoc.verify                           # 보관소 전체
+    python -m voicedoc.verify --dir documents --report report.csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import archive
+from .signature import sha256_file
+
+STATUSES = ["valid", "tampered", "orphaned_document", "orphaned_signature"]
+
+# 예전 파일 이름의 시각 (temp_20240131_090000.pdf, voice_signature_20240131_090005.json 등)
+_NAME_STAMP = re.compile(r"(\d{8}_\d{6})")
+# 예전 서명과 PDF를 시각으로 짝지을 때 서명 시각 이전으로 찾는 범위와 이후로 허용하는 오차 (초)
+LEGACY_PAIR_BEFORE = 3600
+LEGACY_PAIR_AFTER = 60
+
+
+def _hash_or_none(filepath):
+    try:
+        return sha256_file(filepath)
+    except OSError:
+        return None
+
+
+def _scan_dir(root):
+    """폴더를 재귀적으로 훑어 PDF 경로와 서명 JSON 경로 목록을 반환합니다."""
+    pdfs, signatures = [], []
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".pdf"):
+                    pdfs.append(entry.path)
+                elif entry.name.startswith("voice_signature_") and entry.name.endswith(".json"):
+                    signatures.append(entry.path)
+    return pdfs, signatures
+
+
+def _load_signature_hash(filepath):
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            return json.load(f).get("document_hash")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _name_time(path):
+    """파일 이름에 들어 있는 시각(초). 없으면 None."""
+    match = _NAME_STAMP.search(os.path.basename(path))
+    if match is None:
+        return None
+    try:
+        return time.mktime(time.strptime(match.group(1), "%Y%m%d_%H%M%S"))
+    except ValueError:
+        return None
+
+
+def _legacy_pair(signature_path, rows):
+    """예전 서명 JSON과 짝지을 PDF 결과 행 목록 (같은 폴더, 서명 직전 시각의 PDF들).
+
+    예전 앱은 서명할 때 temp_<시각>.pdf를 만들고, 서명 후 PDF를 다시 만들면서 원본을 _backup.pdf로 남겼으므로
+    가장 가까운 시각의 PDF를 모두 돌려줍니다.
+    """
+    signed_at = _name_time(signature_path)
+    if signed_at is None:
+        return []
+    folder = os.path.dirname(os.path.abspath(signature_path))
+    candidates = []
+    for row in rows:
+        created_at = _name_time(row["path"])
+        if (created_at is not None and os.path.dirname(os.path.abspath(row["path"])) == folder
+                and signed_at - LEGACY_PAIR_BEFORE <= created_at <= signed_at + LEGACY_PAIR_AFTER):
+            candidates.append((abs(signed_at - created_at), row))
+    if not candidates:
+        return []
+    nearest = min(distance for distance, _ in candidates)
+    return [row for distance, row in candidates if distance == nearest]
+
+
+def verify(dirs=(), use_archive=True, workers=None):
+    """문서와 서명을 대조해 검증 결과 레코드 목록을 반환합니다."""
+    # 1) 서명 색인: 서명 대상 해시 -> 서명 출처 목록
+    signatures = {}
+    if use_archive:
+        for row in archive.iter_by_kind("signature"):
+            if row["signed_hash"]:
+                signatures.setdefault(row["signed_hash"], []).append(row["blob_path"])
+
+    # 2) 검사할 PDF 목록: (경로, 기록된 해시 또는 None)
+    pdfs = []
+    # 예전 폴더의 서명: (경로, 서명 대상 해시)
+    legacy_signatures = []
+    if use_archive:
+        pdfs += [(row["blob_path"], row["document_hash"]) for row in archive.iter_by_kind("pdf")]
+    for root in dirs:
+        dir_pdfs, dir_signatures = _scan_dir(root)
+        pdfs += [(path, None) for path in dir_pdfs]
+        for path in dir_signatures:
+            signed_hash = _load_signature_hash(path)
+            if signed_hash:
+                signatures.setdefault(signed_hash, []).append(path)
+                legacy_signatures.append((path, signed_hash))
+
+    # 3) 병렬 해시 계산
+    paths = [path for path, _ in pdfs]
+    hashes = []
+    if paths:
+        worker_count = workers or os.cpu_count() or 1
+        chunksize = max(1, len(paths) // (worker_count * 8))
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            hashes = list(pool.map(_hash_or_none, paths, chunksize=chunksize))
+
+    # 4) 분류
+    results = []
+    matched = set()
+    for (path, expected), actual in zip(pdfs, hashes):
+        if actual is None or (expected and actual != expected):
+            status = "tampered"
+            sigs = signatures.get(expected, [])
+            matched.add(expected)
+        elif actual in signatures:
+            status = "valid"
+            sigs = signatures[actual]
+            matched.add(actual)
+        else:
+            status = "orphaned_document"
+            sigs = []
+        results.append({
+            "status": status,
+            "path": path,
+            "document_hash": actual or "",
+            "expected_hash": expected or "",
+            "signatures": ";".join(sigs),
+        })
+
+    # 5) 해시가 맞는 PDF가 없는 예전 서명은 시각으로 짝지은 PDF를 변조로 봅니다.
+    for path, signed_hash in legacy_signatures:
+        if signed_hash in matched:
+            continue
+        orphans = [row for row in results if row["status"] == "orphaned_document" and not row["expected_hash"]]
+        paired = _legacy_pair(path, orphans)
+        for row in paired:
+            row.update(status="tampered", expected_hash=signed_hash, signatures=";".join(signatures[signed_hash]))
+        if paired:
+            matched.add(signed_hash)
+
+    for signed_hash, sigs in signatures.items():
+        if signed_hash not in matched:
+            results.append({
+                "status": "orphaned_signature",
+                "path": "",
+                "document_hash": "",
+                "expected_hash": signed_hash,
+                "signatures": ";".join(sigs),
+            })
+
+    return results
+
+
+def write_report(results, report_path):
+    """결과를 CSV(.csv) 또는 JSON Lines(그 외) 파일로 저장합니다."""
+    fields = ["status", "path", "document_hash", "expected_hash", "signatures"]
+    with open(report_path, "w", encoding="utf-8", newline="") as f:
+        if str(report_path).endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            for row in results:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="음성 서명 일괄 검증")
+    parser.add_argument("--dir", action="append", default=[], help="예전 방식 PDF/서명 JSON 폴더 (여러 번 지정 가능)")
+    parser.add_argument("--no-archive", action="store_true", help="보관소 색인은 검사하지 않음")
+    parser.add_argument("--workers", type=int, default=None, help="해시 계산 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--report", help="결과 파일 경로 (.csv 또는 .jsonl)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = verify(dirs=[Path(d) for d in args.dir], use_archive=not args.no_archive, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    counts = {status: 0 for status in STATUSES}
+    for row in results:
+        counts[row["status"]] += 1
+    for status in STATUSES:
+        print(f"{status:20} {counts[status]:>8}")
+    print(f"{'elapsed':20} {elapsed:>7.1f}s")
+
+    if args.report:
+        write_report(results, args.report)
+        print(f"보고서: {args.report}")
+
+    return 1 if counts["tampered"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())